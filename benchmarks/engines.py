@@ -0,0 +1,106 @@
+"""Cross-check and throughput of the NumPy engine against the Rust extension.
+
+Run from the repository root:
+
+    python -m benchmarks.engines [--launches 1000] [--tolerance 1e-9]
+
+Both engines simulate the same summary sweep and a few full trajectories with
+apex, plane and wall events. The script prints the launches per second of
+each engine and exits non-zero if any summary value, trajectory value or
+event differs by more than `--tolerance` (relative to its column's scale).
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.sweep_scaling import BASE_LAUNCH, sweep_grid
+from python import calculation
+
+EVENTS = [
+    {"type": "apex"},
+    {"type": "plane", "x": 10.0},
+    {"type": "wall", "x": 20.0, "height": 2.0},
+]
+TRAJECTORY_LAUNCHES = [
+    {**BASE_LAUNCH, "time_step": 0.01},
+    {**BASE_LAUNCH, "elevation_angle": 60.0, "side_spin": 1.0, "top_spin": 0.0},
+    {**BASE_LAUNCH, "elevation_angle": 0.0, "time_step": 0.005},
+]
+
+
+def run(engine, function, *args, **kwargs):
+    calculation.use_engine(engine)
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def difference(a, b):
+    # largest difference relative to the scale of each column
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if a.shape != b.shape:
+        return np.inf
+    scale = np.maximum(np.abs(a).max(axis=0, initial=0), 1.0)
+    return float((np.abs(a - b) / scale).max(initial=0))
+
+
+def event_values(events):
+    return [
+        [event[key] for key in ("t", "x", "y", "z", "vx", "vy", "vz")]
+        for event in events
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--launches", type=int, default=1000)
+    parser.add_argument("--time-step", type=float, default=0.01)
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    grid = {**sweep_grid(args.launches), "time_step": args.time_step}
+    launches = np.broadcast(*grid.values()).size
+    results, failures = {}, []
+    print(f"{'engine':<8} {'seconds':>10} {'launches/s':>12}")
+    for engine in calculation.ENGINES:
+        summary, elapsed = run(
+            engine, calculation.run_magnus_sweep, grid, summary_only=True
+        )
+        results[engine] = summary
+        print(f"{engine:<8} {elapsed:>10.3f} {launches / elapsed:>12.0f}")
+
+    rust, numpy = results["rust"], results["numpy"]
+    summary_difference = difference(
+        np.column_stack(list(rust.values())), np.column_stack(list(numpy.values()))
+    )
+    print(f"summary difference {summary_difference:.2e}")
+    if summary_difference > args.tolerance:
+        failures.append("summary sweep")
+
+    for index, magnus_data in enumerate(TRAJECTORY_LAUNCHES):
+        magnus_data = {**magnus_data, "events": EVENTS}
+        expected, _ = run("rust", calculation.run_magnus_simulation, magnus_data)
+        actual, _ = run("numpy", calculation.run_magnus_simulation, magnus_data)
+        trajectory_difference = difference(expected["trajectory"], actual["trajectory"])
+        event_difference = difference(
+            event_values(expected["events"]), event_values(actual["events"])
+        )
+        print(
+            f"trajectory {index}: {len(actual['t'])} points, difference "
+            f"{trajectory_difference:.2e}, events {event_difference:.2e}"
+        )
+        if max(trajectory_difference, event_difference) > args.tolerance:
+            failures.append(f"trajectory {index}")
+        if expected["steps"] != actual["steps"]:
+            failures.append(f"trajectory {index} step count")
+
+    for failure in failures:
+        print(f"FAIL: engines disagree on {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start time of the GUI: importing python.gui and painting the welcome screen.
+
+Run from the repository root:
+
+    python -m benchmarks.startup [--repeat 5] [--max-import-ms 400] [--max-paint-ms 1500]
+
+Every sample runs in a fresh interpreter. The best of `--repeat` samples is
+compared against the limits, and the script exits non-zero if a limit is
+exceeded or if a module that should load lazily was imported before the first
+result. Without a display, set QT_QPA_PLATFORM=offscreen.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# modules the welcome screen must not need
+LAZY_MODULES = ["matplotlib", "numpy", "magnus_simulation"]
+
+SAMPLE = """
+import json, sys, time
+start = time.perf_counter()
+import python.gui as gui
+imported = time.perf_counter()
+app = gui.create_app()
+window = gui.SpinFlight()
+window.show()
+app.processEvents()
+painted = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "paint_ms": (painted - start) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def sample():
+    output = subprocess.run(
+        [sys.executable, "-c", SAMPLE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=400)
+    parser.add_argument("--max-paint-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.repeat)]
+    import_ms = min(result["import_ms"] for result in samples)
+    paint_ms = min(result["paint_ms"] for result in samples)
+    loaded = sorted({name for result in samples for name in result["loaded"]})
+    print(f"{'import python.gui':<22} {import_ms:>8.1f} ms")
+    print(f"{'first paint':<22} {paint_ms:>8.1f} ms")
+    print(f"{'eagerly loaded':<22} {', '.join(loaded) or '-'}")
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.0f} ms > {args.max_import_ms:.0f}")
+    if paint_ms > args.max_paint_ms:
+        failures.append(f"first paint took {paint_ms:.0f} ms > {args.max_paint_ms:.0f}")
+    if loaded:
+        failures.append(f"loaded before the first result: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
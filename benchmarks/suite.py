@@ -0,0 +1,296 @@
+"""Benchmark suite for the simulation, marshalling, plotting and export stages.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--output results.json] [--compare baseline.json]
+                               [--only integrator,plot] [--repeat 5]
+
+Every case is timed `--repeat` times after one warm-up run. The JSON report
+records the best, median and mean time, the processed points per second and
+the peak traced memory of one extra run. tracemalloc sees Python and NumPy
+allocations, but not memory allocated inside the Rust extension. The report
+also records the commit it was measured on. With `--compare`, cases that got
+slower than `--tolerance` relative to the baseline report are listed, and the
+script exits non-zero.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from benchmarks.sweep_scaling import BASE_LAUNCH, sweep_grid
+from python import calculation
+from python.figures import (
+    build_figure,
+    canvas_values,
+    set_limits,
+    set_line_data,
+    animation_frames,
+    animation_positions,
+)
+from python.export import render_figure
+
+# (time step, duration) pairs for the integrator cases
+INTEGRATOR_CASES = [(1e-2, 10.0), (1e-3, 10.0), (1e-4, 10.0), (1e-4, 60.0)]
+STATIC_PLOTS = 4
+
+
+def launch(time_step, duration):
+    return {**BASE_LAUNCH, "time_step": time_step, "duration": duration}
+
+
+def integrator_cases():
+    for time_step, duration in INTEGRATOR_CASES:
+        magnus_data = launch(time_step, duration)
+        params, spin_vector = calculation.magnus_parameters(magnus_data)
+
+        def run(params=params, spin_vector=spin_vector):
+            data = calculation.ms.simulate_trajectory_arrays(
+                params, calculation.MASS, spin_vector
+            ).data
+            return len(data)
+
+        yield f"integrator/dt={time_step:g},T={duration:g}", run
+
+
+def marshalling_cases():
+    magnus_data = launch(1e-4, 10.0)
+    params, spin_vector = calculation.magnus_parameters(magnus_data)
+    data = calculation.ms.simulate_trajectory_arrays(
+        params, calculation.MASS, spin_vector
+    ).data
+
+    def columns():
+        calculation.trajectory_result(data)
+        return len(data)
+
+    def point_objects():
+        # the list-of-objects interface the array path replaced
+        points = calculation.ms.simulate_trajectory(
+            params, calculation.MASS, spin_vector
+        )
+        return len(points)
+
+    def simulation():
+        return len(calculation.run_magnus_simulation(magnus_data)["t"])
+
+    yield "marshalling/trajectory_result", columns
+    # the NumPy engine has no list-of-objects simulate_trajectory
+    if calculation.ENGINE == "rust":
+        yield "marshalling/point_objects", point_objects
+    yield "marshalling/run_magnus_simulation", simulation
+
+
+def sweep_cases():
+    grid = sweep_grid(1000)
+    launches = np.broadcast(*grid.values()).size
+
+    def summaries():
+        calculation.run_magnus_sweep(grid, summary_only=True)
+        return launches
+
+    def table_summaries():
+        # same sweep with the tabulated force model, one set of tables for all
+        model = calculation.FORCE_MODEL
+        calculation.use_force_model("tables")
+        try:
+            calculation.run_magnus_sweep(grid, summary_only=True)
+        finally:
+            calculation.use_force_model(model)
+        return launches
+
+    yield "sweep/summary_1000", summaries
+    yield "sweep/summary_1000_tables", table_summaries
+
+
+def numpy_engine_cases():
+    grid = {**sweep_grid(1000), "time_step": 1e-2}
+    launches = np.broadcast(*grid.values()).size
+
+    def summaries():
+        engine = calculation.ENGINE
+        calculation.use_engine("numpy")
+        try:
+            calculation.run_magnus_sweep(grid, summary_only=True)
+        finally:
+            calculation.use_engine(engine)
+        return launches
+
+    yield "numpy_engine/summary_1000", summaries
+
+
+def result_data():
+    return calculation.run_magnus_simulation(launch(1e-4, 10.0))
+
+
+def plot_cases():
+    calculated_data = result_data()
+    values = canvas_values(calculated_data)
+    figures = [build_figure(index) for index in range(len(values))]
+    for figure, *_ in figures:
+        FigureCanvasAgg(figure)
+
+    def plot():
+        # what plot_calculated_data does, drawn on Agg instead of Qt canvases
+        for (figure, axes, lines, column), canvas_value in zip(figures, values):
+            for ax, line, (x, y, z) in zip(axes, lines, canvas_value):
+                set_limits(ax, x, y, z, column)
+                set_line_data(line, x, y, z, column)
+            figure.canvas.draw()
+        return len(calculated_data["t"])
+
+    yield "plot/all_tabs", plot
+
+
+def animation_cases():
+    calculated_data = result_data()
+    figure, (ax,), (line,), column = build_figure(
+        len(canvas_values(calculated_data)) - 1
+    )
+    FigureCanvasAgg(figure)
+
+    def frames():
+        positions, t = animation_positions(calculated_data)
+        frame_ends = animation_frames(t, 60)
+        set_limits(ax, *positions, column)
+        line.set_animated(True)
+        figure.canvas.draw()
+        background = figure.canvas.copy_from_bbox(figure.bbox)
+        for end in frame_ends:
+            figure.canvas.restore_region(background)
+            line.set_data_3d(positions[0, :end], positions[1, :end], positions[2, :end])
+            ax.draw_artist(line)
+            figure.canvas.buffer_rgba()
+        return len(frame_ends)
+
+    yield "animation/frames_60fps", frames
+
+
+def export_cases():
+    calculated_data = result_data()
+    values = canvas_values(calculated_data)
+    # removed once the case has been measured and the generator resumes
+    with tempfile.TemporaryDirectory() as folder:
+
+        def static_figures():
+            for index in range(STATIC_PLOTS):
+                path = os.path.join(folder, f"{index}.png")
+                render_figure(index, values[index], path)
+            return STATIC_PLOTS
+
+        yield "export/static_figures_300dpi", static_figures
+
+
+GROUPS = {
+    "integrator": integrator_cases,
+    "marshalling": marshalling_cases,
+    "sweep": sweep_cases,
+    "numpy_engine": numpy_engine_cases,
+    "plot": plot_cases,
+    "animation": animation_cases,
+    "export": export_cases,
+}
+
+
+def measure(run, repeat):
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "repeat": repeat,
+        "items": count,
+        "items_per_s": count / min(times),
+        "peak_traced_bytes": peak,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["best_s"] / baseline[name]["best_s"]
+        print(f"{name:<42} {ratio:>6.2f}x")
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report to compare against")
+    parser.add_argument("--only", help="comma separated groups: " + ",".join(GROUPS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    results = {}
+    print(f"{'case':<42} {'best s':>10} {'items/s':>12} {'peak MiB':>9}")
+    for group in groups:
+        for name, run in GROUPS[group]():
+            result = measure(run, args.repeat)
+            results[name] = result
+            print(
+                f"{name:<42} {result['best_s']:>10.4f} {result['items_per_s']:>12.0f}"
+                f" {result['peak_traced_bytes'] / 2**20:>9.1f}"
+            )
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"slower than baseline: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Scaling of a 10k-launch summary sweep from 1 to N worker threads.
+
+Run from the repository root:
+
+    python -m benchmarks.sweep_scaling [--launches 10000] [--threads]
+
+`--threads` drives run_magnus_simulation from a ThreadPoolExecutor instead
+of the built-in batch workers.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from python.calculation import run_magnus_simulation, run_magnus_sweep
+
+BASE_LAUNCH = {
+    "initial_velocity": 30.0,
+    "radius": 0.11,
+    "elevation_angle": 30.0,
+    "azimuth_angle": 0.0,
+    "drag_coefficient": 0.25,
+    "lift_coefficient": 0.2,
+    "air_density": 1.2,
+    "spin_rate": 0.0,
+    "top_spin": 1.0,
+    "side_spin": 0.0,
+    "time_step": 0.001,
+    "duration": 10.0,
+}
+
+
+def sweep_grid(launches):
+    side = max(int(round(launches ** (1 / 3))), 1)
+    velocity, elevation, spin_rate = np.meshgrid(
+        np.linspace(10, 60, side),
+        np.linspace(5, 60, side),
+        np.linspace(-3000, 3000, side),
+    )
+    return {
+        **BASE_LAUNCH,
+        "initial_velocity": velocity,
+        "elevation_angle": elevation,
+        "spin_rate": spin_rate,
+    }
+
+
+def worker_counts():
+    counts, workers = [], 1
+    while workers < os.cpu_count():
+        counts.append(workers)
+        workers *= 2
+    return counts + [os.cpu_count()]
+
+
+def time_batch(grid, workers):
+    start = time.perf_counter()
+    run_magnus_sweep(grid, summary_only=True, workers=workers)
+    return time.perf_counter() - start
+
+
+def time_thread_pool(grid, workers):
+    keys = list(grid)
+    columns = np.broadcast_arrays(*(np.asarray(grid[key]) for key in keys))
+    launches = [
+        dict(zip(keys, map(float, values)))
+        for values in zip(*(column.ravel() for column in columns))
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run_magnus_simulation, launches))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--launches", type=int, default=10_000)
+    parser.add_argument("--threads", action="store_true")
+    args = parser.parse_args()
+
+    grid = sweep_grid(args.launches)
+    runner = time_thread_pool if args.threads else time_batch
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>10} {'launches/s':>12} {'speedup':>8}")
+    for workers in worker_counts():
+        elapsed = runner(grid, workers)
+        baseline = baseline or elapsed
+        launches = np.broadcast(*grid.values()).size
+        print(
+            f"{workers:>8} {elapsed:>10.3f} {launches / elapsed:>12.0f}"
+            f" {baseline / elapsed:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -202,6 +202,10 @@ PLOT_FONT_SIZES = {
 }
 PLOT_MARGIN_MIN = 0.98
 PLOT_MARGIN_MAX = 1.1
+# Longer series are decimated before they are handed to matplotlib
+PLOT_MAX_POINTS = 2000
+# Playback rate of the animation tab; one frame per 1/ANIMATION_FPS s of flight
+ANIMATION_FPS = 30
 
 SAVE_PLOT_NAMES = {
     "trajectory_plot": "trajectory_figure",
@@ -210,6 +214,19 @@ SAVE_PLOT_NAMES = {
     "force_plot": "force_figure",
     "animation_plot": "animation_figure",
 }
+# Saved plots: PNG resolution, and frame rate, resolution and bitrate (kbit/s)
+# of the animation video encoded by ffmpeg
+EXPORT_DPI = 300
+EXPORT_VIDEO_FPS = 60
+EXPORT_VIDEO_DPI = 200
+EXPORT_VIDEO_BITRATE = 3000
+# Rows formatted and written at a time by the data export
+TABLE_CHUNK_ROWS = 65536
+# Trajectory rows per streamed chunk, and the shortest interval (s) between
+# redraws of the growing trajectory while the window simulates
+STREAM_CHUNK_ROWS = 1024
+STREAM_PLOT_INTERVAL = 0.1
+
 data_map = {
     # Time
     "times": "time",
@@ -236,3 +253,25 @@ data_map = {
     "y_total_force": "total_force",
     "z_total_force": "total_force",
 }
+
+# Simulation results kept in memory (bytes) and optionally on disk across
+# restarts. A directory of None keeps them in memory only; set one here, with
+# MAGNUS_CACHE_DIR or with `python main.py --cache-dir FOLDER` to opt in, e.g.
+# os.path.join(os.path.expanduser("~"), ".magnus_effect", "cache")
+SIMULATION_CACHE_BYTES = 256 * 2**20
+SIMULATION_CACHE_DIRECTORY = None
+
+# Monte Carlo launches per sweep call and impact points kept for the plot
+MONTE_CARLO_CHUNK = 4096
+MONTE_CARLO_KEEP_POINTS = 5000
+
+# Aerodynamic force model: "constant" uses the drag and lift coefficients of the
+# inputs, "tables" looks up Cd(Re), Cl(spin ratio), air density(height) and spin
+# decay(time) in tables of FORCE_TABLE_POINTS points built by python.force_model
+FORCE_MODEL = "constant"
+FORCE_TABLE_POINTS = 2048
+# Dynamic viscosity of air (Pa·s), launch height above sea level (m) and the
+# time (s) over which the spin rate falls to 1/e
+AIR_VISCOSITY = 1.81e-5
+LAUNCH_ALTITUDE = 0.0
+SPIN_DECAY_TIME = 10.0
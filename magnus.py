@@ -0,0 +1,11 @@
+"""Command line entry point: python -m magnus {run,summary,sweep} ...
+
+Runs without a display; see python/cli.py for the parameter file formats.
+"""
+
+import sys
+
+from python.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
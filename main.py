@@ -1,5 +1,6 @@
-from python.gui import main
-
-
 if __name__ == "__main__":
+    # imported here so export worker processes, which re-import this module,
+    # do not start the GUI
+    from python.gui import main
+
     main()
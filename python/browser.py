@@ -0,0 +1,56 @@
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QDialog,
+    QDialogButtonBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+
+class RunBrowser(QDialog):
+    # Lists the runs of a TrajectoryStore from its index alone; the chosen
+    # run id is in `selected_run` after the dialog is accepted.
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Stored Runs")
+        self.selected_run = None
+        runs = store.runs()
+        names = sorted(
+            {name for entry in runs.values() for name in entry["parameters"]}
+        )
+
+        self.table = QTableWidget(len(runs), len(names) + 2)
+        self.table.setHorizontalHeaderLabels(["Run", "Points"] + names)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        for row, (run_id, entry) in enumerate(sorted(runs.items())):
+            values = [run_id, entry["length"]]
+            values += [entry["parameters"].get(name, "") for name in names]
+            for column, value in enumerate(values):
+                self.table.setItem(
+                    row,
+                    column,
+                    QTableWidgetItem(
+                        f"{value:g}" if isinstance(value, float) else str(value)
+                    ),
+                )
+        self.table.resizeColumnsToContents()
+        self.table.cellDoubleClicked.connect(lambda *_: self.accept())
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Open | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addWidget(buttons)
+        self.resize(720, 480)
+
+    def accept(self):
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        self.selected_run = int(self.table.item(row, 0).text())
+        super().accept()
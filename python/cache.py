@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import SIMULATION_CACHE_BYTES, SIMULATION_CACHE_DIRECTORY
+from python import calculation
+from python.profiling import count
+
+# bumped whenever the layout of cached results changes
+CACHE_FORMAT = 2
+
+
+def normalize(value):
+    # numbers compare by value (30 == 30.0), containers recursively
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, (bool, np.bool_)) or value is None:
+        return value
+    if isinstance(value, (int, float, np.number)):
+        return repr(float(value))
+    return str(value)
+
+
+def result_bytes(result):
+    # column views share the trajectory buffer, so count each buffer once
+    buffers = {}
+    for value in result.values():
+        if isinstance(value, np.ndarray):
+            while isinstance(value.base, np.ndarray):
+                value = value.base
+            buffers[id(value)] = value.nbytes
+    return sum(buffers.values()) + 64 * len(result)
+
+
+def freeze(result):
+    for value in result.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return result
+
+
+class SimulationCache:
+    """LRU cache of simulation results keyed on the normalized magnus_data.
+
+    Entries are evicted least recently used first once their arrays exceed
+    `max_bytes`. With a `directory`, results are also written there as .npz
+    files (up to `max_disk_bytes`) and survive restarts. Keys include MASS,
+    GRAVITY, the engine and the force model of the calculation module, so
+    changing them invalidates every entry. A miss for a longer duration of a cached flight
+    continues that run instead of simulating from the launch.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20, directory=None, max_disk_bytes=2**30):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        # parameters hash -> (duration, key) of the longest cached run
+        self.resumable = {}
+        self.lock = threading.Lock()
+
+    def key(self, magnus_data):
+        identity = {
+            "format": CACHE_FORMAT,
+            "mass": normalize(calculation.MASS),
+            "gravity": normalize(calculation.GRAVITY),
+            "engine": calculation.ENGINE,
+            "force_model": calculation.FORCE_MODEL,
+            "magnus_data": normalize(magnus_data),
+        }
+        encoded = json.dumps(identity, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.resumable.clear()
+            self.size = 0
+
+    def get(self, magnus_data):
+        key = self.key(magnus_data)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                count("cache_hits")
+                return dict(self.entries[key][0])
+        result = self.load(key)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                count("cache_misses")
+                return None
+            self.disk_hits += 1
+            count("cache_disk_hits")
+            self.insert(key, result)
+        return dict(result)
+
+    def put(self, magnus_data, result):
+        key = self.key(magnus_data)
+        result = freeze(dict(result))
+        with self.lock:
+            self.insert(key, result)
+        self.store(key, result)
+
+    def insert(self, key, result):
+        if key in self.entries:
+            previous, previous_bytes = self.entries.pop(key)
+            self.size -= previous_bytes
+            self.forget(key, previous)
+        nbytes = result_bytes(result)
+        if nbytes > self.max_bytes:
+            return
+        self.entries[key] = (result, nbytes)
+        self.size += nbytes
+        state = result.get("final_state")
+        if state is not None:
+            longest = self.resumable.get(state["params_hash"])
+            if (
+                longest is None
+                or longest[1] not in self.entries
+                or longest[0] <= state["duration"]
+            ):
+                self.resumable[state["params_hash"]] = (state["duration"], key)
+        while self.size > self.max_bytes:
+            evicted_key, (evicted, nbytes) = self.entries.popitem(last=False)
+            self.size -= nbytes
+            self.forget(evicted_key, evicted)
+
+    def forget(self, key, result):
+        # an evicted run can no longer be extended
+        state = result.get("final_state")
+        if state is not None:
+            longest = self.resumable.get(state["params_hash"])
+            if longest is not None and longest[1] == key:
+                del self.resumable[state["params_hash"]]
+
+    def shorter_run(self, magnus_data):
+        # a cached run of the same flight that magnus_data's duration extends;
+        # strided output would not line up with a fresh run, so only full ones
+        if calculation.output_stride(magnus_data) != 1:
+            return None
+        with self.lock:
+            longest = self.resumable.get(calculation.parameters_hash(magnus_data))
+            if longest is None or longest[1] not in self.entries:
+                return None
+            if longest[0] > magnus_data["duration"]:
+                return None
+            self.entries.move_to_end(longest[1])
+            return self.entries[longest[1]][0]
+
+    def wrap(self, simulate):
+        def cached_simulation(magnus_data, **kwargs):
+            result = self.get(magnus_data)
+            if result is None:
+                previous = self.shorter_run(magnus_data)
+                if previous is None:
+                    result = simulate(magnus_data, **kwargs)
+                else:
+                    result = calculation.extend_simulation(
+                        previous, magnus_data, **kwargs
+                    )
+                self.put(magnus_data, result)
+            return result
+
+        cached_simulation.cache = self
+        return cached_simulation
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, key):
+        if not self.directory or not os.path.exists(self.path(key)):
+            return None
+        try:
+            with np.load(self.path(key), allow_pickle=False) as stored:
+                trajectory = np.asfortranarray(stored["trajectory"])
+                metadata = json.loads(str(stored["metadata"]))
+        except (OSError, ValueError, KeyError):
+            return None
+        result = calculation.trajectory_result(trajectory)
+        result.update(metadata)
+        return freeze(result)
+
+    def store(self, key, result):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        metadata = {
+            name: value
+            for name, value in result.items()
+            if not isinstance(value, np.ndarray)
+        }
+        temporary = self.path(key) + ".tmp.npz"
+        np.savez(
+            temporary,
+            trajectory=result["trajectory"],
+            metadata=np.array(json.dumps(metadata)),
+        )
+        os.replace(temporary, self.path(key))
+        self.trim_disk()
+
+    def trim_disk(self):
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".npz")
+        ]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(name) for name in files)
+        while files and total > self.max_disk_bytes:
+            oldest = files.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+
+
+# MAGNUS_CACHE_DIR keeps results on disk without editing config
+simulation_cache = SimulationCache(
+    SIMULATION_CACHE_BYTES,
+    os.environ.get("MAGNUS_CACHE_DIR") or SIMULATION_CACHE_DIRECTORY,
+)
+cached_simulation = simulation_cache.wrap(calculation.run_magnus_simulation)
@@ -1,29 +1,146 @@
-import magnus_simulation as ms
+import hashlib
+import importlib
+import json
+import os
 
 import numpy as np
 
+from config import FORCE_MODEL, INPUT_LIMITS, STREAM_CHUNK_ROWS, data_map
+from python.profiling import count, stage
 
-def run_magnus_simulation(magnus_data):
-    print(magnus_data)
-    # Create a Vec3 for spin vector
-    spin_vector = ms.Vec3(
-        0.0,
-        magnus_data["side_spin"],
-        magnus_data["top_spin"],
+# Simulation engines with the same API: the compiled extension and a pure NumPy
+# fallback. MAGNUS_ENGINE picks one, otherwise the extension when it is built.
+ENGINES = {"rust": "magnus_simulation", "numpy": "python.numpy_engine"}
+
+
+def load_engine(name):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', expected one of {list(ENGINES)}")
+    return importlib.import_module(ENGINES[name])
+
+
+def use_engine(name):
+    global ENGINE, ms
+    ms = load_engine(name)
+    ENGINE = name
+
+
+if os.environ.get("MAGNUS_ENGINE"):
+    use_engine(os.environ["MAGNUS_ENGINE"])
+else:
+    try:
+        use_engine("rust")
+    except ImportError:
+        use_engine("numpy")
+
+# Aerodynamic force models: the constant coefficients of the inputs, or tables
+# built once per engine by python.force_model. MAGNUS_FORCE_MODEL picks one,
+# otherwise FORCE_MODEL of the config.
+FORCE_MODELS = ["constant", "tables"]
+FORCE_TABLES = {}
+
+
+def use_force_model(name):
+    global FORCE_MODEL
+    if name not in FORCE_MODELS:
+        raise ValueError(
+            f"Unknown force model '{name}', expected one of {FORCE_MODELS}"
+        )
+    FORCE_MODEL = name
+
+
+use_force_model(os.environ.get("MAGNUS_FORCE_MODEL") or FORCE_MODEL)
+
+
+def force_tables():
+    # ForceTables shared by every launch, or None for the constant model
+    if FORCE_MODEL == "constant":
+        return None
+    if ENGINE not in FORCE_TABLES:
+        from python.force_model import build_tables
+
+        FORCE_TABLES[ENGINE] = build_tables(ms)
+    return FORCE_TABLES[ENGINE]
+
+
+# Mass of the projectile
+MASS = 0.43
+GRAVITY = 9.81
+# spin rates are entered in rpm, the table force model takes rad/s
+RPM = np.pi / 30
+
+# Integrator used when magnus_data does not pick one ("rk4" or adaptive "rk45")
+DEFAULT_INTEGRATOR = {"integrator": "rk4", "rtol": 1e-6, "atol": 1e-9}
+
+# Column layout of the arrays returned by ms.simulate_trajectory_arrays
+TRAJECTORY_COLUMNS = {name: index for index, name in enumerate(data_map)}
+
+# Result arrays that are single trajectory columns, by their data_map name
+RESULT_COLUMNS = {
+    "t": "times",
+    "x": "x_positions",
+    "y": "y_positions",
+    "z": "z_positions",
+    "vx": "x_velocity",
+    "vy": "y_velocity",
+    "vz": "z_velocity",
+    "ax": "x_acceleration",
+    "ay": "y_acceleration",
+    "az": "z_acceleration",
+}
+
+# Result arrays holding (N, 3) vector quantities, by their first column
+VECTOR_COLUMNS = {
+    "position": "x_positions",
+    "velocity": "x_velocity",
+    "acceleration": "x_acceleration",
+    "magnus_force": "x_magnus_force",
+    "drag_force": "x_drag_force",
+    "total_force": "x_total_force",
+}
+
+# Trajectory columns of a result that a resumed run starts from
+RESUME_COLUMNS = ["t", "x", "y", "z", "vx", "vy", "vz"]
+
+# Column layout of the summary rows returned by ms.simulate_batch
+SUMMARY_COLUMNS = {
+    name: index
+    for index, name in enumerate(
+        [
+            "flight_time",
+            "range",
+            "lateral_deviation",
+            "apex_time",
+            "apex_height",
+            "impact_vx",
+            "impact_vy",
+            "impact_vz",
+            "impact_speed",
+            "landed",
+        ]
     )
-    K_D = (
+}
+
+
+def aerodynamic_constant(magnus_data, coefficient):
+    return (
         (1 / 2)
         * (np.pi * magnus_data["radius"] ** 2)
         * magnus_data["air_density"]
-        * magnus_data["drag_coefficient"]
+        * magnus_data[coefficient]
     )
-    K_L = (
-        (1 / 2)
-        * (np.pi * magnus_data["radius"] ** 2)
-        * magnus_data["air_density"]
-        * magnus_data["lift_coefficient"]
+
+
+def magnus_parameters(magnus_data):
+    integrator = {**DEFAULT_INTEGRATOR, **magnus_data}
+    # Create a Vec3 for spin vector
+    spin_vector = ms.Vec3(
+        0.0,
+        magnus_data["side_spin"],
+        magnus_data["top_spin"],
     )
-    # print(f"K_D={K_D}\nK_L={K_L}")
+    K_D = aerodynamic_constant(magnus_data, "drag_coefficient")
+    K_L = aerodynamic_constant(magnus_data, "lift_coefficient")
     # Create Magnus parameters
 
     params = ms.MagnusParameter(
@@ -32,58 +149,303 @@ def run_magnus_simulation(magnus_data):
         azimuth_angle=np.radians(magnus_data["azimuth_angle"]),
         drag_coefficient=K_D,
         lift_coefficient=K_L,
-        spin_rate=magnus_data["spin_rate"],
+        spin_rate=magnus_data["spin_rate"] * RPM,
         is_top_spin=False,
         air_density=magnus_data["air_density"],
         time_step=magnus_data["time_step"],
         duration=magnus_data["duration"],
+        radius=magnus_data["radius"],
+        method=integrator["integrator"],
+        rtol=integrator["rtol"],
+        atol=integrator["atol"],
     )
+    return params, spin_vector
 
-    # Mass of the projectile
-    MASS = 0.43
-    GRAVITY = 9.81
-
-    magnus_force, drag_force, grav_force = params.initial_forces(spin_vector, MASS)
-    trajectory = ms.simulate_trajectory(params, MASS, spin_vector)
-
-    # Extract position data for plotting
-    times = [point.time for point in trajectory]
-    x_positions = [point.position.x for point in trajectory]
-    y_positions = [point.position.y for point in trajectory]
-    z_positions = [point.position.z for point in trajectory]
-    x_velocity = [point.velocity.x for point in trajectory]
-    y_velocity = [point.velocity.y for point in trajectory]
-    z_velocity = [point.velocity.z for point in trajectory]
-    x_acceleration = [point.acceleration.x for point in trajectory]
-    y_acceleration = [point.acceleration.y for point in trajectory]
-    z_acceleration = [point.acceleration.z for point in trajectory]
-
-    magnus_force_magnitude = [
-        np.linalg.norm(
-            [point.forces.magnus.x, point.forces.magnus.y, point.forces.magnus.z]
-        )
-        for point in trajectory
-    ]
-
-    drag_force_magnitude = [
-        np.linalg.norm([point.forces.drag.x, point.forces.drag.y, point.forces.drag.z])
-        for point in trajectory
-    ]
-    gravity_force = [MASS * GRAVITY for _ in magnus_force_magnitude]
-    print(min(z_positions))
-    print(max(z_positions))
+
+def event_specs(magnus_data):
+    # magnus_data["events"] entries look like {"type": "apex"},
+    # {"type": "plane", "x": 11.0} or {"type": "wall", "x": 9.15, "height": 1.8}
+    specs = []
+    for event in magnus_data.get("events", []):
+        if event["type"] == "apex":
+            specs.append(ms.EventSpec.apex())
+        elif event["type"] == "plane":
+            specs.append(ms.EventSpec.plane_x(event["x"]))
+        elif event["type"] == "wall":
+            specs.append(ms.EventSpec.wall(event["x"], event["height"]))
+        else:
+            raise ValueError(f"Unknown event type '{event['type']}'")
+    return specs
+
+
+def event_result(event):
+    return {
+        "name": event.name,
+        "t": event.time,
+        "x": event.position.x,
+        "y": event.position.y,
+        "z": event.position.z,
+        "vx": event.velocity.x,
+        "vy": event.velocity.y,
+        "vz": event.velocity.z,
+        "cleared": event.cleared,
+    }
+
+
+def output_stride(magnus_data):
+    # "output_stride" keeps every n-th point, "max_points" picks the stride
+    # that brings the output under that count
+    if "max_points" in magnus_data:
+        steps = np.ceil(magnus_data["duration"] / magnus_data["time_step"])
+        return max(int(np.ceil(steps / magnus_data["max_points"])), 1)
+    return int(magnus_data.get("output_stride", 1))
+
+
+def parameters_hash(magnus_data):
+    # identifies a flight regardless of its duration, so a final state is only
+    # ever continued with the parameters that produced it
+    identity = {
+        name: float(value) if isinstance(value, (int, float)) else value
+        for name, value in magnus_data.items()
+        if name != "duration"
+    }
+    identity.update(mass=MASS, gravity=GRAVITY, engine=ENGINE, force_model=FORCE_MODEL)
+    encoded = json.dumps(identity, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def final_state(result, magnus_data):
+    # where the run stopped, enough for extend_simulation to continue it
+    state = {name: float(result[name][-1]) for name in RESUME_COLUMNS}
+    state["duration"] = magnus_data["duration"]
+    state["landed"] = any(event["name"] == "ground" for event in result["events"])
+    state["params_hash"] = parameters_hash(magnus_data)
+    return state
+
+
+def integrator_state(state):
+    if state is None:
+        return None
+    return ms.IntegratorState(
+        state["t"],
+        ms.Vec3(state["x"], state["y"], state["z"]),
+        ms.Vec3(state["vx"], state["vy"], state["vz"]),
+    )
+
+
+def stream_magnus_simulation(
+    magnus_data, chunk_size=STREAM_CHUNK_ROWS, initial_state=None
+):
+    # Iterator over (k, 19) trajectory chunks as they are integrated; the
+    # extension works at most two chunks ahead, so memory stays bounded.
+    # Its `stats` and `events` are filled in once it is exhausted.
+    params, spin_vector = magnus_parameters(magnus_data)
+    return ms.stream_trajectory(
+        params,
+        MASS,
+        spin_vector,
+        chunk_size=chunk_size,
+        events=event_specs(magnus_data),
+        output_stride=output_stride(magnus_data),
+        initial_state=integrator_state(initial_state),
+        force_tables=force_tables(),
+    )
+
+
+def run_magnus_simulation(magnus_data, progress=None, chunk=None, initial_state=None):
+    # progress(fraction) is called while integrating; raising from it aborts the run.
+    # chunk(data) receives every streamed (k, 19) block before the run completes.
+    # initial_state (a result's "final_state") starts the flight from there
+    # instead of the launch; the trajectory then begins with that state.
+    with stage("integrate"):
+        if chunk is None:
+            params, spin_vector = magnus_parameters(magnus_data)
+            simulation = ms.simulate_trajectory_arrays(
+                params,
+                MASS,
+                spin_vector,
+                events=event_specs(magnus_data),
+                output_stride=output_stride(magnus_data),
+                progress=progress,
+                initial_state=integrator_state(initial_state),
+                force_tables=force_tables(),
+            )
+            data = simulation.data
+        else:
+            simulation = stream_magnus_simulation(
+                magnus_data, initial_state=initial_state
+            )
+            chunks = []
+            for data in simulation:
+                chunks.append(data)
+                chunk(data)
+                if progress is not None:
+                    progress(data[-1, 0] / magnus_data["duration"])
+            data = np.asfortranarray(np.concatenate(chunks))
+    with stage("marshal"):
+        result = trajectory_result(data)
+    stats = simulation.stats
+    count("integrator_steps", stats.steps)
+    count("rejected_steps", stats.rejected_steps)
+    count("derivative_evaluations", stats.derivative_evaluations)
+    count("points", len(data))
+    result["steps"] = stats.steps
+    result["rejected_steps"] = stats.rejected_steps
+    result["derivative_evaluations"] = stats.derivative_evaluations
+    result["events"] = [event_result(event) for event in simulation.events]
+    result["final_state"] = final_state(result, magnus_data)
+    return result
+
+
+def extend_simulation(result, magnus_data, progress=None, chunk=None):
+    # Continues `result` to the longer magnus_data["duration"] of the same
+    # flight, integrating only the new segment from its final state. Fixed
+    # step runs come out identical to a run of the full duration.
+    state = result["final_state"]
+    if state["params_hash"] != parameters_hash(magnus_data):
+        raise ValueError("Only a run of the same flight can be extended")
+    if magnus_data["duration"] < state["duration"]:
+        raise ValueError("A run can only be extended to a longer duration")
+    if state["landed"]:
+        # nothing happens after the landing
+        return {**result, "final_state": {**state, "duration": magnus_data["duration"]}}
+
+    count("extended_runs")
+    if chunk is not None:
+        chunk(result["trajectory"])
+    segment = run_magnus_simulation(magnus_data, progress, chunk, initial_state=state)
+    # the segment starts with the final state, which the run already ends with
+    trajectory = np.asfortranarray(
+        np.concatenate([result["trajectory"], segment["trajectory"][1:]])
+    )
+    with stage("marshal"):
+        extended = trajectory_result(trajectory)
+    for name in ("steps", "rejected_steps", "derivative_evaluations"):
+        extended[name] = result[name] + segment[name]
+    extended["events"] = result["events"] + segment["events"]
+    extended["final_state"] = segment["final_state"]
+    return extended
+
+
+def run_magnus_summary(magnus_data):
+    params, spin_vector = magnus_parameters(magnus_data)
+    summary = ms.simulate_summary(
+        params,
+        MASS,
+        spin_vector,
+        events=event_specs(magnus_data),
+        force_tables=force_tables(),
+    )
     return {
-        "t": times,
-        "x": x_positions,
-        "y": y_positions,
-        "z": z_positions,
-        "vx": x_velocity,
-        "vy": y_velocity,
-        "vz": z_velocity,
-        "ax": x_acceleration,
-        "ay": y_acceleration,
-        "az": z_acceleration,
-        "fx": drag_force_magnitude,
-        "fy": gravity_force,
-        "fz": magnus_force_magnitude,
+        "flight_time": summary.flight_time,
+        "range": summary.range,
+        "lateral_deviation": summary.lateral_deviation,
+        "apex_time": summary.apex_time,
+        "apex_height": summary.apex_height,
+        "impact_vx": summary.impact_velocity.x,
+        "impact_vy": summary.impact_velocity.y,
+        "impact_vz": summary.impact_velocity.z,
+        "impact_speed": summary.impact_speed,
+        "landed": summary.landed,
+        "events": [event_result(event) for event in summary.events],
     }
+
+
+def run_magnus_sweep(sweep_data, summary_only=False, workers=None, store=None):
+    # Values in sweep_data broadcast against each other (e.g. np.meshgrid output).
+    # Run i of the flat result spans rows offsets[i]:offsets[i + 1].
+    # The extension releases the GIL and spreads launches over `workers` threads.
+    # With a TrajectoryStore the runs are also appended to it under "run_ids".
+    # "integrator", "rtol" and "atol" apply to every launch of the sweep.
+    integrator = {**DEFAULT_INTEGRATOR, **sweep_data}
+    names = [name for name in INPUT_LIMITS if name in sweep_data]
+    columns = np.broadcast_arrays(
+        *(np.asarray(sweep_data[name], dtype=float) for name in names)
+    )
+    sweep_data = {name: column.ravel() for name, column in zip(names, columns)}
+    launches = len(sweep_data["initial_velocity"])
+
+    params_array = np.column_stack(
+        [
+            sweep_data["initial_velocity"],
+            np.radians(sweep_data["elevation_angle"]),
+            np.radians(sweep_data["azimuth_angle"]),
+            aerodynamic_constant(sweep_data, "drag_coefficient"),
+            aerodynamic_constant(sweep_data, "lift_coefficient"),
+            sweep_data["spin_rate"] * RPM,
+            np.zeros(launches),
+            sweep_data["air_density"],
+            sweep_data["time_step"],
+            sweep_data["duration"],
+            sweep_data["radius"],
+        ]
+    )
+    spin_vectors = np.column_stack(
+        [np.zeros(launches), sweep_data["side_spin"], sweep_data["top_spin"]]
+    )
+
+    count("launches", launches)
+    if summary_only:
+        with stage("sweep"):
+            summary = ms.simulate_batch(
+                params_array,
+                MASS,
+                spin_vectors,
+                summary_only=True,
+                workers=workers,
+                force_tables=force_tables(),
+                method=integrator["integrator"],
+                rtol=integrator["rtol"],
+                atol=integrator["atol"],
+            )
+        return {name: summary[:, index] for name, index in SUMMARY_COLUMNS.items()}
+
+    with stage("sweep"):
+        trajectory, offsets = ms.simulate_batch(
+            params_array,
+            MASS,
+            spin_vectors,
+            workers=workers,
+            force_tables=force_tables(),
+            method=integrator["integrator"],
+            rtol=integrator["rtol"],
+            atol=integrator["atol"],
+        )
+    result = trajectory_result(trajectory)
+    result["offsets"] = offsets
+    if store is not None:
+        parameters = [
+            {name: float(sweep_data[name][run]) for name in names}
+            for run in range(launches)
+        ]
+        result["run_ids"] = store.append_runs(trajectory, offsets, parameters)
+    return result
+
+
+def magnitude(vectors):
+    # row norms of an (N, 3) array, without np.linalg.norm's temporaries
+    return np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+
+
+def trajectory_result(trajectory):
+    # Every array is a view of `trajectory` (column-major, so each column is
+    # contiguous) except the two force magnitudes computed from it.
+    result = {
+        name: trajectory[:, TRAJECTORY_COLUMNS[column]]
+        for name, column in RESULT_COLUMNS.items()
+    }
+    for name, column in VECTOR_COLUMNS.items():
+        start = TRAJECTORY_COLUMNS[column]
+        result[name] = trajectory[:, start : start + 3]
+    result["fx"] = magnitude(result["drag_force"])
+    result["fy"] = np.broadcast_to(MASS * GRAVITY, len(trajectory))
+    result["fz"] = magnitude(result["magnus_force"])
+    result["trajectory"] = trajectory
+    return result
+
+
+def slice_result(result, rows):
+    # The rows of a result as views of its arrays, e.g. run i of a sweep with
+    # slice(offsets[i], offsets[i + 1]); nothing is copied or recomputed.
+    names = [*RESULT_COLUMNS, *VECTOR_COLUMNS, "fx", "fy", "fz", "trajectory"]
+    return {name: result[name][rows] for name in names}
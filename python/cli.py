@@ -0,0 +1,296 @@
+"""Headless entry point: runs simulations from parameter files.
+
+    python -m magnus run launch.json -o trajectory.csv
+    python -m magnus summary launches.csv
+    python -m magnus sweep grid.yaml --summary-only -o summary.csv
+    python -m magnus montecarlo launch.yaml -n 100000 --seed 1 --plot cloud.png
+
+Parameter files are JSON, YAML (needs PyYAML) or CSV. A JSON/YAML file holds one
+launch (an object of INPUT_LIMITS values plus optional integrator settings and
+events) or a list of them; a CSV file holds one launch per row. For `sweep`,
+list values in a JSON/YAML file are combined into a full grid. For `montecarlo`,
+any value of a single launch may be a distribution, e.g.
+{"distribution": "normal", "mean": 30, "std": 0.5}.
+
+Qt is never imported, and matplotlib only for --plot.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from config import INPUT_LIMITS
+from python.profiling import profiler
+
+
+def load_parameters(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        rows = np.genfromtxt(file_path, delimiter=",", names=True, ndmin=1)
+        return [{name: float(row[name]) for name in rows.dtype.names} for row in rows]
+    with open(file_path) as f:
+        if extension in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML parameter files need the PyYAML package")
+            return yaml.safe_load(f)
+        if extension == ".json":
+            return json.load(f)
+    raise ValueError(f"Unsupported parameter file '{file_path}'")
+
+
+def launches(parameters):
+    return parameters if isinstance(parameters, list) else [parameters]
+
+
+def check_parameters(magnus_data):
+    missing = [name for name in INPUT_LIMITS if name not in magnus_data]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+    for name, limit in INPUT_LIMITS.items():
+        values = np.asarray(magnus_data[name], dtype=float)
+        if np.any(values < limit["minimum"]) or np.any(values > limit["maximum"]):
+            raise ValueError(
+                f"{limit['parameter']} should be in range "
+                f"[{limit['minimum']} to {limit['maximum']}]{limit['unit']}"
+            )
+
+
+def sweep_columns(parameters):
+    # list values of a single launch form a grid, CSV rows are taken as they are
+    if isinstance(parameters, list):
+        return {
+            name: np.array([launch[name] for launch in parameters], dtype=float)
+            for name in INPUT_LIMITS
+            if name in parameters[0]
+        }
+    axes = {
+        name: np.atleast_1d(np.asarray(parameters[name], dtype=float))
+        for name in INPUT_LIMITS
+        if name in parameters
+    }
+    grid = np.meshgrid(*axes.values(), indexing="ij")
+    return {name: column.ravel() for name, column in zip(axes, grid)}
+
+
+def integrator_settings(parameters):
+    # "integrator", "rtol" and "atol" of a sweep, taken from its first launch
+    from python.calculation import DEFAULT_INTEGRATOR
+
+    launch = launches(parameters)[0]
+    return {name: launch[name] for name in DEFAULT_INTEGRATOR if name in launch}
+
+
+def concatenate(results):
+    # one flat table with run offsets, like run_magnus_sweep returns
+    from python.calculation import trajectory_result
+
+    trajectory = np.concatenate([result["trajectory"] for result in results])
+    lengths = [len(result["trajectory"]) for result in results]
+    combined = trajectory_result(trajectory)
+    combined["offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    return combined
+
+
+def print_records(records):
+    for record in records:
+        print(json.dumps(record))
+
+
+def command_run(args):
+    from python.calculation import run_magnus_simulation
+    from python.table import export_table
+
+    results = []
+    for magnus_data in launches(load_parameters(args.parameters)):
+        check_parameters(magnus_data)
+        start = time.perf_counter()
+        result = run_magnus_simulation(magnus_data)
+        results.append(result)
+        print_records(
+            [
+                {
+                    "run": len(results) - 1,
+                    "points": len(result["t"]),
+                    "steps": result["steps"],
+                    "seconds": round(time.perf_counter() - start, 6),
+                    "flight_time": float(result["t"][-1]),
+                    "range": float(result["x"][-1]),
+                    "apex_height": float(np.max(result["y"])),
+                    "events": result["events"],
+                }
+            ]
+        )
+    if args.output:
+        data = results[0] if len(results) == 1 else concatenate(results)
+        export_table(data, args.output)
+    if args.plot:
+        from python.export import export_plots
+
+        for run, result in enumerate(results):
+            os.makedirs(args.plot, exist_ok=True)
+            export_plots(result, plot_paths(args.plot, run, args.video))
+
+
+def plot_paths(folder, run, video):
+    from config import SAVE_PLOT_NAMES
+
+    return {
+        name: os.path.join(
+            folder,
+            f"{name}_{run}.mp4" if name == "animation_plot" else f"{name}_{run}.png",
+        )
+        for name in SAVE_PLOT_NAMES
+        if video or name != "animation_plot"
+    }
+
+
+def command_summary(args):
+    from python.calculation import run_magnus_summary
+
+    for run, magnus_data in enumerate(launches(load_parameters(args.parameters))):
+        check_parameters(magnus_data)
+        print_records([{"run": run, **run_magnus_summary(magnus_data)}])
+
+
+def command_sweep(args):
+    from python.calculation import run_magnus_sweep
+    from python.table import export_table, write_summary
+
+    parameters = load_parameters(args.parameters)
+    columns = sweep_columns(parameters)
+    check_parameters(columns)
+    store = None
+    if args.store:
+        from python.store import TrajectoryStore
+
+        store = TrajectoryStore(args.store)
+
+    start = time.perf_counter()
+    result = run_magnus_sweep(
+        {**columns, **integrator_settings(parameters)},
+        summary_only=args.summary_only,
+        workers=args.workers,
+        store=store,
+    )
+    elapsed = time.perf_counter() - start
+    runs = len(next(iter(columns.values())))
+    print_records([{"runs": runs, "seconds": round(elapsed, 6)}])
+    if args.output:
+        if args.summary_only:
+            write_summary(args.output, {**columns, **result})
+        else:
+            export_table(result, args.output)
+
+
+def command_montecarlo(args):
+    from python.montecarlo import is_distribution, run_monte_carlo
+
+    launch = load_parameters(args.parameters)
+    if isinstance(launch, list):
+        raise ValueError("montecarlo takes a single launch")
+    # distributions are clamped to the limits, only fixed values are checked
+    check_parameters(
+        {
+            name: INPUT_LIMITS[name]["minimum"] if is_distribution(value) else value
+            for name, value in launch.items()
+            if name in INPUT_LIMITS
+        }
+    )
+    start = time.perf_counter()
+    result = run_monte_carlo(
+        launch,
+        args.samples,
+        seed=args.seed,
+        confidence=args.confidence,
+        workers=args.workers,
+    )
+    record = {key: value for key, value in result.items() if key != "points"}
+    print_records([{**record, "seconds": round(time.perf_counter() - start, 6)}])
+    if args.plot:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from config import EXPORT_DPI
+        from python.figures import dispersion_figure
+
+        figure = dispersion_figure(result)
+        FigureCanvasAgg(figure)
+        figure.savefig(args.plot, dpi=EXPORT_DPI)
+
+
+def parser():
+    parser = argparse.ArgumentParser(prog="magnus", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profile", metavar="FILE", help="write a Chrome trace of the stages"
+    )
+    parser.add_argument(
+        "--engine", choices=["rust", "numpy"], help="simulation engine to use"
+    )
+    parser.add_argument(
+        "--force-model",
+        choices=["constant", "tables"],
+        help="constant drag and lift coefficients or tabulated aerodynamics",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="simulate launches and keep trajectories")
+    run.add_argument("parameters")
+    run.add_argument("-o", "--output", help=".csv, .npz or .parquet trajectory table")
+    run.add_argument("--plot", metavar="FOLDER", help="save the plots of every run")
+    run.add_argument(
+        "--video", action="store_true", help="with --plot, also the animation"
+    )
+    run.set_defaults(handler=command_run)
+
+    summary = commands.add_parser("summary", help="print flight summaries only")
+    summary.add_argument("parameters")
+    summary.set_defaults(handler=command_summary)
+
+    sweep = commands.add_parser("sweep", help="simulate a grid of launches in parallel")
+    sweep.add_argument("parameters")
+    sweep.add_argument("-o", "--output", help=".csv, .npz or .parquet table")
+    sweep.add_argument("--summary-only", action="store_true")
+    sweep.add_argument("--workers", type=int)
+    sweep.add_argument(
+        "--store", metavar="FOLDER", help="append runs to a trajectory store"
+    )
+    sweep.set_defaults(handler=command_sweep)
+
+    montecarlo = commands.add_parser(
+        "montecarlo", help="landing dispersion of randomised launches"
+    )
+    montecarlo.add_argument("parameters")
+    montecarlo.add_argument("-n", "--samples", type=int, default=10000)
+    montecarlo.add_argument("--seed", type=int, help="seed for reproducible runs")
+    montecarlo.add_argument("--confidence", type=float, default=0.95)
+    montecarlo.add_argument("--workers", type=int)
+    montecarlo.add_argument("--plot", metavar="FILE", help="save the dispersion cloud")
+    montecarlo.set_defaults(handler=command_montecarlo)
+    return parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    if args.profile:
+        profiler.enable()
+    try:
+        if args.engine:
+            from python.calculation import use_engine
+
+            use_engine(args.engine)
+        if args.force_model:
+            from python.calculation import use_force_model
+
+            use_force_model(args.force_model)
+        args.handler(args)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"magnus: {e}", file=sys.stderr)
+        return 1
+    if args.profile:
+        profiler.save_chrome_trace(args.profile)
+        print(json.dumps({"profile": profiler.report()}), file=sys.stderr)
+    return 0
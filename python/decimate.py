@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def minmax_indices(values, buckets):
+    # First, last and the min/max of every bucket: keeps the envelope of a
+    # time series exactly, so the drawn line looks the same.
+    count = len(values)
+    if count <= 2 * buckets + 2:
+        return np.arange(count)
+    size = -(-count // buckets)
+    buckets = -(-count // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:count] = values
+    blocks = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    indices = np.concatenate(
+        [
+            np.nanargmin(blocks, axis=1) + offsets,
+            np.nanargmax(blocks, axis=1) + offsets,
+            [0, count - 1],
+        ]
+    )
+    return np.unique(indices)
+
+
+def lttb_indices(points, threshold):
+    # Largest-Triangle-Three-Buckets over (N, D) points, every dimension
+    # scaled to [0, 1] so a 3D curve is not dominated by its longest axis.
+    points = np.asarray(points, dtype=float)
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+    span = np.ptp(points, axis=0)
+    span[span == 0] = 1
+    points = (points - points.min(axis=0)) / span
+
+    edges = np.linspace(1, count - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0], indices[-1] = 0, count - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        average = points[end:next_end].mean(axis=0)
+        to_candidates = points[start:end] - points[selected]
+        to_average = average - points[selected]
+        # squared triangle area up to a constant, valid in any dimension
+        area = (to_candidates**2).sum(axis=1) * (to_average**2).sum() - (
+            to_candidates @ to_average
+        ) ** 2
+        selected = start + np.argmax(area)
+        indices[bucket + 1] = selected
+    return indices
+
+
+def decimate_series(x, y, z, max_points):
+    # 2D series (empty z) are decimated per bucket of y, 3D curves with LTTB
+    if len(x) <= max_points:
+        return x, y, z
+    if isinstance(z, str):
+        indices = minmax_indices(np.asarray(y), max_points // 2)
+        return np.asarray(x)[indices], np.asarray(y)[indices], z
+    indices = lttb_indices(np.column_stack([x, y, z]), max_points)
+    return np.asarray(x)[indices], np.asarray(y)[indices], np.asarray(z)[indices]
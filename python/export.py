@@ -0,0 +1,184 @@
+# Off-screen export of the plot tabs. Static figures are rebuilt from the data
+# and saved by worker processes; the animation is drawn with Agg and its frames
+# are piped to ffmpeg. Nothing here touches the on-screen canvases or Qt.
+import multiprocessing
+import os
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from config import (
+    SAVE_PLOT_NAMES,
+    PLOT_MAX_POINTS,
+    EXPORT_DPI,
+    EXPORT_VIDEO_FPS,
+    EXPORT_VIDEO_DPI,
+    EXPORT_VIDEO_BITRATE,
+)
+from python.decimate import decimate_series
+from python.figures import (
+    build_figure,
+    canvas_values,
+    set_limits,
+    set_line_data,
+    animation_frames,
+    animation_positions,
+)
+
+VIDEO_PLOT = "animation_plot"
+
+
+def render_figure(index, values, file_path, dpi=EXPORT_DPI):
+    figure, axes, lines, column = build_figure(index)
+    for ax, line, (x, y, z) in zip(axes, lines, values):
+        set_limits(ax, x, y, z, column)
+        set_line_data(line, x, y, z, column)
+    figure.savefig(file_path, dpi=dpi, bbox_inches="tight")
+    return file_path
+
+
+def encoder_command(file_path, width, height, fps, bitrate):
+    return [
+        matplotlib.rcParams["animation.ffmpeg_path"],
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgba",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(fps),
+        "-i",
+        "-",
+        # libx264 with yuv420p needs even dimensions
+        "-vf",
+        "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        "-b:v",
+        f"{bitrate}k",
+        file_path,
+    ]
+
+
+def write_video(
+    calculated_data,
+    file_path,
+    progress=None,
+    fps=EXPORT_VIDEO_FPS,
+    dpi=EXPORT_VIDEO_DPI,
+    bitrate=EXPORT_VIDEO_BITRATE,
+):
+    # progress(fraction) is called after every frame; raising from it aborts
+    positions, t = animation_positions(calculated_data)
+    frame_ends = animation_frames(t, fps)
+    figure, (ax,), (line,), column = build_figure(
+        list(SAVE_PLOT_NAMES).index(VIDEO_PLOT)
+    )
+    set_limits(ax, *positions, column)
+    figure.set_dpi(dpi)
+    canvas = FigureCanvasAgg(figure)
+
+    # the axes are drawn once; every frame restores them and draws only the line
+    line.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(figure.bbox)
+    width, height = canvas.get_width_height(physical=True)
+
+    try:
+        encoder = subprocess.Popen(
+            encoder_command(file_path, width, height, fps, bitrate),
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is required to save the animation")
+    try:
+        for frame, end in enumerate(frame_ends, start=1):
+            canvas.restore_region(background)
+            line.set_data_3d(positions[0, :end], positions[1, :end], positions[2, :end])
+            ax.draw_artist(line)
+            encoder.stdin.write(canvas.buffer_rgba())
+            if progress is not None:
+                progress(frame / len(frame_ends))
+        encoder.stdin.close()
+        error = encoder.stderr.read().decode(errors="replace")
+    except BaseException:
+        encoder.kill()
+        encoder.wait()
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    if encoder.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed: {error.strip()}")
+    return file_path
+
+
+def export_plots(calculated_data, file_paths, progress=None, workers=None):
+    # file_paths maps SAVE_PLOT_NAMES keys to output files; the video is encoded
+    # here while worker processes save the static figures. On any error or
+    # cancellation (progress raising) the files written so far are removed.
+    names = list(SAVE_PLOT_NAMES)
+    values = canvas_values(calculated_data)
+    figures = {
+        names.index(name): file_path
+        for name, file_path in file_paths.items()
+        if name != VIDEO_PLOT
+    }
+    parts = len(figures) + (VIDEO_PLOT in file_paths)
+    video_fraction = 0.0
+
+    def report(futures):
+        if progress is not None:
+            done = sum(future.done() for future in futures)
+            progress((done + video_fraction) / parts)
+
+    def video_progress(fraction):
+        nonlocal video_fraction
+        video_fraction = fraction
+        report(futures)
+
+    # spawned workers start clean instead of inheriting the GUI's threads
+    context = multiprocessing.get_context("spawn")
+    workers = workers or min(len(figures), os.cpu_count() or 1) or 1
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            try:
+                futures = [
+                    pool.submit(
+                        render_figure,
+                        index,
+                        # only the plotted points are sent to the workers
+                        [
+                            decimate_series(*series, PLOT_MAX_POINTS)
+                            for series in values[index]
+                        ],
+                        file_path,
+                    )
+                    for index, file_path in figures.items()
+                ]
+                if VIDEO_PLOT in file_paths:
+                    write_video(calculated_data, file_paths[VIDEO_PLOT], video_progress)
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(
+                        pending, timeout=0.1, return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        future.result()
+                    report(futures)
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+    except BaseException:
+        for file_path in file_paths.values():
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        raise
+    return file_paths
@@ -0,0 +1,217 @@
+# Figure building shared by the Qt canvases and the off-screen exporter.
+# Nothing here may import Qt: export worker processes import this module.
+import numpy as np
+import matplotlib.style
+from matplotlib.figure import Figure
+from config import (
+    PLOT_CONFIG,
+    LINE_COLORS,
+    PLOT_TEXT_COLORS,
+    PLOT_FONT_SIZES,
+    PLOT_MARGIN_MIN,
+    PLOT_MARGIN_MAX,
+    PLOT_MAX_POINTS,
+)
+from python.decimate import decimate_series, lttb_indices
+
+PLOT_STYLE = "seaborn-v0_8-whitegrid"
+
+# canvas name: (figure attribute, axes attribute, rows, columns), in tab order
+CANVAS_LAYOUT = {
+    "trajectory_canvas": ("trajectory_figure", "trajectory_axes", 1, 1),
+    "velocity_canvas": ("velocity_figure", "velocity_axes", 1, 3),
+    "acceleration_canvas": ("acceleration_figure", "acceleration_axes", 1, 3),
+    "force_canvas": ("force_figure", "force_axes", 1, 3),
+    "animation_canvas": ("animation_figure", "animation_axes", 1, 1),
+}
+
+
+def as_list(axes):
+    if not isinstance(axes, (list, np.ndarray)):
+        return [axes]
+    return axes
+
+
+def new_figure(row, column):
+    matplotlib.style.use(PLOT_STYLE)
+    if column == 1:
+        figure = Figure(constrained_layout=True)
+        axes = figure.add_subplot(projection="3d")
+    else:
+        figure = Figure(figsize=(20, 10), constrained_layout=True)
+        axes = figure.subplots(row, column)
+    return figure, axes
+
+
+def design_axes(axes, plot_group, column, line_color):
+    # styles every axes of a figure and returns one empty line per axes
+    lines = []
+    for ax, plot_info in zip(as_list(axes), plot_group):
+        if column == 1:
+            (line,) = ax.plot([], [], [], linewidth=2.2, color=line_color)
+        else:
+            (line,) = ax.plot([], [], linewidth=2.2, color=line_color)
+        lines.append(line)
+        if column == 1:
+            ax.set_zlabel(
+                plot_info["z_label"],
+                color=PLOT_TEXT_COLORS["label"],
+                fontsize=PLOT_FONT_SIZES["label"],
+            )
+        ax.set_title(
+            plot_info["title"],
+            color=PLOT_TEXT_COLORS["title"],
+            fontsize=PLOT_FONT_SIZES["title"],
+        )
+        ax.set_xlabel(
+            plot_info["x_label"],
+            color=PLOT_TEXT_COLORS["label"],
+            fontsize=PLOT_FONT_SIZES["label"],
+        )
+        ax.set_ylabel(
+            plot_info["y_label"],
+            color=PLOT_TEXT_COLORS["label"],
+            fontsize=PLOT_FONT_SIZES["label"],
+        )
+        ax.tick_params(
+            axis="both",
+            colors=PLOT_TEXT_COLORS["ticks"],
+            labelsize=PLOT_FONT_SIZES["ticks"],
+        )
+        ax.grid(
+            True,
+            color=PLOT_TEXT_COLORS["grid"],
+            linewidth=0.8,
+        )
+    return lines
+
+
+def build_figure(index):
+    # stand-alone figure of plot tab `index`, as drawn on screen
+    row, column = list(CANVAS_LAYOUT.values())[index][2:]
+    line_color = list(LINE_COLORS.values())[index]
+    figure, axes = new_figure(row, column)
+    lines = design_axes(axes, PLOT_CONFIG[index], column, line_color)
+    return figure, as_list(axes), lines, column
+
+
+def canvas_values(calculated_data):
+    t = calculated_data["t"]
+    return [
+        # Trajectory (3D)
+        [(calculated_data["x"], calculated_data["z"], calculated_data["y"])],
+        # Velocity vs Time (2D)
+        [
+            (t, calculated_data["vx"], ""),
+            (t, calculated_data["vy"], ""),
+            (t, calculated_data["vz"], ""),
+        ],
+        # Acceleration vs Time (2D)
+        [
+            (t, calculated_data["ax"], ""),
+            (t, calculated_data["ay"], ""),
+            (t, calculated_data["az"], ""),
+        ],
+        # Force vs Time (2D)
+        [
+            (t, calculated_data["fx"], ""),
+            (t, calculated_data["fy"], ""),
+            (t, calculated_data["fz"], ""),
+        ],
+        # Animation (3D)
+        [(calculated_data["x"], calculated_data["z"], calculated_data["y"])],
+    ]
+
+
+def set_limits(ax, x, y, z, column):
+    ax.set_xlim(np.min(x) * PLOT_MARGIN_MIN, np.max(x) * PLOT_MARGIN_MAX)
+    ax.set_ylim(-10, 10)
+    if column == 1:
+        # ax.view_init(elev=90, azim=-90)  # top-down view
+        # ax.set_box_aspect([1, 1, 1])
+        ax.set_zlim(np.min(z) * PLOT_MARGIN_MIN, np.max(z) * PLOT_MARGIN_MAX)
+
+
+def set_line_data(line, x, y, z, column):
+    x, y, z = decimate_series(x, y, z, PLOT_MAX_POINTS)
+    if column == 1:
+        line.set_data_3d(x, y, z)
+    else:
+        line.set_data(x, y)
+
+
+def extend_line(points, new_points, max_points=PLOT_MAX_POINTS):
+    # appends (x, y, z) arrays to a 3D line that is already decimated to
+    # max_points and decimates the result again, so a streamed line costs
+    # O(max_points + new points) per update instead of the whole run so far
+    x, y, z = (np.concatenate(parts) for parts in zip(points, new_points))
+    return decimate_series(x, y, z, max_points)
+
+
+def animation_frames(t, fps):
+    # one frame per 1/fps seconds of flight; frame i shows the points up to ends[i]
+    frames = max(int(np.ceil((t[-1] - t[0]) * fps)), 1) + 1
+    return np.searchsorted(t, np.linspace(t[0], t[-1], frames), side="right")
+
+
+def animation_positions(calculated_data):
+    # (3, N) block of plotted positions and their times, decimated for long flights
+    t = calculated_data["t"]
+    x = calculated_data["x"]
+    y = calculated_data["z"]
+    z = calculated_data["y"]
+    indices = np.arange(len(t))
+    if len(t) > PLOT_MAX_POINTS:
+        indices = lttb_indices(np.column_stack([x, y, z]), PLOT_MAX_POINTS)
+    return np.stack([x[indices], y[indices], z[indices]]), t[indices]
+
+
+def dispersion_figure(result):
+    # landing points of a Monte Carlo run with their mean and confidence ellipse
+    from matplotlib.patches import Ellipse
+
+    matplotlib.style.use(PLOT_STYLE)
+    figure = Figure(constrained_layout=True)
+    ax = figure.add_subplot()
+    points = result["points"]
+    ax.scatter(
+        points[:, 0], points[:, 1], s=4, alpha=0.4, color=LINE_COLORS["trajectory"]
+    )
+    mean = list(result["mean"].values())
+    ax.plot(*mean, marker="+", markersize=12, color=LINE_COLORS["force"])
+    ellipse = result.get("ellipse")
+    if ellipse is not None:
+        ax.add_patch(
+            Ellipse(
+                ellipse["center"],
+                ellipse["width"],
+                ellipse["height"],
+                angle=ellipse["angle"],
+                fill=False,
+                linewidth=2.2,
+                color=LINE_COLORS["force"],
+                label=f"{ellipse['confidence']:.0%} confidence",
+            )
+        )
+        ax.legend(fontsize=PLOT_FONT_SIZES["ticks"])
+    ax.set_title(
+        f"Landing Dispersion ({result['landed']} of {result['samples']} landed)",
+        color=PLOT_TEXT_COLORS["title"],
+        fontsize=PLOT_FONT_SIZES["title"],
+    )
+    for set_label, label in [
+        (ax.set_xlabel, "Range (m)"),
+        (ax.set_ylabel, "Lateral Deviation (m)"),
+    ]:
+        set_label(
+            label,
+            color=PLOT_TEXT_COLORS["label"],
+            fontsize=PLOT_FONT_SIZES["label"],
+        )
+    ax.tick_params(
+        axis="both",
+        colors=PLOT_TEXT_COLORS["ticks"],
+        labelsize=PLOT_FONT_SIZES["ticks"],
+    )
+    ax.set_aspect("equal", adjustable="datalim")
+    return figure
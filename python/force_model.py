@@ -0,0 +1,64 @@
+# Default curves of the "tables" force model, sampled once on uniform grids into
+# an engine's ForceTables that every launch of a run or sweep shares. Drag
+# follows a smoothed drag crisis (Cd falls from 0.47 to 0.15 around Re 2.5e5),
+# lift the saturating fit Cl = S / (2.32 S + 0.4) of the spin ratio S, density
+# the ISA troposphere above LAUNCH_ALTITUDE and spin an exponential decay.
+import numpy as np
+
+from config import (
+    AIR_VISCOSITY,
+    FORCE_TABLE_POINTS,
+    INPUT_LIMITS,
+    LAUNCH_ALTITUDE,
+    SPIN_DECAY_TIME,
+)
+
+# grid ranges; lookups outside them take the value at the nearest end
+REYNOLDS_RANGE = (0.0, 2e6)
+SPIN_RATIO_RANGE = (0.0, 2.0)
+HEIGHT_RANGE = (-100.0, 2000.0)
+TIME_RANGE = (0.0, INPUT_LIMITS["duration"]["maximum"])
+
+# ISA troposphere: temperature lapse over the sea level temperature (1/m) and
+# the exponent of the density ratio
+ISA_LAPSE = 0.0065 / 288.15
+ISA_EXPONENT = 4.2559
+
+
+def drag_coefficient(reynolds):
+    return 0.15 + 0.32 / (1 + (reynolds / 2.5e5) ** 6)
+
+
+def lift_coefficient(spin_ratio):
+    return spin_ratio / (2.32 * spin_ratio + 0.4)
+
+
+def density_ratio(height):
+    # air density at `height` above the launch relative to the launch
+    def isa(altitude):
+        return (1 - ISA_LAPSE * altitude) ** ISA_EXPONENT
+
+    return isa(LAUNCH_ALTITUDE + height) / isa(LAUNCH_ALTITUDE)
+
+
+def spin_fraction(time):
+    return np.exp(-time / SPIN_DECAY_TIME)
+
+
+def build_tables(engine, points=FORCE_TABLE_POINTS):
+    # ForceTables of `engine` (the extension or the NumPy engine module)
+    reynolds = np.linspace(*REYNOLDS_RANGE, points)
+    spin_ratio = np.linspace(*SPIN_RATIO_RANGE, points)
+    height = np.linspace(*HEIGHT_RANGE, points)
+    time = np.linspace(*TIME_RANGE, points)
+    return engine.ForceTables(
+        reynolds.tolist(),
+        drag_coefficient(reynolds).tolist(),
+        spin_ratio.tolist(),
+        lift_coefficient(spin_ratio).tolist(),
+        height.tolist(),
+        density_ratio(height).tolist(),
+        time.tolist(),
+        spin_fraction(time).tolist(),
+        viscosity=AIR_VISCOSITY,
+    )
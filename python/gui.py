@@ -1,15 +1,48 @@
-from PyQt5.QtWidgets import *
+from PyQt5.QtWidgets import (
+    QAction,
+    QApplication,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QMainWindow,
+    QMenu,
+    QProgressBar,
+    QPushButton,
+    QRadioButton,
+    QScrollArea,
+    QTabWidget,
+    QToolBar,
+    QToolButton,
+    QVBoxLayout,
+    QWidget,
+)
 from PyQt5.QtGui import QIcon, QPixmap
-from PyQt5.QtCore import Qt, QSize, QThread
-from python.utilis import default_msg, simulate_data
-from python.plot import design_canvas, reset_canvas
+from PyQt5.QtCore import Qt, QSize
+from python.utilis import (
+    default_msg,
+    simulate_data,
+    show_partial,
+    show_results,
+    show_stored_run,
+    simulation_failed,
+)
+from python.worker import ExportJob, SimulationRunner
+from python.profiling import profiler
 from config import INPUT_PARAMETERS, SAVE_PLOT_NAMES
-from matplotlib.animation import FFMpegWriter
+import argparse
 import os
 
-app = QApplication([])
-with open("styles/style.qss", "r") as f:
-    app.setStyleSheet(f.read())
+# matplotlib, numpy and the simulation extension are imported on first use:
+# the plot canvases when the first result arrives, the rest by their actions
+
+# icons and styles are looked up next to the repository, not the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def resource(path):
+    return os.path.join(ROOT, path)
 
 
 class SpinFlight(QMainWindow):
@@ -23,19 +56,29 @@ class SpinFlight(QMainWindow):
         self.file_paths = []
         plot_buffer = {}
         self.add_toolbar()
-        design_canvas(self)
         self.add_center()
         self.make_input_labels()
         self.add_status_bar()
+        self.runner = SimulationRunner(self)
+        self.export_job = None
+        self.target_panel = None
+        self.runner.progress.connect(self.simulation_progress.setValue)
+        self.runner.partial.connect(lambda chunks: show_partial(self, chunks))
+        self.runner.completed.connect(lambda data: show_results(self, data))
+        self.runner.failed.connect(lambda message: simulation_failed(self, message))
         self.simulate_btn.triggered.connect(self.simulate)
+        self.stop_btn.triggered.connect(self.stop_simulation)
         self.reset_btn.triggered.connect(self.reset_button)
         self.save_btn.triggered.connect(self.save_plot)
+        self.csv_btn.triggered.connect(self.export_data)
+        self.runs_btn.triggered.connect(self.browse_runs)
+        self.target_btn.triggered.connect(self.open_target_panel)
 
     def set_window(self):
         self.setWindowTitle("SpinFlight")
-        self.setWindowIcon(QIcon("icons/ball.svg"))
+        self.setWindowIcon(QIcon(resource("icons/ball.svg")))
         self.setIconSize(QSize(30, 30))
-        screen = app.primaryScreen()
+        screen = QApplication.primaryScreen()
         screen_size = screen.size()
         self.screen_width = screen_size.width()
         self.screen_height = screen_size.height()
@@ -50,7 +93,11 @@ class SpinFlight(QMainWindow):
         self.addToolBar(self.toolbar)
         self.toolbar_btn = {
             "simulate_btn": ["Simulate", "Start Simulation"],
+            "stop_btn": ["Stop", "Stop Running Simulation"],
             "reset_btn": ["Reset", "Reset All Data"],
+            "runs_btn": ["Runs", "Browse Stored Runs"],
+            "target_btn": ["Target", "Solve Launch Inputs for a Target"],
+            "profile_btn": ["Profile", "Stage Timings and Counters"],
             "export_btn": ["Export", "Save Data"],
         }
         self.add_buttons()
@@ -60,6 +107,8 @@ class SpinFlight(QMainWindow):
             action = QAction(button_label, self)
             if button_name == "export_btn":
                 self.add_export_menu(action)
+            if button_name == "profile_btn":
+                self.add_profile_menu(action)
             action.setToolTip(button_status)
             setattr(self, button_name, action)
             self.toolbar.addAction(action)
@@ -80,6 +129,35 @@ class SpinFlight(QMainWindow):
         menu.addAction(csv_btn)
         action.setMenu(menu)
 
+    def add_profile_menu(self, action):
+        menu = QMenu()
+        menu.setCursor(Qt.PointingHandCursor)
+        record_btn = QAction("Record Timings")
+        record_btn.setCheckable(True)
+        record_btn.setChecked(profiler.enabled)
+        record_btn.toggled.connect(profiler.enable)
+        json_btn = QAction("Save Timings (JSON)")
+        json_btn.triggered.connect(lambda: self.save_profile(profiler.save_json))
+        trace_btn = QAction("Save Chrome Trace")
+        trace_btn.triggered.connect(
+            lambda: self.save_profile(profiler.save_chrome_trace)
+        )
+        clear_btn = QAction("Clear Timings")
+        clear_btn.triggered.connect(profiler.clear)
+        self.profile_actions = [record_btn, json_btn, trace_btn, clear_btn]
+        for profile_action in self.profile_actions:
+            menu.addAction(profile_action)
+        action.setMenu(menu)
+
+    def save_profile(self, save):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save Profile", "profile.json", "JSON (*.json)"
+        )
+        if file_path:
+            save(file_path)
+            self.status.showMessage(f"Profile saved to {file_path}", 3000)
+            default_msg(self)
+
     def get_unique_file_path(self, folder, filename):
         base_name, extension = os.path.splitext(filename)
         file_path = os.path.join(folder, filename)
@@ -90,63 +168,137 @@ class SpinFlight(QMainWindow):
         return file_path
 
     def save_plot(self):
-        if not self.magnus_data:
+        if not self.magnus_data or not hasattr(self, "calculated_data"):
             self.status.showMessage(
                 "No plots available to save! Please generate a plot first."
             )
             default_msg(self)
             return
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setVisible(False)
-        self.status.addPermanentWidget(self.progress_bar)
-        self.progress_bar.setFixedHeight(17)
+        if self.export_job is not None:
+            self.status.showMessage("Plots are already being saved!", 3000)
+            return
 
         folder = QFileDialog.getExistingDirectory(
             self,
             "Select Export Folder",
         )
         if folder:
-            self.progress_bar.setVisible(True)
-            for button_name in self.toolbar_btn:
-                getattr(self, button_name).setEnabled(False)
-            for i, (plot_name, figure) in enumerate(SAVE_PLOT_NAMES.items(), start=1):
-                if plot_name == "animation_plot":
-                    filename = f"{plot_name}.mp4"
-                    file_path = self.get_unique_file_path(folder, filename)
-                    writer = FFMpegWriter(fps=60, bitrate=3000)
-                    self.status.showMessage(f"Saving Plot 5 of 5.....")
-
-                    def progress_callback(current_frame, total_frames):
-                        animation_percent = int((current_frame / total_frames) * 20)
-                        total_percent = 80 + animation_percent
-                        self.progress_bar.setValue(total_percent)
-                        QApplication.processEvents()
-
-                    self.animation.save(
-                        file_path, writer=writer, progress_callback=progress_callback
-                    )
-                    continue
-                filename = f"{plot_name}.png"
-                file_path = self.get_unique_file_path(folder, filename)
-                self.show_progress(i)
-                getattr(self, figure).savefig(file_path, dpi=300, bbox_inches="tight")
-
-            for button_name in self.toolbar_btn:
-                getattr(self, button_name).setEnabled(True)
-            self.status.showMessage("Plots have been saved sucessfully!!", 3000)
-            self.progress_bar.setVisible(False)
-            default_msg(self)
+            file_paths = {
+                plot_name: self.get_unique_file_path(
+                    folder,
+                    (
+                        f"{plot_name}.mp4"
+                        if plot_name == "animation_plot"
+                        else f"{plot_name}.png"
+                    ),
+                )
+                for plot_name in SAVE_PLOT_NAMES
+            }
+            from python.export import export_plots
+
+            self.start_export(
+                ExportJob(export_plots, self.calculated_data, file_paths, self),
+                "Saving Plots.....",
+                "Plots have been saved sucessfully!!",
+            )
         else:
             self.status.showMessage("Please Select a folder to save!!")
             default_msg(self)
 
-    def show_progress(self, i):
-        percent = int((i / 5) * 100)
-        self.progress_bar.setValue(percent)
-        self.status.showMessage(f"Saving Plot {i} of 5.....")
-        QApplication.processEvents()
+    def export_data(self):
+        if not hasattr(self, "calculated_data"):
+            self.status.showMessage(
+                "No data available to export! Please run a simulation first."
+            )
+            default_msg(self)
+            return
+        if self.export_job is not None:
+            self.status.showMessage("Data is already being exported!", 3000)
+            return
+
+        from python.table import export_table, table_formats
+
+        formats = table_formats()
+        file_path, selected_format = QFileDialog.getSaveFileName(
+            self,
+            "Export Data",
+            "trajectory.csv",
+            ";;".join(formats),
+        )
+        if file_path:
+            if os.path.splitext(file_path)[1].lower() not in formats.values():
+                file_path += formats.get(selected_format, ".csv")
+            self.start_export(
+                ExportJob(export_table, self.calculated_data, file_path, self),
+                "Exporting Data.....",
+                "Data has been exported sucessfully!!",
+            )
+        else:
+            self.status.showMessage("Please Select a file to export to!!")
+            default_msg(self)
+
+    def browse_runs(self):
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Select Trajectory Store",
+        )
+        if not folder:
+            return
+        from python.store import TrajectoryStore
+        from python.browser import RunBrowser
+
+        try:
+            store = TrajectoryStore(folder)
+        except (OSError, ValueError) as e:
+            self.status.showMessage(str(e), 3000)
+            default_msg(self)
+            return
+        if not len(store):
+            self.status.showMessage("No stored runs found in this folder!", 3000)
+            default_msg(self)
+            return
+        browser = RunBrowser(store, self)
+        if browser.exec_() == QDialog.Accepted:
+            show_stored_run(self, store, browser.selected_run)
+
+    def open_target_panel(self):
+        if self.target_panel is None:
+            from python.target_panel import TargetPanel
+
+            self.target_panel = TargetPanel(self)
+        self.target_panel.show()
+        self.target_panel.raise_()
+
+    def start_export(self, job, running_message, completed_message):
+        self.export_job = job
+        job.progress.connect(self.progress_bar.setValue)
+        job.completed.connect(lambda _: self.export_completed(completed_message))
+        job.failed.connect(self.export_failed)
+        job.finished.connect(self.export_finished)
+        for button_name in self.toolbar_btn:
+            getattr(self, button_name).setEnabled(button_name == "stop_btn")
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status.showMessage(running_message)
+        job.start()
+
+    def export_completed(self, message):
+        self.status.showMessage(message, 3000)
+        default_msg(self)
+
+    def export_failed(self, message):
+        self.status.showMessage(message, 3000)
+        default_msg(self)
+
+    def export_finished(self):
+        if self.export_job.cancelled:
+            self.status.showMessage("Export stopped", 3000)
+            default_msg(self)
+        self.export_job.deleteLater()
+        self.export_job = None
+        for button_name in self.toolbar_btn:
+            getattr(self, button_name).setEnabled(True)
+        self.progress_bar.setVisible(False)
 
     def add_center(self):
         central_widget = QWidget()
@@ -159,6 +311,8 @@ class SpinFlight(QMainWindow):
         input_area.setWidgetResizable(True)
 
         plot_area = QTabWidget()
+        self.plot_tabs = plot_area
+        plot_area.currentChanged.connect(self.tab_changed)
         self.plot_layout = QVBoxLayout()
         self.plot_layout.addWidget(plot_area)
 
@@ -170,7 +324,7 @@ class SpinFlight(QMainWindow):
 
         app_icon_label = QLabel()
         app_icon = QPixmap()
-        app_icon.load("icons/ball.svg")
+        app_icon.load(resource("icons/ball.svg"))
         app_icon_width = int(self.screen_width * 0.2)
         app_icon_height = int(self.screen_height * 0.2)
         scaled_icon = app_icon.scaled(
@@ -192,7 +346,6 @@ class SpinFlight(QMainWindow):
         self.layout.setStretch(0, 2)
         self.layout.setStretch(1, 7)
         self.add_inputs(input_area)
-        self.add_tabs(plot_area)
 
     def add_inputs(self, input_area):
         input_widget = QWidget()
@@ -215,6 +368,13 @@ class SpinFlight(QMainWindow):
         self.input_layout.addStretch()
         input_area.setWidget(input_widget)
 
+    def tab_changed(self):
+        # the canvases only exist once the first result has been shown
+        if hasattr(self, "canvas"):
+            from python.plot import draw_visible_canvas
+
+            draw_visible_canvas(self)
+
     def add_tabs(self, plot_area):
         tabs = ["Trajectory", "Velocity", "Acceleration", "Force", "Animation"]
         for tab_name, canvas_name in zip(tabs, self.canvas):
@@ -285,10 +445,20 @@ class SpinFlight(QMainWindow):
     def add_status_bar(self):
         self.status = self.statusBar()
         self.status.showMessage("Welcome to SpinFlight!!!")
+        self.simulation_progress = QProgressBar()
+        self.simulation_progress.setRange(0, 100)
+        self.simulation_progress.setFixedHeight(17)
+        self.simulation_progress.setVisible(False)
+        self.status.addPermanentWidget(self.simulation_progress)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedHeight(17)
+        self.progress_bar.setVisible(False)
+        self.status.addPermanentWidget(self.progress_bar)
 
     def btn_clicked(self, input_parameter):
         is_visible = input_parameter["is_visible"]
-        button = app.sender()
+        button = self.sender()
         button_text = button.text()
 
         for label, text_field in self.collapsible_inputs[button_text]:
@@ -311,11 +481,26 @@ class SpinFlight(QMainWindow):
                 lineedit.setText("0")
 
     def simulate(self):
-        reset_canvas(self)
         simulate_data(self)
 
+    def stop_simulation(self):
+        if self.export_job is not None:
+            self.export_job.cancel()
+            return
+        if not self.runner.is_busy():
+            return
+        self.runner.cancel()
+        self.simulation_progress.setVisible(False)
+        self.status.showMessage("Simulation stopped", 3000)
+        default_msg(self)
+
     def reset_button(self):
-        reset_canvas(self)
+        self.runner.cancel()
+        self.simulation_progress.setVisible(False)
+        if hasattr(self, "canvas"):
+            from python.plot import reset_canvas
+
+            reset_canvas(self)
         self.magnus_data = {}
         for input_fields in self.simulation_inputs.values():
             for label, text_field in input_fields.items():
@@ -328,7 +513,24 @@ class SpinFlight(QMainWindow):
         default_msg(self)
 
 
-def main():
+def create_app():
+    app = QApplication.instance() or QApplication([])
+    with open(resource("styles/style.qss"), "r") as f:
+        app.setStyleSheet(f.read())
+    return app
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description="SpinFlight")
+    arguments.add_argument(
+        "--cache-dir", metavar="FOLDER", help="keep simulation results on disk"
+    )
+    args = arguments.parse_args(argv)
+    if args.cache_dir:
+        from python.cache import simulation_cache
+
+        simulation_cache.directory = args.cache_dir
+    app = create_app()
     main_window = SpinFlight()
     main_window.show()
     app.exec_()
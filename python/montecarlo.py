@@ -0,0 +1,185 @@
+# Monte Carlo dispersion of the landing point. Any INPUT_LIMITS value of a
+# launch may be given as a distribution instead of a number, e.g.
+#   {"initial_velocity": {"distribution": "normal", "mean": 30, "std": 0.5},
+#    "elevation_angle": {"distribution": "uniform", "low": 28, "high": 32}, ...}
+# Samples run in chunks through run_magnus_sweep(summary_only=True), so only
+# running statistics and a bounded sample of impact points are kept.
+import numpy as np
+
+from config import INPUT_LIMITS, MONTE_CARLO_CHUNK, MONTE_CARLO_KEEP_POINTS
+from python.calculation import DEFAULT_INTEGRATOR, run_magnus_sweep
+
+# impact point in the ground plane: downrange x and lateral z
+IMPACT_COLUMNS = ["range", "lateral_deviation"]
+MEAN_COLUMNS = ["flight_time", "apex_height", "impact_speed"]
+
+
+def is_distribution(value):
+    return isinstance(value, dict) and "distribution" in value
+
+
+def draw(name, spec, rng, size):
+    kind = spec["distribution"]
+    if kind == "normal":
+        values = rng.normal(spec["mean"], spec["std"], size)
+    elif kind == "uniform":
+        values = rng.uniform(spec["low"], spec["high"], size)
+    elif kind == "triangular":
+        values = rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    else:
+        raise ValueError(f"Unknown distribution '{kind}' for {name}")
+    # samples outside the input limits are clamped to them
+    limit = INPUT_LIMITS[name]
+    return np.clip(values, limit["minimum"], limit["maximum"])
+
+
+def sample_launches(launch, rng, size):
+    # distributions are drawn in INPUT_LIMITS order so a seed always maps to
+    # the same samples
+    return {
+        name: (
+            draw(name, launch[name], rng, size)
+            if is_distribution(launch[name])
+            else launch[name]
+        )
+        for name in INPUT_LIMITS
+        if name in launch
+    }
+
+
+class RunningStatistics:
+    # Mean and covariance of (N, D) batches, merged with Chan et al.'s
+    # pairwise update so no sample has to be kept.
+    def __init__(self, dimensions):
+        self.count = 0
+        self.mean = np.zeros(dimensions)
+        self.m2 = np.zeros((dimensions, dimensions))
+
+    def update(self, batch):
+        batch = np.asarray(batch, dtype=float)
+        count = len(batch)
+        if count == 0:
+            return
+        mean = batch.mean(axis=0)
+        centered = batch - mean
+        delta = mean - self.mean
+        total = self.count + count
+        self.m2 += (
+            centered.T @ centered + np.outer(delta, delta) * self.count * count / total
+        )
+        self.mean += delta * count / total
+        self.count = total
+
+    @property
+    def covariance(self):
+        if self.count < 2:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / (self.count - 1)
+
+
+def confidence_ellipse(mean, covariance, confidence=0.95):
+    # axes lengths (full width and height) and rotation in degrees of the
+    # region holding `confidence` of a 2D normal distribution
+    scale = -2 * np.log(1 - confidence)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    width, height = 2 * np.sqrt(scale * np.maximum(eigenvalues[::-1], 0))
+    major = eigenvectors[:, -1] * np.sign(eigenvectors[0, -1] or 1)
+    return {
+        "center": [float(value) for value in mean],
+        "width": float(width),
+        "height": float(height),
+        "angle": float(np.degrees(np.arctan2(major[1], major[0]))),
+        "confidence": confidence,
+    }
+
+
+class Dispersion:
+    # running landing statistics plus a uniform reservoir sample of impacts
+    def __init__(self, keep_points=MONTE_CARLO_KEEP_POINTS, seed=None):
+        self.samples = 0
+        self.impact = RunningStatistics(len(IMPACT_COLUMNS))
+        self.means = RunningStatistics(len(MEAN_COLUMNS))
+        self.keep_points = keep_points
+        self.points = np.empty((0, len(IMPACT_COLUMNS)))
+        self.reservoir_rng = np.random.default_rng(seed)
+
+    def update(self, summary):
+        landed = summary["landed"] > 0
+        impacts = np.column_stack([summary[name][landed] for name in IMPACT_COLUMNS])
+        self.samples += len(landed)
+        self.impact.update(impacts)
+        self.means.update(
+            np.column_stack([summary[name][landed] for name in MEAN_COLUMNS])
+        )
+        self.keep(impacts)
+
+    def keep(self, impacts):
+        # Algorithm R: sample k of the landed points seen so far replaces a
+        # kept point with probability keep_points / k
+        seen_before = self.impact.count - len(impacts)
+        room = max(self.keep_points - len(self.points), 0)
+        self.points = np.concatenate([self.points, impacts[:room]])
+        rest = impacts[room:]
+        if len(rest):
+            seen = seen_before + room + np.arange(1, len(rest) + 1)
+            slots = (self.reservoir_rng.random(len(rest)) * seen).astype(int)
+            for slot, point in zip(slots, rest):
+                if slot < self.keep_points:
+                    self.points[slot] = point
+
+    def result(self, confidence=0.95):
+        covariance = self.impact.covariance
+        result = {
+            "samples": self.samples,
+            "landed": self.impact.count,
+            "mean": dict(zip(IMPACT_COLUMNS, self.impact.mean.tolist())),
+            "covariance": covariance.tolist(),
+            "means": dict(zip(MEAN_COLUMNS, self.means.mean.tolist())),
+            "points": self.points,
+        }
+        if self.impact.count > 2:
+            result["ellipse"] = confidence_ellipse(
+                self.impact.mean, covariance, confidence
+            )
+        return result
+
+
+def monte_carlo_batches(
+    launch,
+    samples,
+    seed=None,
+    chunk_size=MONTE_CARLO_CHUNK,
+    workers=None,
+    keep_points=MONTE_CARLO_KEEP_POINTS,
+):
+    # yields the Dispersion after every chunk; the same seed and chunk size
+    # reproduce the same samples, every chunk has its own spawned RNG stream
+    if not any(is_distribution(value) for value in launch.values()):
+        raise ValueError("At least one parameter needs a distribution")
+    if samples <= 0:
+        raise ValueError("The number of samples must be positive")
+    chunks = -(-samples // chunk_size)
+    seed_sequence = np.random.SeedSequence(seed)
+    reservoir_seed, *chunk_seeds = seed_sequence.spawn(chunks + 1)
+    dispersion = Dispersion(keep_points, reservoir_seed)
+    settings = {name: launch[name] for name in DEFAULT_INTEGRATOR if name in launch}
+    for chunk, chunk_seed in enumerate(chunk_seeds):
+        size = min(chunk_size, samples - chunk * chunk_size)
+        columns = sample_launches(launch, np.random.default_rng(chunk_seed), size)
+        dispersion.update(
+            run_magnus_sweep(
+                {**columns, **settings}, summary_only=True, workers=workers
+            )
+        )
+        yield dispersion
+
+
+def run_monte_carlo(
+    launch, samples, seed=None, confidence=0.95, progress=None, **options
+):
+    # progress(fraction) is called after every chunk; raising from it aborts
+    dispersion = None
+    for dispersion in monte_carlo_batches(launch, samples, seed, **options):
+        if progress is not None:
+            progress(dispersion.samples / samples)
+    return dispersion.result(confidence)
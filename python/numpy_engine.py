@@ -0,0 +1,783 @@
+# Pure-NumPy stand-in for the magnus_simulation extension with the same Python
+# API (Vec3, MagnusParameter, EventSpec, IntegratorState, ForceTables,
+# simulate_trajectory_arrays, stream_trajectory, simulate_summary,
+# simulate_batch). Launches are integrated together as struct-of-arrays: every
+# (3, M) block holds one vector component per row, and flights leave the
+# working set as soon as they land. The scheme matches RK4Integrator step for
+# step, including the event location, so results agree with the extension to
+# rounding. Only the fixed step "rk4" method exists.
+import numpy as np
+
+GRAVITY = 9.81
+ROOT_TOLERANCE = 1e-12
+ROOT_ITERATIONS = 60
+# columns of a simulate_batch params_array, in MagnusParameter order; rows
+# from before the radius column launch with a radius of 0.0, which only the
+# constant force model allows
+PARAMETER_COLUMNS = 11
+LEGACY_PARAMETER_COLUMNS = 10
+
+
+class Vec3:
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def magnitude(self):
+        return float(np.sqrt(self.x**2 + self.y**2 + self.z**2))
+
+
+def check_integrator(method, rtol, atol):
+    if method != "rk4":
+        raise ValueError(f"The numpy engine has no '{method}' integrator")
+    if rtol <= 0 or atol <= 0:
+        raise ValueError("rtol and atol must be positive")
+
+
+class MagnusParameter:
+    def __init__(
+        self,
+        initial_velocity,
+        elevation_angle,
+        azimuth_angle,
+        drag_coefficient,
+        lift_coefficient,
+        spin_rate,
+        is_top_spin,
+        air_density,
+        time_step,
+        duration,
+        radius=0.0,
+        method="rk4",
+        rtol=1e-6,
+        atol=1e-9,
+    ):
+        check_integrator(method, rtol, atol)
+        self.row = [
+            initial_velocity,
+            elevation_angle,
+            azimuth_angle,
+            drag_coefficient,
+            lift_coefficient,
+            spin_rate,
+            float(is_top_spin),
+            air_density,
+            time_step,
+            duration,
+            radius,
+        ]
+
+
+class EventSpec:
+    def __init__(self, name, x=0.0, height=0.0):
+        self.name = name
+        self.x = x
+        self.height = height
+
+    @staticmethod
+    def apex():
+        return EventSpec("apex")
+
+    @staticmethod
+    def plane_x(x):
+        return EventSpec("plane", x)
+
+    @staticmethod
+    def wall(x, height):
+        return EventSpec("wall", x, height)
+
+    def series(self):
+        # the event value is state[index][axis] - offset, with state
+        # (position, velocity)
+        if self.name == "ground":
+            return 0, 1, 0.0
+        if self.name == "apex":
+            return 1, 1, 0.0
+        return 0, 0, self.x
+
+    def key(self):
+        return self.name, self.x, self.height
+
+    def value(self, position, velocity):
+        index, axis, offset = self.series()
+        return (position, velocity)[index][axis] - offset
+
+    def crossed(self, start, end):
+        if self.name in ("ground", "apex"):
+            return (start > 0) & (end <= 0)
+        return (start < 0) != (end < 0)
+
+
+class EventRecord:
+    def __init__(self, name, time, position, velocity, cleared):
+        self.name = name
+        self.time = time
+        self.position = position
+        self.velocity = velocity
+        self.cleared = cleared
+
+
+class IntegrationStats:
+    def __init__(self, steps, rejected_steps, derivative_evaluations):
+        self.steps = steps
+        self.rejected_steps = rejected_steps
+        self.derivative_evaluations = derivative_evaluations
+
+
+class IntegratorState:
+    def __init__(self, time, position, velocity):
+        self.time = time
+        self.position = position
+        self.velocity = velocity
+
+
+class SimulationResult:
+    def __init__(self, data, stats, events):
+        self.data = data
+        self.stats = stats
+        self.events = events
+
+
+class TrajectorySummary:
+    def __init__(self, row, events=()):
+        self.flight_time = row[0]
+        self.range = row[1]
+        self.lateral_deviation = row[2]
+        self.apex_time = row[3]
+        self.apex_height = row[4]
+        self.impact_velocity = Vec3(row[5], row[6], row[7])
+        self.impact_speed = row[8]
+        self.landed = bool(row[9])
+        self.events = list(events)
+
+
+class LookupTable:
+    # values on a uniform grid, interpolated linearly and clamped at both ends
+    def __init__(self, name, grid, values):
+        grid = np.asarray(grid, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if grid.ndim != 1 or len(grid) < 2 or grid.shape != values.shape:
+            raise ValueError(
+                f"{name} needs at least two grid points and one value per point"
+            )
+        count = len(grid) - 1
+        span = grid[count] - grid[0]
+        uniform = grid[0] + span * np.arange(len(grid)) / count
+        if span <= 0 or (np.abs(grid - uniform) > 1e-9 * abs(span)).any():
+            raise ValueError(f"{name} grid must be increasing and evenly spaced")
+        self.start = grid[0]
+        self.inverse_step = count / span
+        self.last = float(count)
+        self.values = values
+
+    def at(self, x):
+        position = np.clip((x - self.start) * self.inverse_step, 0.0, self.last)
+        index = np.minimum(position.astype(np.int64), len(self.values) - 2)
+        fraction = position - index
+        return (
+            self.values[index]
+            + (self.values[index + 1] - self.values[index]) * fraction
+        )
+
+
+class ForceTables:
+    # drag coefficient against Reynolds number, lift coefficient against spin
+    # ratio, relative air density against height and the fraction of the spin
+    # left against time
+    def __init__(
+        self,
+        reynolds,
+        drag,
+        spin_ratio,
+        lift,
+        height,
+        density,
+        time,
+        spin_decay,
+        viscosity=1.81e-5,
+    ):
+        if viscosity <= 0:
+            raise ValueError("viscosity must be positive")
+        self.drag = LookupTable("drag", reynolds, drag)
+        self.lift = LookupTable("lift", spin_ratio, lift)
+        self.density = LookupTable("density", height, density)
+        self.spin_decay = LookupTable("spin_decay", time, spin_decay)
+        self.viscosity = viscosity
+
+    def lookup(self, reynolds, spin_ratio, height, time):
+        return (
+            float(self.drag.at(reynolds)),
+            float(self.lift.at(spin_ratio)),
+            float(self.density.at(height)),
+            float(self.spin_decay.at(time)),
+        )
+
+
+class Model:
+    # per-launch constants of the force model, (M,) or (3, M) arrays. With
+    # ForceTables the drag and lift come from the tables, using the radius,
+    # air density and spin rate of every launch and its unit spin axis.
+    def __init__(self, params, spin, mass, tables=None):
+        self.params = params
+        self.drag = params[:, 3]
+        self.lift = params[:, 4]
+        self.spin = spin
+        self.mass = mass
+        self.tables = tables
+        if tables is not None:
+            self.spin_rate = params[:, 5]
+            self.air_density = params[:, 7]
+            self.radius = params[:, 10]
+            length = np.sqrt(np.einsum("ij,ij->j", spin, spin))
+            direction = np.where(self.spin_rate < 0, -1.0, 1.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.axis = np.where(length > 0, spin * (direction / length), 0.0)
+
+    def subset(self, keep):
+        return Model(self.params[keep], self.spin[:, keep], self.mass, self.tables)
+
+    def table_forces(self, time, height, speed):
+        tables, radius = self.tables, self.radius
+        density = self.air_density * tables.density.at(height)
+        reynolds = density * speed * (2.0 * radius) / tables.viscosity
+        spin = self.spin_rate * tables.spin_decay.at(time)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spin_ratio = np.abs(spin) * radius / speed
+        # dynamic pressure times the cross section, over the speed
+        pressure = 0.5 * density * (np.pi * radius * radius) * speed
+        return pressure * tables.lift.at(spin_ratio), pressure * tables.drag.at(
+            reynolds
+        )
+
+    def forces(self, time, position, velocity):
+        # magnus, drag and total force, summed in the extension's order
+        vx, vy, vz = velocity
+        speed = np.sqrt(vx * vx + vy * vy + vz * vz)
+        if self.tables is None:
+            lift, drag, (sx, sy, sz) = self.lift, self.drag * speed, self.spin
+        else:
+            lift, drag = self.table_forces(time, position[1], speed)
+            sx, sy, sz = self.axis
+        magnus = np.empty_like(velocity)
+        magnus[0] = lift * (sy * vz - sz * vy)
+        magnus[1] = lift * (sz * vx - sx * vz)
+        magnus[2] = lift * (sx * vy - sy * vx)
+        drag = -drag * velocity
+        resting = speed < 1e-10
+        if resting.any():
+            magnus[:, resting] = 0.0
+            drag[:, resting] = 0.0
+        total = magnus + drag
+        total[1] += -self.mass * GRAVITY
+        return magnus, drag, total
+
+    def acceleration(self, time, position, velocity):
+        return self.forces(time, position, velocity)[2] * (1.0 / self.mass)
+
+    def step(self, time, position, velocity, dt):
+        # classic RK4; the stage positions and times only matter to the tables
+        a1 = self.acceleration(time, position, velocity)
+        v2 = velocity + a1 * (dt * 0.5)
+        a2 = self.acceleration(time + dt * 0.5, position + velocity * (dt * 0.5), v2)
+        v3 = velocity + a2 * (dt * 0.5)
+        a3 = self.acceleration(time + dt * 0.5, position + v2 * (dt * 0.5), v3)
+        v4 = velocity + a3 * dt
+        a4 = self.acceleration(time + dt, position + v3 * dt, v4)
+        position = position + (velocity + 2.0 * (v2 + v3) + v4) * (dt / 6.0)
+        velocity = velocity + (a1 + 2.0 * (a2 + a3) + a4) * (dt / 6.0)
+        return position, velocity
+
+
+def hermite(start, start_slope, end, end_slope, dt, theta):
+    theta2 = theta * theta
+    theta3 = theta2 * theta
+    return (
+        start * (2 * theta3 - 3 * theta2 + 1)
+        + start_slope * dt * (theta3 - 2 * theta2 + theta)
+        + end * (3 * theta2 - 2 * theta3)
+        + end_slope * dt * (theta3 - theta2)
+    )
+
+
+def find_root(value, count):
+    # Illinois variant of regula falsi on the step fraction [0, 1], run on
+    # `count` crossings at once; each stops on the same tests as the extension
+    low, high = np.zeros(count), np.ones(count)
+    value_low, value_high = value(low), value(high)
+    theta = high.copy()
+    side = np.zeros(count, dtype=np.int8)
+    done = np.zeros(count, dtype=bool)
+    for _ in range(ROOT_ITERATIONS):
+        done |= (high - low < ROOT_TOLERANCE) | (value_high == value_low)
+        if done.all():
+            break
+        previous = theta
+        with np.errstate(divide="ignore", invalid="ignore"):
+            candidate = (low * value_high - high * value_low) / (value_high - value_low)
+        theta = np.where(done, theta, candidate)
+        value_theta = value(theta)
+        finished = ~done & (
+            (value_theta == 0) | (np.abs(theta - previous) < ROOT_TOLERANCE)
+        )
+        moving = ~done & ~finished
+        to_high = moving & ((value_theta < 0) == (value_high < 0))
+        to_low = moving & ~to_high
+        value_low = np.where(to_high & (side == 1), value_low * 0.5, value_low)
+        value_high = np.where(to_low & (side == -1), value_high * 0.5, value_high)
+        high = np.where(to_high, theta, high)
+        value_high = np.where(to_high, value_theta, value_high)
+        low = np.where(to_low, theta, low)
+        value_low = np.where(to_low, value_theta, value_low)
+        side = np.where(to_high, 1, np.where(to_low, -1, side)).astype(np.int8)
+        done |= finished
+    return theta
+
+
+class Points:
+    # collects pushed points either as 19-column rows or as a running summary
+    def __init__(self, launches, summary_only):
+        self.summary_only = summary_only
+        self.blocks = []
+        if summary_only:
+            self.highest = np.full(launches, -np.inf)
+            self.highest_time = np.zeros(launches)
+            self.last_time = np.zeros(launches)
+            self.last_position = np.zeros((3, launches))
+            self.last_velocity = np.zeros((3, launches))
+
+    def push(self, launch, time, position, velocity, model):
+        if not self.summary_only:
+            magnus, drag, total = model.forces(time, position, velocity)
+            block = np.empty((len(launch), 19))
+            block[:, 0] = time
+            block[:, 1:4] = position.T
+            block[:, 4:7] = velocity.T
+            block[:, 7:10] = (total / model.mass).T
+            block[:, 10:13] = magnus.T
+            block[:, 13:16] = drag.T
+            block[:, 16:19] = total.T
+            self.blocks.append((launch, block))
+            return
+        higher = position[1] > self.highest[launch]
+        self.highest[launch[higher]] = position[1, higher]
+        self.highest_time[launch[higher]] = np.broadcast_to(time, launch.shape)[higher]
+        self.last_time[launch] = time
+        self.last_position[:, launch] = position
+        self.last_velocity[:, launch] = velocity
+
+    def trajectories(self, launches, output_stride=1):
+        # rows grouped by launch in time order, and the N + 1 run offsets
+        if not self.blocks:
+            return np.empty((0, 19)), np.zeros(launches + 1, dtype=np.int64)
+        launch = np.concatenate([block[0] for block in self.blocks])
+        rows = np.concatenate([block[1] for block in self.blocks])
+        order = np.argsort(launch, kind="stable")
+        launch, rows = launch[order], rows[order]
+        lengths = np.bincount(launch, minlength=launches)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        if output_stride > 1:
+            # every n-th point of each run and always its last one
+            index = np.arange(len(rows)) - offsets[launch]
+            keep = (index % output_stride == 0) | (index == lengths[launch] - 1)
+            rows, launch = rows[keep], launch[keep]
+            lengths = np.bincount(launch, minlength=launches)
+            offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        return np.asfortranarray(rows), offsets
+
+
+def integrate(*args, **kwargs):
+    # runs `integration` to the end
+    run = integration(*args, **kwargs)
+    while True:
+        try:
+            next(run)
+        except StopIteration as done:
+            return done.value
+
+
+def integration(
+    params_array,
+    mass,
+    spin_vectors,
+    events=(),
+    summary_only=False,
+    progress=None,
+    initial_state=None,
+    force_tables=None,
+):
+    # yields the Points collector after every step and returns
+    # (points, records, landed, (steps, evaluations)) once all flights are done.
+    # With an IntegratorState every launch continues from it on its own time grid.
+    params_array = np.atleast_2d(np.asarray(params_array, dtype=float))
+    spin_vectors = np.atleast_2d(np.asarray(spin_vectors, dtype=float))
+    if params_array.shape[1] == LEGACY_PARAMETER_COLUMNS:
+        if force_tables is not None:
+            raise ValueError(
+                f"force_tables need the radius, params_array must have "
+                f"{PARAMETER_COLUMNS} columns"
+            )
+        params_array = np.column_stack([params_array, np.zeros(len(params_array))])
+    if params_array.shape[1] != PARAMETER_COLUMNS:
+        raise ValueError(
+            f"params_array must have {PARAMETER_COLUMNS} (or "
+            f"{LEGACY_PARAMETER_COLUMNS} without the radius) columns, "
+            f"got {params_array.shape[1]}"
+        )
+    if spin_vectors.shape != (len(params_array), 3):
+        raise ValueError(f"spin_vectors must have shape ({len(params_array)}, 3)")
+    launches = len(params_array)
+    speed, elevation, azimuth, *_, dt, duration, _ = params_array.T
+    model = Model(params_array, spin_vectors.T.copy(), mass, force_tables)
+    if summary_only:
+        events = [EventSpec.apex(), *events]
+    # the ground is always tracked, a spec given twice only once
+    specs = [EventSpec("ground")]
+    for spec in events:
+        if spec.key() not in [known.key() for known in specs]:
+            specs.append(spec)
+
+    points = Points(launches, summary_only)
+    records = []
+    steps = np.zeros(launches, dtype=np.int64)
+    evaluations = np.ones(launches, dtype=np.int64)
+    landed = np.zeros(launches, dtype=bool)
+    num_steps = np.ceil(duration / dt).astype(np.int64)
+
+    # working set of flights still in the air
+    alive = np.arange(launches)
+    if initial_state is None:
+        first_step = np.zeros(launches, dtype=np.int64)
+        grid_offset = np.zeros(launches)
+        start = np.zeros(launches)
+        position = np.zeros((3, launches))
+        velocity = np.stack(
+            [
+                speed * np.cos(elevation) * np.cos(azimuth),
+                speed * np.sin(elevation),
+                speed * np.cos(elevation) * np.sin(azimuth),
+            ]
+        )
+    else:
+        # step i of a resumed flight still ends at (i + 1) * dt
+        time = float(initial_state.time)
+        first_step = np.maximum(np.floor(time / dt + 0.5), 0).astype(np.int64)
+        grid_offset = time - first_step * dt
+        start = np.full(launches, time)
+        position, velocity = (
+            np.tile([[vector.x], [vector.y], [vector.z]], (1, launches))
+            for vector in (initial_state.position, initial_state.velocity)
+        )
+    acceleration = model.acceleration(start, position, velocity)
+    points.push(alive, start, position, velocity, model)
+    report_every = max(int(num_steps.max(initial=0)) // 100, 1)
+
+    i = 0
+    while len(alive):
+        running = first_step[alive] + i < num_steps[alive]
+        if not running.all():
+            alive, position, velocity, acceleration = (
+                alive[running],
+                position[:, running],
+                velocity[:, running],
+                acceleration[:, running],
+            )
+            model = model.subset(running)
+            if not len(alive):
+                break
+        step = dt[alive]
+        start_time = (first_step[alive] + i) * step + grid_offset[alive]
+        next_position, next_velocity = model.step(start_time, position, velocity, step)
+        next_acceleration = model.acceleration(
+            start_time + step, next_position, next_velocity
+        )
+        steps[alive] += 1
+        evaluations[alive] += 5
+
+        # locate ground impact and user events inside the step
+        ground = np.full(len(alive), np.inf)
+        for spec in specs:
+            crossed = spec.crossed(
+                spec.value(position, velocity), spec.value(next_position, next_velocity)
+            )
+            if not crossed.any():
+                continue
+            sub = np.flatnonzero(crossed)
+            # cubic Hermite interpolant of the event value over the step
+            index, axis, offset = spec.series()
+            start, slope = (position, velocity, acceleration)[index : index + 2]
+            end, end_slope = (next_position, next_velocity, next_acceleration)[
+                index : index + 2
+            ]
+            interpolant = (
+                start[axis, sub],
+                slope[axis, sub],
+                end[axis, sub],
+                end_slope[axis, sub],
+                step[sub],
+            )
+
+            def value(theta):
+                return hermite(*interpolant, theta) - offset
+
+            theta = find_root(value, len(sub))
+            if spec.name != "ground":
+                # events after the landing in the same step never happen
+                keep = theta < ground[sub]
+                sub, theta = sub[keep], theta[keep]
+                if not len(sub):
+                    continue
+            else:
+                ground[sub] = theta
+            event_position, event_velocity = model.subset(sub).step(
+                start_time[sub], position[:, sub], velocity[:, sub], theta * step[sub]
+            )
+            if spec.name == "ground":
+                event_position[1] = 0.0
+            evaluations[alive[sub]] += 4
+            cleared = event_position[1] > spec.height if spec.name == "wall" else None
+            records.append(
+                (
+                    alive[sub],
+                    start_time[sub] + theta * step[sub],
+                    spec.name,
+                    event_position,
+                    event_velocity,
+                    cleared,
+                )
+            )
+            if spec.name == "ground":
+                landed[alive[sub]] = True
+                points.push(
+                    alive[sub],
+                    records[-1][1],
+                    event_position,
+                    event_velocity,
+                    model.subset(sub),
+                )
+
+        # launched along or into the ground: stop right away
+        landing = np.isfinite(ground)
+        grounded = ~landing & (position[1] <= 0) & (next_position[1] <= 0)
+        if grounded.any():
+            next_position[1, grounded] = 0.0
+        flying = ~landing
+        points.push(
+            alive[flying],
+            start_time[flying] + step[flying],
+            next_position[:, flying],
+            next_velocity[:, flying],
+            model.subset(flying),
+        )
+        if progress is not None and (i + 1) % report_every == 0:
+            progress(
+                float(((first_step[alive] + i + 1) * step / duration[alive]).max())
+            )
+
+        keep = flying & ~grounded
+        alive = alive[keep]
+        position = next_position[:, keep]
+        velocity = next_velocity[:, keep]
+        acceleration = next_acceleration[:, keep]
+        model = model.subset(keep)
+        i += 1
+        yield points
+
+    stats = (steps, evaluations)
+    return points, records, landed, stats
+
+
+def launch_records(records, launch):
+    # EventRecord objects of one launch in time order
+    found = []
+    for launches, times, name, position, velocity, cleared in records:
+        for j in np.flatnonzero(launches == launch):
+            found.append(
+                EventRecord(
+                    name,
+                    float(times[j]),
+                    Vec3(*position[:, j].tolist()),
+                    Vec3(*velocity[:, j].tolist()),
+                    None if cleared is None else bool(cleared[j]),
+                )
+            )
+    return sorted(found, key=lambda event: event.time)
+
+
+def summary_rows(points, records, landed):
+    apex_time = points.highest_time.copy()
+    apex_height = points.highest.copy()
+    # records are in time order, so walking them backwards leaves the first
+    # apex of every flight
+    for launch, times, name, position, _, _ in reversed(records):
+        if name == "apex":
+            apex_time[launch] = times
+            apex_height[launch] = position[1]
+    speed = np.sqrt(np.einsum("ij,ij->j", points.last_velocity, points.last_velocity))
+    return np.asfortranarray(
+        np.column_stack(
+            [
+                points.last_time,
+                points.last_position[0],
+                points.last_position[2],
+                apex_time,
+                apex_height,
+                points.last_velocity.T,
+                speed,
+                landed.astype(float),
+            ]
+        )
+    )
+
+
+def simulate_trajectory_arrays(
+    params,
+    mass,
+    spin_vector,
+    events=None,
+    output_stride=1,
+    progress=None,
+    initial_state=None,
+    force_tables=None,
+):
+    points, records, _, (steps, evaluations) = integrate(
+        [params.row],
+        mass,
+        [[spin_vector.x, spin_vector.y, spin_vector.z]],
+        events or (),
+        progress=progress,
+        initial_state=initial_state,
+        force_tables=force_tables,
+    )
+    data, _ = points.trajectories(1, max(int(output_stride), 1))
+    return SimulationResult(
+        data,
+        IntegrationStats(int(steps[0]), 0, int(evaluations[0])),
+        launch_records(records, 0),
+    )
+
+
+class TrajectoryStream:
+    # (k, 19) chunks of one trajectory, integrated a chunk at a time as the
+    # iterator is advanced; `stats` and `events` are set once it is exhausted
+    def __init__(
+        self,
+        params,
+        mass,
+        spin_vector,
+        chunk_size,
+        events,
+        output_stride,
+        initial_state,
+        force_tables,
+    ):
+        self.chunk_size = max(int(chunk_size), 1)
+        self.output_stride = max(int(output_stride), 1)
+        self.stats = None
+        self.events = []
+        self.rows = []
+        self.seen = 0
+        self.pending = None
+        self.run = integration(
+            [params.row],
+            mass,
+            [[spin_vector.x, spin_vector.y, spin_vector.z]],
+            events or (),
+            initial_state=initial_state,
+            force_tables=force_tables,
+        )
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self.run is not None and len(self.rows) < self.chunk_size:
+            try:
+                self.take(next(self.run))
+            except StopIteration as done:
+                points, records, _, (steps, evaluations) = done.value
+                self.take(points)
+                if self.pending is not None:
+                    self.rows.append(self.pending)
+                self.stats = IntegrationStats(int(steps[0]), 0, int(evaluations[0]))
+                self.events = launch_records(records, 0)
+                self.run = None
+        if not self.rows:
+            raise StopIteration
+        chunk = np.asfortranarray(self.rows[: self.chunk_size])
+        del self.rows[: self.chunk_size]
+        return chunk
+
+    def take(self, points):
+        # every `output_stride`-th row, the last one is held back until the end
+        for _, block in points.blocks:
+            for row in block:
+                if self.seen % self.output_stride == 0:
+                    self.rows.append(row)
+                    self.pending = None
+                else:
+                    self.pending = row
+                self.seen += 1
+        points.blocks.clear()
+
+
+def stream_trajectory(
+    params,
+    mass,
+    spin_vector,
+    chunk_size=4096,
+    events=None,
+    output_stride=1,
+    initial_state=None,
+    force_tables=None,
+):
+    return TrajectoryStream(
+        params,
+        mass,
+        spin_vector,
+        chunk_size,
+        events,
+        output_stride,
+        initial_state,
+        force_tables,
+    )
+
+
+def simulate_summary(params, mass, spin_vector, events=None, force_tables=None):
+    points, records, landed, _ = integrate(
+        [params.row],
+        mass,
+        [[spin_vector.x, spin_vector.y, spin_vector.z]],
+        events or (),
+        summary_only=True,
+        force_tables=force_tables,
+    )
+    return TrajectorySummary(
+        summary_rows(points, records, landed)[0].tolist(), launch_records(records, 0)
+    )
+
+
+def simulate_batch(
+    params_array,
+    mass,
+    spin_vectors,
+    summary_only=False,
+    workers=None,
+    force_tables=None,
+    method="rk4",
+    rtol=1e-6,
+    atol=1e-9,
+):
+    # `workers` is accepted for the extension's signature; NumPy runs the
+    # whole batch in one vectorised loop
+    check_integrator(method, rtol, atol)
+    points, records, landed, _ = integrate(
+        params_array,
+        mass,
+        spin_vectors,
+        summary_only=summary_only,
+        force_tables=force_tables,
+    )
+    if summary_only:
+        return summary_rows(points, records, landed)
+    return points.trajectories(len(landed))
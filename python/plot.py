@@ -1,179 +1,158 @@
-import numpy as np
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from config import (
-    PLOT_CONFIG,
-    LINE_COLORS,
-    PLOT_TEXT_COLORS,
-    PLOT_FONT_SIZES,
-    PLOT_MARGIN_MIN,
-    PLOT_MARGIN_MAX,
+import numpy as np
+from config import PLOT_CONFIG, LINE_COLORS, ANIMATION_FPS
+from python.profiling import count, profiler
+from python.figures import (
+    CANVAS_LAYOUT,
+    as_list,
+    new_figure,
+    design_axes,
+    canvas_values,
+    set_limits,
+    set_line_data,
+    extend_line,
+    animation_frames,
+    animation_positions,
 )
 
 
 def create_canvas(self):
-    self.canvas = {
-        "trajectory_canvas": ("trajectory_figure", "trajectory_axes", 1, 1),
-        "velocity_canvas": ("velocity_figure", "velocity_axes", 1, 3),
-        "acceleration_canvas": ("acceleration_figure", "acceleration_axes", 1, 3),
-        "force_canvas": ("force_figure", "force_axes", 1, 3),
-        "animation_canvas": ("animation_figure", "animation_axes", 1, 1),
-    }
-    plt.style.use("seaborn-v0_8-whitegrid")
+    self.canvas = dict(CANVAS_LAYOUT)
     for canvas_name, (
         figure_name,
         axes_name,
         row,
         column,
     ) in self.canvas.items():
-        if column == 1:
-            figure, axes = plt.subplots(
-                subplot_kw={"projection": "3d"}, constrained_layout=True
-            )
-        else:
-            figure, axes = plt.subplots(
-                row, column, figsize=(20, 10), constrained_layout=True
-            )
+        figure, axes = new_figure(row, column)
         setattr(self, figure_name, figure)
         setattr(self, axes_name, axes)
         canvas = FigureCanvas(getattr(self, figure_name))
+        canvas.mpl_connect(
+            "draw_event", lambda _, name=canvas_name: profiler.end(f"draw {name}")
+        )
         setattr(self, canvas_name, canvas)
 
 
 def reset_canvas(self):
-    for canvas_name, value in self.canvas.items():
-        axes_name = value[1]
-        axes = getattr(self, axes_name)
-        if not isinstance(axes, (list, np.ndarray)):
-            axes = [axes]
-        for ax in axes:
-            for line in ax.get_lines():
-                line.remove()
-            ax.figure.canvas.draw()
+    if getattr(self, "animation", None) is not None:
+        self.animation.event_source.stop()
+        self.animation = None
+    for lines in self.lines.values():
+        for line in lines:
+            line.set_data([], [])
+            if hasattr(line, "set_3d_properties"):
+                line.set_3d_properties([])
+    self.stale_canvases = set(self.canvas)
+    draw_visible_canvas(self)
+
+
+def draw_visible_canvas(self):
+    # hidden tabs stay stale until they are selected
+    canvas_name = list(self.canvas)[self.plot_tabs.currentIndex()]
+    if canvas_name in self.stale_canvases:
+        self.stale_canvases.discard(canvas_name)
+        # the draw itself happens later, the span ends on its draw_event
+        profiler.begin(f"draw {canvas_name}")
+        getattr(self, canvas_name).draw_idle()
+    # the animation only runs while its tab is shown
+    if self.animation is not None:
+        if canvas_name == "animation_canvas":
+            self.animation.resume()
+        else:
+            self.animation.pause()
 
 
 def design_canvas(self):
     create_canvas(self)
+    # line artists live as long as the window; new results only replace their data
+    self.lines = {}
+    self.stale_canvases = set()
+    self.animation = None
+    self.partial_line = None
 
-    for (_, axes_name, _, column), plot_group in zip(self.canvas.values(), PLOT_CONFIG):
+    for (canvas_name, (_, axes_name, _, column)), plot_group, line_color in zip(
+        self.canvas.items(), PLOT_CONFIG, LINE_COLORS.values()
+    ):
         axes = getattr(self, axes_name)
-        if not isinstance(axes, (list, np.ndarray)):
-            axes = [axes]
-        for ax, plot_info in zip(axes, plot_group):
-            if column == 1:
-                ax.set_zlabel(
-                    plot_info["z_label"],
-                    color=PLOT_TEXT_COLORS["label"],
-                    fontsize=PLOT_FONT_SIZES["label"],
-                )
-            ax.set_title(
-                plot_info["title"],
-                color=PLOT_TEXT_COLORS["title"],
-                fontsize=PLOT_FONT_SIZES["title"],
-            )
-            ax.set_xlabel(
-                plot_info["x_label"],
-                color=PLOT_TEXT_COLORS["label"],
-                fontsize=PLOT_FONT_SIZES["label"],
-            )
-            ax.set_ylabel(
-                plot_info["y_label"],
-                color=PLOT_TEXT_COLORS["label"],
-                fontsize=PLOT_FONT_SIZES["label"],
-            )
-            ax.tick_params(
-                axis="both",
-                colors=PLOT_TEXT_COLORS["ticks"],
-                labelsize=PLOT_FONT_SIZES["ticks"],
-            )
-            ax.grid(
-                True,
-                color=PLOT_TEXT_COLORS["grid"],
-                linewidth=0.8,
-            )
+        self.lines[canvas_name] = design_axes(axes, plot_group, column, line_color)
 
 
 def plot_calculated_data(self):
-    t = self.calculated_data["t"]
-
-    self.canvas_values = [
-        # Trajectory (3D)
-        [
-            (
-                self.calculated_data["x"],
-                self.calculated_data["z"],
-                self.calculated_data["y"],
-            )
-        ],
-        # Velocity vs Time (2D)
-        [
-            (t, self.calculated_data["vx"], ""),
-            (t, self.calculated_data["vy"], ""),
-            (t, self.calculated_data["vz"], ""),
-        ],
-        # Acceleration vs Time (2D)
-        [
-            (t, self.calculated_data["ax"], ""),
-            (t, self.calculated_data["ay"], ""),
-            (t, self.calculated_data["az"], ""),
-        ],
-        # Force vs Time (2D)
-        [
-            (t, self.calculated_data["fx"], ""),
-            (t, self.calculated_data["fy"], ""),
-            (t, self.calculated_data["fz"], ""),
-        ],
-        # Animation (3D)
-        [
-            (
-                self.calculated_data["x"],
-                self.calculated_data["z"],
-                self.calculated_data["y"],
-            )
-        ],
-    ]
-    for (canvas_name, (_, axes_name, _, column)), canvas_value, line_color in zip(
-        self.canvas.items(), self.canvas_values, LINE_COLORS.values()
+    self.canvas_values = canvas_values(self.calculated_data)
+    for (canvas_name, (_, axes_name, _, column)), canvas_value in zip(
+        self.canvas.items(), self.canvas_values
     ):
-        axes = getattr(self, axes_name)
-        if not isinstance(axes, (list, np.ndarray)):
-            axes = [axes]
-        for ax, (x, y, z) in zip(axes, canvas_value):
-            ax.set_xlim(min(x) * PLOT_MARGIN_MIN, max(x) * PLOT_MARGIN_MAX)
-            ax.set_ylim(-10, 10)
-            if column == 1:
-                # ax.view_init(elev=90, azim=-90)  # top-down view
-                # ax.set_box_aspect([1, 1, 1])
-                ax.set_zlim(min(z) * PLOT_MARGIN_MIN, max(z) * PLOT_MARGIN_MAX)
-                if canvas_name == "animation_canvas":
-                    create_animation(self)
-                    continue
-                ax.plot(x, y, z, linewidth=2.2, color=line_color)
-            else:
-                ax.plot(x, y, linewidth=2.2, color=line_color)
-        getattr(self, canvas_name).draw()
-
-
-def update(self, frame, line, frame_skip):
-    idx = frame_skip * frame
-    line.set_data(self.calculated_data["x"][:idx], self.calculated_data["z"][:idx])
-    line.set_3d_properties(self.calculated_data["y"][:idx])
-    getattr(self, "animation_canvas").draw()
+        axes = as_list(getattr(self, axes_name))
+        for ax, line, (x, y, z) in zip(axes, self.lines[canvas_name], canvas_value):
+            set_limits(ax, x, y, z, column)
+            if canvas_name == "animation_canvas":
+                create_animation(self)
+                continue
+            set_line_data(line, x, y, z, column)
+    self.stale_canvases = set(self.canvas)
+    draw_visible_canvas(self)
+
+
+def plot_partial_data(self, chunks):
+    # grows the trajectory line while the rest of the run is still integrating.
+    # Only the chunks that arrived since the last update are read; they are
+    # appended to the decimated line and to the running axis bounds.
+    from python.calculation import trajectory_result
+
+    state = self.partial_line
+    if state is None or state["first"] is not chunks[0]:
+        # the chunks of a new run
+        empty = np.empty(0)
+        state = self.partial_line = {
+            "first": chunks[0],
+            "chunks": 0,
+            "points": (empty, empty, empty),
+            "low": np.full(3, np.inf),
+            "high": np.full(3, -np.inf),
+        }
+    new_data = trajectory_result(np.concatenate(chunks[state["chunks"] :]))
+    state["chunks"] = len(chunks)
+    ((x, y, z),) = canvas_values(new_data)[0]
+    state["low"] = np.minimum(state["low"], [np.min(x), np.min(y), np.min(z)])
+    state["high"] = np.maximum(state["high"], [np.max(x), np.max(y), np.max(z)])
+    state["points"] = extend_line(state["points"], (x, y, z))
+
+    _, axes_name, _, column = self.canvas["trajectory_canvas"]
+    ax = getattr(self, axes_name)
+    (line,) = self.lines["trajectory_canvas"]
+    set_limits(ax, *np.column_stack([state["low"], state["high"]]), column)
+    set_line_data(line, *state["points"], column)
+    self.stale_canvases.add("trajectory_canvas")
+    draw_visible_canvas(self)
+
+
+def update(frame, line, positions, frame_ends):
+    count("animation_frames")
+    end = frame_ends[frame]
+    line.set_data_3d(positions[0, :end], positions[1, :end], positions[2, :end])
+    return (line,)
+
+
+def clear_animation(line):
+    line.set_data_3d([], [], [])
     return (line,)
 
 
 def create_animation(self):
-    frame_skip = 20
+    # frames slice views of one (3, N) block instead of copying lists
+    positions, t = animation_positions(self.calculated_data)
+    frame_ends = animation_frames(t, ANIMATION_FPS)
 
-    frames = len(self.calculated_data["t"]) // frame_skip
-    (animation_line,) = self.animation_axes.plot(
-        [], [], [], color=LINE_COLORS["animation"], linewidth=2.2
-    )
+    (animation_line,) = self.lines["animation_canvas"]
     self.animation = FuncAnimation(
         self.animation_figure,
-        lambda f: update(self, f, animation_line, frame_skip),
-        frames=frames,
+        lambda frame: update(frame, animation_line, positions, frame_ends),
+        init_func=lambda: clear_animation(animation_line),
+        frames=len(frame_ends),
         repeat=True,
-        interval=20,
+        interval=1000 / ANIMATION_FPS,
+        blit=True,
+        cache_frame_data=False,
     )
@@ -0,0 +1,133 @@
+# Stage timers and counters for the simulate -> plot pipeline. Disabled by
+# default, where a stage costs one attribute check; set MAGNUS_PROFILE=1 or call
+# profiler.enable() to record. Results export as JSON totals or as a Chrome
+# trace (chrome://tracing, https://ui.perfetto.dev).
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+DISABLED = nullcontext()
+
+
+class Profiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.clear()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def clear(self):
+        with self.lock:
+            # (name, thread id, start, end) in seconds since `origin`
+            self.spans = []
+            self.counters = {}
+            self.open = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return DISABLED
+        return self.timed(name)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter())
+
+    def begin(self, name):
+        # for stages that end in a callback, e.g. a deferred canvas draw
+        if self.enabled:
+            self.open.setdefault(name, time.perf_counter())
+
+    def end(self, name):
+        start = self.open.pop(name, None)
+        if start is not None:
+            self.add_span(name, start, time.perf_counter())
+
+    def add_span(self, name, start, end):
+        span = (name, threading.get_ident(), start - self.origin, end - self.origin)
+        with self.lock:
+            self.spans.append(span)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def totals(self):
+        totals = {}
+        with self.lock:
+            spans = list(self.spans)
+        for name, _, start, end in spans:
+            total = totals.setdefault(
+                name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            total["calls"] += 1
+            total["total_ms"] += (end - start) * 1000
+            total["max_ms"] = max(total["max_ms"], (end - start) * 1000)
+        return totals
+
+    def last(self, name):
+        # duration in ms of the latest span of a stage
+        with self.lock:
+            for span_name, _, start, end in reversed(self.spans):
+                if span_name == name:
+                    return (end - start) * 1000
+        return None
+
+    def summary(self, names):
+        parts = []
+        for name in names:
+            duration = self.last(name)
+            if duration is not None:
+                parts.append(f"{name} {duration:.0f} ms")
+        return ", ".join(parts)
+
+    def report(self):
+        return {"stages": self.totals(), "counters": dict(self.counters)}
+
+    def save_json(self, file_path):
+        with open(file_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def save_chrome_trace(self, file_path):
+        with self.lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": thread,
+            }
+            for name, thread, start, end in spans
+        ]
+        end = max((span[3] for span in spans), default=0.0)
+        events += [
+            {
+                "name": name,
+                "ph": "C",
+                "ts": end * 1e6,
+                "pid": pid,
+                "args": {name: value},
+            }
+            for name, value in counters.items()
+        ]
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+profiler = Profiler(enabled=os.environ.get("MAGNUS_PROFILE") == "1")
+stage = profiler.stage
+count = profiler.count
@@ -0,0 +1,101 @@
+import json
+import os
+
+import numpy as np
+
+from config import data_map
+
+STORE_COLUMNS = list(data_map)
+DATA_FILE = "trajectories.f64"
+INDEX_FILE = "index.json"
+
+
+class TrajectoryStore:
+    """Append-only store of trajectories backed by one memory-mapped file.
+
+    `trajectories.f64` holds float64 rows of the STORE_COLUMNS back to back,
+    so every run is a contiguous block. `index.json` maps each run id to its
+    row offset, length and simulation parameters. Readers get np.memmap views
+    and never load more than the rows they touch.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.data_path = os.path.join(directory, DATA_FILE)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.index = {"columns": STORE_COLUMNS, "rows": 0, "runs": {}}
+        self.mapped = None
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+            if self.index["columns"] != STORE_COLUMNS:
+                raise ValueError(f"{directory} was written with different columns")
+
+    def __len__(self):
+        return len(self.index["runs"])
+
+    def runs(self):
+        # run id: {"offset", "length", "parameters"}
+        return {int(run_id): entry for run_id, entry in self.index["runs"].items()}
+
+    def append(self, trajectory, parameters):
+        return self.append_runs(trajectory, [0, len(trajectory)], [parameters])[0]
+
+    def append_runs(self, trajectory, offsets, parameters):
+        # run i spans trajectory rows offsets[i]:offsets[i + 1], as returned by
+        # run_magnus_sweep; the whole block is written with a single call
+        os.makedirs(self.directory, exist_ok=True)
+        trajectory = np.ascontiguousarray(trajectory, dtype=np.float64)
+        size = self.index["rows"] * len(STORE_COLUMNS) * trajectory.itemsize
+        mode = "r+b" if os.path.exists(self.data_path) else "wb"
+        with open(self.data_path, mode) as f:
+            # rows past the index are left over from an append that died
+            # before saving it, so they are overwritten
+            f.truncate(size)
+            f.seek(size)
+            trajectory.tofile(f)
+
+        start = self.index["rows"]
+        first_id = max(map(int, self.index["runs"]), default=-1) + 1
+        run_ids = list(range(first_id, first_id + len(parameters)))
+        for run_id, offset, end, run_parameters in zip(
+            run_ids, offsets[:-1], offsets[1:], parameters
+        ):
+            self.index["runs"][str(run_id)] = {
+                "offset": start + int(offset),
+                "length": int(end - offset),
+                "parameters": run_parameters,
+            }
+        self.index["rows"] = start + len(trajectory)
+        self.save_index()
+        return run_ids
+
+    def save_index(self):
+        temporary = self.index_path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.index, f)
+        os.replace(temporary, self.index_path)
+
+    def data(self):
+        # (rows, columns) view of the whole file, remapped after appends
+        rows = self.index["rows"]
+        if rows == 0:
+            return np.empty((0, len(STORE_COLUMNS)))
+        if self.mapped is None or len(self.mapped) != rows:
+            self.mapped = np.memmap(
+                self.data_path,
+                dtype=np.float64,
+                mode="r",
+                shape=(rows, len(STORE_COLUMNS)),
+            )
+        return self.mapped
+
+    def load(self, run_id):
+        entry = self.index["runs"][str(run_id)]
+        return self.data()[entry["offset"] : entry["offset"] + entry["length"]]
+
+    def column(self, run_id, name):
+        return self.load(run_id)[:, STORE_COLUMNS.index(name)]
+
+    def parameters(self, run_id):
+        return self.index["runs"][str(run_id)]["parameters"]
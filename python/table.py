@@ -0,0 +1,128 @@
+# Tabular export of trajectory results: one row per stored point with the
+# columns of config.data_map, plus a run_id column for sweep results.
+import importlib.util
+import os
+
+import numpy as np
+
+from config import data_map, TABLE_CHUNK_ROWS
+
+TABLE_COLUMNS = list(data_map)
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def table_formats():
+    # file dialog filter: extension
+    formats = {"CSV (*.csv)": ".csv", "NumPy archive (*.npz)": ".npz"}
+    if PARQUET_AVAILABLE:
+        formats["Parquet (*.parquet)"] = ".parquet"
+    return formats
+
+
+def run_ids(offsets):
+    # run i of a sweep spans rows offsets[i]:offsets[i + 1]
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def chunks(rows, chunk_rows):
+    for start in range(0, rows, chunk_rows):
+        yield start, min(start + chunk_rows, rows)
+
+
+def write_csv(file_path, trajectory, offsets=None, progress=None):
+    columns = TABLE_COLUMNS
+    formats = ["%.10g"] * len(columns)
+    ids = None
+    if offsets is not None:
+        columns = ["run_id"] + columns
+        formats = ["%d"] + formats
+        ids = run_ids(offsets)
+    with open(file_path, "w", newline="") as f:
+        f.write(",".join(columns) + "\n")
+        for start, end in chunks(len(trajectory), TABLE_CHUNK_ROWS):
+            block = trajectory[start:end]
+            if ids is not None:
+                block = np.column_stack([ids[start:end], block])
+            np.savetxt(f, block, fmt=formats, delimiter=",")
+            if progress is not None:
+                progress(end / len(trajectory))
+
+
+def write_npz(file_path, trajectory, offsets=None, progress=None):
+    arrays = {"trajectory": trajectory, "columns": np.array(TABLE_COLUMNS)}
+    if offsets is not None:
+        arrays["offsets"] = offsets
+    np.savez(file_path, **arrays)
+    if progress is not None:
+        progress(1.0)
+
+
+def write_parquet(file_path, trajectory, offsets=None, progress=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    ids = None if offsets is None else run_ids(offsets)
+    fields = [pa.field(name, pa.float64()) for name in TABLE_COLUMNS]
+    if ids is not None:
+        fields.insert(0, pa.field("run_id", pa.int64()))
+    schema = pa.schema(fields)
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for start, end in chunks(len(trajectory), TABLE_CHUNK_ROWS):
+            block = trajectory[start:end]
+            columns = [pa.array(block[:, index]) for index in range(block.shape[1])]
+            if ids is not None:
+                columns.insert(0, pa.array(ids[start:end]))
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            if progress is not None:
+                progress(end / len(trajectory))
+
+
+def write_summary(file_path, columns):
+    # one row per launch, e.g. swept parameters followed by summary values
+    extension = os.path.splitext(file_path)[1].lower()
+    columns = {
+        name: np.asarray(values, dtype=float) for name, values in columns.items()
+    }
+    if extension == ".csv":
+        np.savetxt(
+            file_path,
+            np.column_stack(list(columns.values())),
+            fmt="%.10g",
+            delimiter=",",
+            header=",".join(columns),
+            comments="",
+        )
+    elif extension == ".npz":
+        np.savez(file_path, **columns)
+    elif extension == ".parquet" and PARQUET_AVAILABLE:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table(columns), file_path)
+    else:
+        raise ValueError(f"Unsupported export format '{extension}'")
+    return file_path
+
+
+TABLE_WRITERS = {".csv": write_csv, ".npz": write_npz, ".parquet": write_parquet}
+
+
+def export_table(calculated_data, file_path, progress=None):
+    # the format follows the extension; a partial file is removed on failure
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in TABLE_WRITERS:
+        raise ValueError(f"Unsupported export format '{extension}'")
+    if extension == ".parquet" and not PARQUET_AVAILABLE:
+        raise ValueError("Parquet export needs the pyarrow package")
+    try:
+        TABLE_WRITERS[extension](
+            file_path,
+            calculated_data["trajectory"],
+            calculated_data.get("offsets"),
+            progress,
+        )
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    return file_path
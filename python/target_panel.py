@@ -0,0 +1,135 @@
+from PyQt5.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QDialogButtonBox,
+    QFormLayout,
+    QGroupBox,
+    QLabel,
+    QLineEdit,
+    QVBoxLayout,
+)
+
+from config import INPUT_LIMITS
+from python.targeting import DEFAULT_PARAMETERS, solvable_parameters, target_solver
+from python.utilis import read_inputs
+from python.worker import SimulationRunner
+
+
+def solve_target(request, progress=None):
+    # SimulationRunner task; `request` holds the launch, target and parameters
+    return target_solver.solve(
+        request["magnus_data"],
+        request["target"],
+        request["parameters"],
+        progress=progress,
+    )
+
+
+class TargetPanel(QDialog):
+    # Solves the launch inputs of the main window for a target landing point
+    # or a point to pass through; "Apply" writes them back and simulates. The
+    # search runs on its own worker thread, solving again cancels the last one.
+    def __init__(self, window):
+        super().__init__(window)
+        self.setWindowTitle("Hit a Target")
+        self.main_window = window
+        self.solution = None
+
+        self.target_inputs = {name: QLineEdit() for name in ("x", "y", "z")}
+        self.pass_through = QCheckBox("Pass through at height Y(m)")
+        self.pass_through.toggled.connect(self.target_inputs["y"].setEnabled)
+        self.target_inputs["y"].setEnabled(False)
+        target_form = QFormLayout()
+        target_form.addRow("X(m)", self.target_inputs["x"])
+        target_form.addRow("Z(m)", self.target_inputs["z"])
+        target_form.addRow(self.pass_through, self.target_inputs["y"])
+        target_group = QGroupBox("Target")
+        target_group.setLayout(target_form)
+
+        self.parameter_boxes = {}
+        parameter_layout = QVBoxLayout()
+        for name in solvable_parameters():
+            box = QCheckBox(INPUT_LIMITS[name]["parameter"])
+            box.setChecked(name in DEFAULT_PARAMETERS)
+            self.parameter_boxes[name] = box
+            parameter_layout.addWidget(box)
+        parameter_group = QGroupBox("Solve For")
+        parameter_group.setLayout(parameter_layout)
+
+        self.result_label = QLabel()
+        self.result_label.setWordWrap(True)
+        self.runner = SimulationRunner(self, task=solve_target)
+        self.runner.progress.connect(
+            lambda percent: self.result_label.setText(f"Solving... {percent}%")
+        )
+        self.runner.completed.connect(self.show_solution)
+        self.runner.failed.connect(self.result_label.setText)
+        buttons = QDialogButtonBox(QDialogButtonBox.Apply | QDialogButtonBox.Close)
+        self.solve_btn = buttons.addButton("Solve", QDialogButtonBox.ActionRole)
+        self.apply_btn = buttons.button(QDialogButtonBox.Apply)
+        self.apply_btn.setEnabled(False)
+        self.solve_btn.clicked.connect(self.solve)
+        self.apply_btn.clicked.connect(self.apply)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(target_group)
+        layout.addWidget(parameter_group)
+        layout.addWidget(self.result_label)
+        layout.addWidget(buttons)
+
+    def target(self):
+        names = ["x", "y", "z"] if self.pass_through.isChecked() else ["x", "z"]
+        for name in names:
+            if self.target_inputs[name].text() == "":
+                raise ValueError(f"Missing target {name.upper()}")
+        return {name: float(self.target_inputs[name].text()) for name in names}
+
+    def solve(self):
+        parameters = [
+            name for name, box in self.parameter_boxes.items() if box.isChecked()
+        ]
+        self.apply_btn.setEnabled(False)
+        try:
+            if not parameters:
+                raise ValueError("Select at least one parameter to solve for")
+            target = self.target()
+            read_inputs(self.main_window)
+        except Exception as e:
+            self.result_label.setText(str(e))
+            return
+        self.result_label.setText("Solving...")
+        self.runner.submit(
+            {
+                "magnus_data": dict(self.main_window.magnus_data),
+                "target": target,
+                "parameters": parameters,
+            }
+        )
+
+    def show_solution(self, result):
+        values = ", ".join(
+            f"{INPUT_LIMITS[name]['parameter']} {value:.3f}{INPUT_LIMITS[name]['unit']}"
+            for name, value in result["parameters"].items()
+        )
+        state = "Hit" if result["converged"] else "Closest miss"
+        self.result_label.setText(
+            f"{state}: {values} (miss {result['miss']:.3f} m, "
+            f"{result['evaluations']} runs, {result['method']})"
+        )
+        self.solution = result["parameters"]
+        self.apply_btn.setEnabled(True)
+
+    def reject(self):
+        self.runner.cancel()
+        super().reject()
+
+    def apply(self):
+        # the top and side spin weights live in the hidden fields behind the
+        # spin radio buttons, so they are written like any other input
+        for section, fields in self.main_window.simulation_inputs.items():
+            for label, text_field in fields.items():
+                name = self.main_window.input_parameters[section][label.text()]
+                if name in self.solution:
+                    text_field.setText(f"{self.solution[name]:.10g}")
+        self.main_window.simulate()
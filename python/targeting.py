@@ -0,0 +1,225 @@
+# Inverse solver: finds launch parameters that land on a target (x, z) or pass
+# through a point (x, y, z). Every guess is one summary integration, not a full
+# trajectory; a plane event at the target gives the crossing point. Square
+# problems (as many free parameters as target coordinates) are shot at with
+# Broyden's method; anything left over is polished with
+# Nelder-Mead. Parameters are searched inside INPUT_LIMITS, scaled to [0, 1].
+import json
+
+import numpy as np
+
+from config import INPUT_LIMITS
+from python import calculation
+from python.cache import normalize
+
+DEFAULT_PARAMETERS = ["elevation_angle", "azimuth_angle"]
+# residual (m) of a guess that cannot be evaluated
+MISSED = 1e6
+# solutions kept as warm starts, the oldest is dropped first
+WARM_STARTS = 32
+
+
+def solvable_parameters():
+    # parameters the solver may vary. The spin rate only changes the flight
+    # under the table force model; the constant model spins the ball by the
+    # top and side spin weights instead.
+    if calculation.FORCE_MODEL == "tables":
+        spin = ["spin_rate"]
+    else:
+        spin = ["top_spin", "side_spin"]
+    return ["initial_velocity", "elevation_angle", "azimuth_angle", *spin]
+
+
+def landing_point(summary):
+    return np.array([summary["range"], summary["lateral_deviation"]])
+
+
+def crossing_point(summary):
+    # height and lateral position where the flight crosses the target plane
+    for event in summary["events"]:
+        if event["name"] == "plane":
+            return np.array([event["y"], event["z"]])
+    return None
+
+
+def target_residual(magnus_data, target):
+    # target {"x", "z"} is a landing point, with "y" it is a point to pass through
+    if "y" not in target:
+        summary = calculation.run_magnus_summary(magnus_data)
+        return landing_point(summary) - np.array([target["x"], target["z"]])
+    summary = calculation.run_magnus_summary(
+        {**magnus_data, "events": [{"type": "plane", "x": target["x"]}]}
+    )
+    point = crossing_point(summary)
+    if point is None:
+        # lands short: count the shortfall as height below the target so
+        # the search still knows which way to go
+        x, z = landing_point(summary)
+        point = np.array([x - target["x"], z])
+    return point - np.array([target["y"], target["z"]])
+
+
+def warm_start_key(magnus_data, parameters):
+    # the solved parameters and every launch value the solver keeps fixed
+    fixed = {
+        name: value for name, value in magnus_data.items() if name not in parameters
+    }
+    return tuple(parameters), json.dumps(normalize(fixed), sort_keys=True)
+
+
+class TargetSolver:
+    # The last solution for a launch and parameter set is the next warm start,
+    # together with its Jacobian, which does not depend on where the target
+    # is, so nudging the target converges in a few evaluations. Any other
+    # launch starts from its own inputs.
+    def __init__(self, tolerance=0.01, max_evaluations=200):
+        self.tolerance = tolerance
+        self.max_evaluations = max_evaluations
+        self.warm_starts = {}
+
+    def solve(self, magnus_data, target, parameters=None, initial=None, progress=None):
+        # progress(fraction) is called after every evaluation with the share
+        # of max_evaluations used; raising from it stops the search
+        parameters = list(parameters or DEFAULT_PARAMETERS)
+        unsolvable = sorted(set(parameters) - set(solvable_parameters()))
+        if unsolvable:
+            raise ValueError(
+                f"Cannot solve for {', '.join(unsolvable)} with the "
+                f"{calculation.FORCE_MODEL} force model"
+            )
+        lower = np.array([INPUT_LIMITS[name]["minimum"] for name in parameters])
+        span = np.array([INPUT_LIMITS[name]["maximum"] for name in parameters]) - lower
+        key = warm_start_key(magnus_data, parameters)
+        warm = None if initial else self.warm_starts.get(key)
+        start = initial or (warm and warm["values"])
+        if start is None:
+            start = {name: magnus_data[name] for name in parameters}
+        # the Jacobian only carries over between targets of the same kind
+        kind = tuple(sorted(target))
+        jacobian = warm["jacobian"] if warm and warm["kind"] == kind else None
+        evaluations = 0
+
+        def launch(u):
+            values = lower + np.clip(u, 0, 1) * span
+            return {**magnus_data, **dict(zip(parameters, values.tolist()))}
+
+        def residual(u):
+            nonlocal evaluations
+            evaluations += 1
+            r = target_residual(launch(u), target)
+            if progress is not None:
+                progress(min(evaluations / self.max_evaluations, 1.0))
+            return np.where(np.isfinite(r), r, MISSED)
+
+        u = (np.array([start[name] for name in parameters]) - lower) / span
+        r = residual(u)
+        method = "warm start"
+        if len(u) == len(r) and np.linalg.norm(r) > self.tolerance:
+            method = "shooting"
+            u, r, jacobian = self.shoot(residual, u, r, lambda: evaluations, jacobian)
+            if np.linalg.norm(r) > self.tolerance and warm is not None:
+                # the kept Jacobian may not fit this target, start afresh
+                u, r, jacobian = self.shoot(residual, u, r, lambda: evaluations)
+        if np.linalg.norm(r) > self.tolerance:
+            method = "nelder-mead"
+            u, r = self.nelder_mead(residual, u, r, lambda: evaluations)
+
+        solution = launch(u)
+        values = {name: solution[name] for name in parameters}
+        miss = float(np.linalg.norm(r))
+        if miss <= self.tolerance:
+            self.warm_starts.pop(key, None)
+            self.warm_starts[key] = {
+                "values": values,
+                "jacobian": jacobian,
+                "kind": kind,
+            }
+            if len(self.warm_starts) > WARM_STARTS:
+                del self.warm_starts[next(iter(self.warm_starts))]
+        return {
+            "parameters": values,
+            "miss": miss,
+            "converged": miss <= self.tolerance,
+            "evaluations": evaluations,
+            "method": method,
+        }
+
+    def shoot(self, residual, u, r, evaluations, jacobian=None, step=1e-4):
+        # Broyden's method from a given or a forward-difference Jacobian, with
+        # halving steps whenever a full step makes the miss worse
+        if jacobian is None:
+            jacobian = np.column_stack(
+                [(residual(u + step * e) - r) / step for e in np.eye(len(u))]
+            )
+        else:
+            jacobian = jacobian.copy()
+        while (
+            np.linalg.norm(r) > self.tolerance and evaluations() < self.max_evaluations
+        ):
+            try:
+                delta = -np.linalg.solve(jacobian, r)
+            except np.linalg.LinAlgError:
+                break
+            for _ in range(6):
+                candidate = np.clip(u + delta, 0, 1)
+                candidate_residual = residual(candidate)
+                if np.linalg.norm(candidate_residual) < np.linalg.norm(r):
+                    break
+                delta /= 2
+            else:
+                break
+            moved = candidate - u
+            jacobian += np.outer(candidate_residual - r - jacobian @ moved, moved) / (
+                moved @ moved
+            )
+            u, r = candidate, candidate_residual
+        return u, r, jacobian
+
+    def nelder_mead(self, residual, u, r, evaluations, size=0.05):
+        def cost(point):
+            point_residual = residual(point)
+            return point_residual @ point_residual, point_residual
+
+        simplex = [np.clip(u, 0, 1)] + [
+            np.clip(u + size * e, 0, 1) for e in np.eye(len(u))
+        ]
+        results = [(r @ r, r)] + [cost(point) for point in simplex[1:]]
+        while evaluations() < self.max_evaluations:
+            order = np.argsort([value for value, _ in results])
+            simplex = [simplex[i] for i in order]
+            results = [results[i] for i in order]
+            if np.sqrt(results[0][0]) <= self.tolerance:
+                break
+            if np.max(np.abs(np.array(simplex[1:]) - simplex[0])) < 1e-9:
+                break
+            # an unreachable target: every vertex misses by the same distance
+            if np.sqrt(results[-1][0]) - np.sqrt(results[0][0]) < 1e-3 * self.tolerance:
+                break
+            centroid = np.mean(simplex[:-1], axis=0)
+            reflected = np.clip(2 * centroid - simplex[-1], 0, 1)
+            reflected_result = cost(reflected)
+            if reflected_result[0] < results[0][0]:
+                expanded = np.clip(3 * centroid - 2 * simplex[-1], 0, 1)
+                expanded_result = cost(expanded)
+                if expanded_result[0] < reflected_result[0]:
+                    simplex[-1], results[-1] = expanded, expanded_result
+                else:
+                    simplex[-1], results[-1] = reflected, reflected_result
+            elif reflected_result[0] < results[-2][0]:
+                simplex[-1], results[-1] = reflected, reflected_result
+            else:
+                contracted = (centroid + simplex[-1]) / 2
+                contracted_result = cost(contracted)
+                if contracted_result[0] < results[-1][0]:
+                    simplex[-1], results[-1] = contracted, contracted_result
+                else:
+                    # shrink towards the best vertex
+                    simplex = [simplex[0]] + [
+                        (simplex[0] + point) / 2 for point in simplex[1:]
+                    ]
+                    results = [results[0]] + [cost(point) for point in simplex[1:]]
+        best = int(np.argmin([value for value, _ in results]))
+        return simplex[best], results[best][1]
+
+
+target_solver = TargetSolver()
@@ -1,8 +1,10 @@
 from PyQt5.QtWidgets import QRadioButton, QTabWidget
 from PyQt5.QtCore import QTimer, Qt
-from python.calculation import run_magnus_simulation
-from python.plot import plot_calculated_data
 from config import INPUT_LIMITS
+from python.profiling import profiler, stage
+
+# stages shown in the status bar while profiling
+STATUS_STAGES = ["validate", "simulate", "integrate", "marshal", "plot"]
 
 
 class InputError(Exception):
@@ -25,25 +27,12 @@ def validate_input(parameter_limit, value):
 
 def simulate_data(self):
     try:
-        for input_parameter, data_item in self.simulation_inputs.items():
-            for label, text_edit in data_item.items():
-                input_variable = self.input_parameters[input_parameter][label.text()]
-                if text_edit.text() == "":
-                    if (
-                        isinstance(label, QRadioButton)
-                        and not self.side_spin.isChecked()
-                        and not self.top_spin.isChecked()
-                        and not self.no_spin.isChecked()
-                    ):
-                        raise Exception(f"Please select a spin type!")
-
-                    raise InputError(f"Missing Input for {label.text()}")
-                validate_input(INPUT_LIMITS[input_variable], float(text_edit.text()))
-                self.magnus_data[input_variable] = float(text_edit.text())
-        self.status.showMessage("Simulation Completed!!")
-        self.calculated_data = run_magnus_simulation(self.magnus_data)
-        add_plot_area(self)
-        plot_calculated_data(self)
+        with stage("validate"):
+            read_inputs(self)
+        self.simulation_progress.setValue(0)
+        self.simulation_progress.setVisible(True)
+        self.status.showMessage("Simulating.....")
+        self.runner.submit(self.magnus_data)
 
     except InputError as e:
         self.status.showMessage(str(e), 3000)
@@ -59,6 +48,72 @@ def simulate_data(self):
         default_msg(self)
 
 
+def read_inputs(self):
+    for input_parameter, data_item in self.simulation_inputs.items():
+        for label, text_edit in data_item.items():
+            input_variable = self.input_parameters[input_parameter][label.text()]
+            if text_edit.text() == "":
+                if (
+                    isinstance(label, QRadioButton)
+                    and not self.side_spin.isChecked()
+                    and not self.top_spin.isChecked()
+                    and not self.no_spin.isChecked()
+                ):
+                    raise Exception(f"Please select a spin type!")
+
+                raise InputError(f"Missing Input for {label.text()}")
+            validate_input(INPUT_LIMITS[input_variable], float(text_edit.text()))
+            self.magnus_data[input_variable] = float(text_edit.text())
+
+
+def show_results(self, calculated_data):
+    self.simulation_progress.setVisible(False)
+    with stage("plot"):
+        display_data(self, calculated_data)
+    message = f"Simulation Completed!! ({self.calculated_data['steps']} steps)"
+    if profiler.enabled:
+        message += f" | {profiler.summary(STATUS_STAGES)}"
+    self.status.showMessage(message)
+
+
+def show_partial(self, chunks):
+    from python.plot import design_canvas, plot_partial_data
+
+    if not hasattr(self, "canvas"):
+        design_canvas(self)
+        self.add_tabs(self.plot_tabs)
+    add_plot_area(self)
+    plot_partial_data(self, chunks)
+
+
+def show_stored_run(self, store, run_id):
+    from python.calculation import trajectory_result
+
+    # columns are memmap views, so only the plotted rows are read from disk
+    self.magnus_data = dict(store.parameters(run_id))
+    display_data(self, trajectory_result(store.load(run_id)))
+    self.status.showMessage(f"Showing stored run {run_id}")
+
+
+def display_data(self, calculated_data):
+    from python.plot import design_canvas, plot_calculated_data, reset_canvas
+
+    if not hasattr(self, "canvas"):
+        # matplotlib and the figures are only set up once there is a result
+        design_canvas(self)
+        self.add_tabs(self.plot_tabs)
+    self.calculated_data = calculated_data
+    reset_canvas(self)
+    add_plot_area(self)
+    plot_calculated_data(self)
+
+
+def simulation_failed(self, message):
+    self.simulation_progress.setVisible(False)
+    self.status.showMessage(message, 3000)
+    default_msg(self)
+
+
 def default_msg(self):
     QTimer.singleShot(3000, lambda: self.status.showMessage("Welcome to SpinFlight!!!"))
 
@@ -0,0 +1,162 @@
+import time
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from config import STREAM_PLOT_INTERVAL
+from python.profiling import stage
+
+
+class SimulationCancelled(Exception):
+    pass
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class SimulationJob(QThread):
+    # `partial` carries the trajectory chunks integrated so far, at most once
+    # per STREAM_PLOT_INTERVAL; cached results arrive in one piece. A `task`
+    # runs as task(magnus_data, progress=...) instead of the simulation.
+    progress = pyqtSignal(int)
+    partial = pyqtSignal(object)
+    completed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, magnus_data, parent=None, task=None):
+        super().__init__(parent)
+        self.magnus_data = dict(magnus_data)
+        self.task = task
+        self.cancelled = False
+        self.chunks = []
+        self.last_partial = 0.0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, fraction):
+        # called from inside the integrator, which stops on the exception
+        if self.cancelled:
+            raise SimulationCancelled()
+        self.progress.emit(int(fraction * 100))
+
+    def receive(self, chunk):
+        if self.cancelled:
+            raise SimulationCancelled()
+        self.chunks.append(chunk)
+        now = time.perf_counter()
+        if now - self.last_partial >= STREAM_PLOT_INTERVAL:
+            self.last_partial = now
+            self.partial.emit(list(self.chunks))
+
+    def run(self):
+        try:
+            # imported on the first run so the window does not wait for the extension
+            from python.cache import cached_simulation
+
+            if self.task is not None:
+                calculated_data = self.task(self.magnus_data, progress=self.report)
+            else:
+                with stage("simulate"):
+                    calculated_data = cached_simulation(
+                        self.magnus_data, progress=self.report, chunk=self.receive
+                    )
+        except SimulationCancelled:
+            return
+        except Exception as e:
+            if not self.cancelled:
+                self.failed.emit(str(e))
+            return
+        if not self.cancelled:
+            self.completed.emit(calculated_data)
+
+
+class SimulationRunner(QObject):
+    # Runs one SimulationJob at a time. Submitting while a job is running
+    # cancels it and queues the new request; only the latest queued request
+    # runs once the current job has stopped. Jobs run `task` when given.
+    progress = pyqtSignal(int)
+    partial = pyqtSignal(object)
+    completed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None, task=None):
+        super().__init__(parent)
+        self.task = task
+        self.job = None
+        self.pending = None
+
+    def is_busy(self):
+        return self.job is not None
+
+    def submit(self, magnus_data):
+        if self.job is not None:
+            self.pending = dict(magnus_data)
+            self.job.cancel()
+            return
+        self.start(magnus_data)
+
+    def cancel(self):
+        self.pending = None
+        if self.job is not None:
+            self.job.cancel()
+
+    def start(self, magnus_data):
+        job = SimulationJob(magnus_data, self, self.task)
+        job.progress.connect(self.progress)
+        job.partial.connect(lambda chunks, job=job: self.deliver_partial(job, chunks))
+        job.completed.connect(lambda data, job=job: self.deliver(job, data))
+        job.failed.connect(self.failed)
+        job.finished.connect(lambda job=job: self.job_finished(job))
+        self.job = job
+        job.start()
+
+    def deliver(self, job, calculated_data):
+        if job is self.job and not job.cancelled and self.pending is None:
+            self.completed.emit(calculated_data)
+
+    def deliver_partial(self, job, chunks):
+        if job is self.job and not job.cancelled and self.pending is None:
+            self.partial.emit(chunks)
+
+    def job_finished(self, job):
+        job.deleteLater()
+        self.job = None
+        if self.pending is not None:
+            magnus_data, self.pending = self.pending, None
+            self.start(magnus_data)
+
+
+class ExportJob(QThread):
+    # Runs export(calculated_data, destination, progress=...), e.g. export_plots
+    # or export_table; `finished` fires after completed, failed or a cancellation.
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, export, calculated_data, destination, parent=None):
+        super().__init__(parent)
+        self.export = export
+        self.calculated_data = calculated_data
+        self.destination = destination
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, fraction):
+        if self.cancelled:
+            raise ExportCancelled()
+        self.progress.emit(int(fraction * 100))
+
+    def run(self):
+        try:
+            with stage("export"):
+                exported = self.export(
+                    self.calculated_data, self.destination, progress=self.report
+                )
+        except ExportCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.completed.emit(exported)
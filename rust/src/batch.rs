@@ -0,0 +1,79 @@
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::thread;
+
+use crate::force_model::ForceTables;
+use crate::integrator::{RK4Integrator, TrajectoryPoint};
+use crate::parameter::MagnusParameter;
+use crate::summary::TrajectorySummary;
+use crate::vector3::Vec3;
+
+// launches handed to a worker at a time; small enough to balance short and long flights
+const CHUNK_SIZE: usize = 64;
+
+pub fn worker_count(workers: Option<usize>, launches: usize) -> usize {
+    let available = thread::available_parallelism().map(|n| n.get()).unwrap_or(1);
+    workers.unwrap_or(available).clamp(1, launches.div_ceil(CHUNK_SIZE).max(1))
+}
+
+pub fn simulate_batch_points(
+    launches: &[(MagnusParameter, Vec3)],
+    mass: f64,
+    tables: Option<&ForceTables>,
+    workers: Option<usize>,
+) -> Vec<Vec<TrajectoryPoint>> {
+    parallel_map(launches, workers, |&(params, spin_vector)| {
+        RK4Integrator::new(params, mass, spin_vector)
+            .with_tables(tables)
+            .simulate_points(params.duration, params.time_step)
+    })
+}
+
+pub fn simulate_batch_summaries(
+    launches: &[(MagnusParameter, Vec3)],
+    mass: f64,
+    tables: Option<&ForceTables>,
+    workers: Option<usize>,
+) -> Vec<TrajectorySummary> {
+    parallel_map(launches, workers, |&(params, spin_vector)| {
+        RK4Integrator::new(params, mass, spin_vector)
+            .with_tables(tables)
+            .summarize(params.duration, params.time_step, &[])
+    })
+}
+
+fn parallel_map<T, F>(launches: &[(MagnusParameter, Vec3)], workers: Option<usize>, simulate: F) -> Vec<T>
+where
+    T: Send,
+    F: Fn(&(MagnusParameter, Vec3)) -> T + Sync,
+{
+    let workers = worker_count(workers, launches.len());
+    if workers == 1 {
+        return launches.iter().map(simulate).collect();
+    }
+
+    let chunks: Vec<&[(MagnusParameter, Vec3)]> = launches.chunks(CHUNK_SIZE).collect();
+    let next_chunk = AtomicUsize::new(0);
+
+    thread::scope(|scope| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                scope.spawn(|| {
+                    let mut finished = Vec::new();
+                    loop {
+                        let index = next_chunk.fetch_add(1, Ordering::Relaxed);
+                        let Some(chunk) = chunks.get(index) else { break };
+                        finished.push((index, chunk.iter().map(&simulate).collect::<Vec<T>>()));
+                    }
+                    finished
+                })
+            })
+            .collect();
+
+        let mut finished: Vec<(usize, Vec<T>)> = handles
+            .into_iter()
+            .flat_map(|handle| handle.join().expect("batch worker panicked"))
+            .collect();
+        finished.sort_by_key(|(index, _)| *index);
+        finished.into_iter().flat_map(|(_, results)| results).collect()
+    })
+}
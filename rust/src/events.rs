@@ -0,0 +1,189 @@
+use pyo3::prelude::*;
+use pyo3::pymethods;
+
+use crate::integrator::PresentState;
+use crate::vector3::Vec3;
+
+const ROOT_TOLERANCE: f64 = 1e-12;
+const ROOT_ITERATIONS: usize = 60;
+
+#[derive(Clone, Copy, Debug, PartialEq)]
+enum EventKind {
+    Ground,
+    Apex,
+    PlaneX(f64),
+    Wall { x: f64, height: f64 },
+}
+
+#[pyclass]
+#[derive(Clone, Copy, Debug)]
+pub struct EventSpec {
+    kind: EventKind,
+}
+
+#[pymethods]
+impl EventSpec {
+    /// Highest point of the flight (vertical velocity turns negative).
+    #[staticmethod]
+    pub fn apex() -> Self {
+        Self { kind: EventKind::Apex }
+    }
+
+    /// Crossing of the vertical plane at `x`, e.g. a goal line or a net.
+    #[staticmethod]
+    pub fn plane_x(x: f64) -> Self {
+        Self { kind: EventKind::PlaneX(x) }
+    }
+
+    /// Crossing of a wall at `x`; the record tells whether the ball cleared `height`.
+    #[staticmethod]
+    pub fn wall(x: f64, height: f64) -> Self {
+        Self { kind: EventKind::Wall { x, height } }
+    }
+}
+
+impl EventSpec {
+    pub fn ground() -> Self {
+        Self { kind: EventKind::Ground }
+    }
+
+    fn name(&self) -> &'static str {
+        match self.kind {
+            EventKind::Ground => "ground",
+            EventKind::Apex => "apex",
+            EventKind::PlaneX(_) => "plane",
+            EventKind::Wall { .. } => "wall",
+        }
+    }
+
+    // the event fires where this changes sign in the direction given by `crossed`
+    fn value(&self, state: &PresentState) -> f64 {
+        match self.kind {
+            EventKind::Ground => state.position.y,
+            EventKind::Apex => state.velocity.y,
+            EventKind::PlaneX(x) | EventKind::Wall { x, .. } => state.position.x - x,
+        }
+    }
+
+    fn crossed(&self, start: f64, end: f64) -> bool {
+        match self.kind {
+            EventKind::Ground | EventKind::Apex => start > 0.0 && end <= 0.0,
+            EventKind::PlaneX(_) | EventKind::Wall { .. } => (start < 0.0) != (end < 0.0),
+        }
+    }
+
+    fn record(&self, time: f64, state: &PresentState) -> EventRecord {
+        EventRecord {
+            name: self.name().to_string(),
+            time,
+            position: state.position,
+            velocity: state.velocity,
+            cleared: match self.kind {
+                EventKind::Wall { height, .. } => Some(state.position.y > height),
+                _ => None,
+            },
+        }
+    }
+}
+
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct EventRecord {
+    #[pyo3(get)]
+    pub name: String,
+    #[pyo3(get)]
+    pub time: f64,
+    #[pyo3(get)]
+    pub position: Vec3,
+    #[pyo3(get)]
+    pub velocity: Vec3,
+    #[pyo3(get)]
+    pub cleared: Option<bool>,
+}
+
+pub struct EventTracker {
+    specs: Vec<EventSpec>,
+    pub records: Vec<EventRecord>,
+}
+
+impl EventTracker {
+    pub fn new(events: &[EventSpec]) -> Self {
+        // the ground is always tracked, a spec given twice only once
+        let mut specs = vec![EventSpec::ground()];
+        for spec in events {
+            if !specs.iter().any(|known| known.kind == spec.kind) {
+                specs.push(*spec);
+            }
+        }
+        Self { specs, records: Vec::new() }
+    }
+
+    /// Looks for events inside the step from `start` (time `t0`) to `end` (time `t0 + dt`).
+    /// `interpolate` maps a step fraction to a state and is used to locate the crossing;
+    /// `advance` integrates from `start` by a fraction of the step to get the exact state.
+    /// Returns the landing time and state when the ball reaches the ground in this step.
+    pub fn check_step(
+        &mut self,
+        t0: f64,
+        dt: f64,
+        start: &PresentState,
+        end: &PresentState,
+        interpolate: impl Fn(f64) -> PresentState,
+        advance: impl Fn(f64) -> PresentState,
+    ) -> Option<(f64, PresentState)> {
+        let mut crossings: Vec<(f64, EventSpec)> = self
+            .specs
+            .iter()
+            .filter(|spec| spec.crossed(spec.value(start), spec.value(end)))
+            .map(|spec| (find_root(|theta| spec.value(&interpolate(theta))), *spec))
+            .collect();
+        crossings.sort_by(|a, b| a.0.total_cmp(&b.0));
+
+        for (theta, spec) in crossings {
+            let mut state = advance(theta);
+            if spec.kind == EventKind::Ground {
+                state.position.y = 0.0;
+                self.records.push(spec.record(t0 + theta * dt, &state));
+                return Some((t0 + theta * dt, state));
+            }
+            self.records.push(spec.record(t0 + theta * dt, &state));
+        }
+        None
+    }
+}
+
+// Illinois variant of regula falsi on the step fraction [0, 1]
+fn find_root(value: impl Fn(f64) -> f64) -> f64 {
+    let (mut low, mut high) = (0.0, 1.0);
+    let (mut value_low, mut value_high) = (value(low), value(high));
+    let mut theta = high;
+    let mut side = 0;
+
+    for _ in 0..ROOT_ITERATIONS {
+        if high - low < ROOT_TOLERANCE || value_high == value_low {
+            break;
+        }
+        let previous = theta;
+        theta = (low * value_high - high * value_low) / (value_high - value_low);
+        let value_theta = value(theta);
+        if value_theta == 0.0 || (theta - previous).abs() < ROOT_TOLERANCE {
+            break;
+        }
+        if (value_theta < 0.0) == (value_high < 0.0) {
+            high = theta;
+            value_high = value_theta;
+            if side == 1 {
+                value_low *= 0.5;
+            }
+            side = 1;
+        } else {
+            low = theta;
+            value_low = value_theta;
+            if side == -1 {
+                value_high *= 0.5;
+            }
+            side = -1;
+        }
+    }
+    theta
+}
@@ -0,0 +1,130 @@
+use std::f64::consts::PI;
+use std::sync::Arc;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use crate::integrator::PresentState;
+use crate::parameter::MagnusParameter;
+use crate::vector3::Vec3;
+
+// values on a uniform grid, interpolated linearly and clamped at both ends
+#[derive(Debug)]
+pub struct LookupTable {
+    start: f64,
+    inverse_step: f64,
+    last: f64,
+    values: Vec<f64>,
+}
+
+impl LookupTable {
+    fn new(name: &str, grid: Vec<f64>, values: Vec<f64>) -> PyResult<Self> {
+        if grid.len() < 2 || grid.len() != values.len() {
+            return Err(PyValueError::new_err(format!(
+                "{name} needs at least two grid points and one value per point"
+            )));
+        }
+        let count = grid.len() - 1;
+        let span = grid[count] - grid[0];
+        let evenly_spaced = grid
+            .iter()
+            .enumerate()
+            .all(|(i, x)| (x - (grid[0] + span * i as f64 / count as f64)).abs() <= 1e-9 * span.abs());
+        if span <= 0.0 || !evenly_spaced {
+            return Err(PyValueError::new_err(format!("{name} grid must be increasing and evenly spaced")));
+        }
+        Ok(Self {
+            start: grid[0],
+            inverse_step: count as f64 / span,
+            last: count as f64,
+            values,
+        })
+    }
+
+    #[inline]
+    pub fn at(&self, x: f64) -> f64 {
+        let position = ((x - self.start) * self.inverse_step).clamp(0.0, self.last);
+        let index = (position as usize).min(self.values.len() - 2);
+        let fraction = position - index as f64;
+        self.values[index] + (self.values[index + 1] - self.values[index]) * fraction
+    }
+}
+
+#[derive(Debug)]
+pub struct TableModel {
+    drag: LookupTable,
+    lift: LookupTable,
+    density: LookupTable,
+    spin_decay: LookupTable,
+    viscosity: f64,
+}
+
+impl TableModel {
+    /// Magnus and drag force from the tabulated coefficients. `spin_axis` is the unit
+    /// spin axis signed with the spin direction; `speed` is |velocity| and positive.
+    #[inline]
+    pub fn forces(&self, params: &MagnusParameter, spin_axis: Vec3, state: &PresentState, speed: f64) -> (Vec3, Vec3) {
+        let radius = params.radius;
+        let density = params.air_density * self.density.at(state.position.y);
+        let reynolds = density * speed * (2.0 * radius) / self.viscosity;
+        let spin = params.spin_rate * self.spin_decay.at(state.time);
+        let spin_ratio = spin.abs() * radius / speed;
+        // dynamic pressure times the cross section, over the speed
+        let pressure = 0.5 * density * (PI * radius * radius) * speed;
+        let magnus = (pressure * self.lift.at(spin_ratio)) * spin_axis.cross(&state.velocity);
+        let drag = -(pressure * self.drag.at(reynolds)) * state.velocity;
+        (magnus, drag)
+    }
+}
+
+/// Precomputed aerodynamic tables on uniform grids: drag coefficient against Reynolds
+/// number, lift coefficient against spin ratio (spin rate times radius over speed),
+/// air density relative to the launch against height, and the fraction of the initial
+/// spin rate left against time. Lookups are O(1) linear interpolations, clamped at the
+/// ends of each grid. One instance is shared by every launch it is passed to.
+#[pyclass(frozen)]
+#[derive(Clone, Debug)]
+pub struct ForceTables {
+    pub(crate) model: Arc<TableModel>,
+}
+
+#[pymethods]
+impl ForceTables {
+    #[new]
+    #[pyo3(signature = (reynolds, drag, spin_ratio, lift, height, density, time, spin_decay, viscosity=1.81e-5))]
+    fn new(
+        reynolds: Vec<f64>,
+        drag: Vec<f64>,
+        spin_ratio: Vec<f64>,
+        lift: Vec<f64>,
+        height: Vec<f64>,
+        density: Vec<f64>,
+        time: Vec<f64>,
+        spin_decay: Vec<f64>,
+        viscosity: f64,
+    ) -> PyResult<Self> {
+        if viscosity <= 0.0 {
+            return Err(PyValueError::new_err("viscosity must be positive"));
+        }
+        Ok(Self {
+            model: Arc::new(TableModel {
+                drag: LookupTable::new("drag", reynolds, drag)?,
+                lift: LookupTable::new("lift", spin_ratio, lift)?,
+                density: LookupTable::new("density", height, density)?,
+                spin_decay: LookupTable::new("spin_decay", time, spin_decay)?,
+                viscosity,
+            }),
+        })
+    }
+
+    /// Drag coefficient, lift coefficient, relative density and spin fraction at the given points.
+    fn lookup(&self, reynolds: f64, spin_ratio: f64, height: f64, time: f64) -> (f64, f64, f64, f64) {
+        let model = &self.model;
+        (
+            model.drag.at(reynolds),
+            model.lift.at(spin_ratio),
+            model.density.at(height),
+            model.spin_decay.at(time),
+        )
+    }
+}
@@ -1,23 +1,89 @@
-use pyo3::pyclass;
+use std::ops::{Add, Mul, Sub};
+use std::sync::Arc;
 
-use crate::parameter::MagnusParameter;
+use pyo3::prelude::*;
+
+use crate::events::{EventRecord, EventSpec, EventTracker};
+use crate::force_model::{ForceTables, TableModel};
+use crate::parameter::{IntegrationMethod, MagnusParameter};
+use crate::summary::{SummaryBuilder, TrajectorySummary};
 use crate::vector3::Vec3;
 
 const GRAVITY:f64 = 9.81;
 
+// Dormand-Prince 5(4) tableau; the 7th stage equals the 5th order solution (FSAL)
+const DP_C: [f64; 6] = [1.0 / 5.0, 3.0 / 10.0, 4.0 / 5.0, 8.0 / 9.0, 1.0, 1.0];
+const DP_A: [[f64; 6]; 6] = [
+    [1.0 / 5.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [3.0 / 40.0, 9.0 / 40.0, 0.0, 0.0, 0.0, 0.0],
+    [44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0, 0.0, 0.0, 0.0],
+    [19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0, 0.0, 0.0],
+    [9017.0 / 3168.0, -355.0 / 33.0, 46732.0 / 5247.0, 49.0 / 176.0, -5103.0 / 18656.0, 0.0],
+    [35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0],
+];
+// difference between the 5th and embedded 4th order weights
+const DP_E: [f64; 7] = [
+    71.0 / 57600.0, 0.0, -71.0 / 16695.0, 71.0 / 1920.0,
+    -17253.0 / 339200.0, 22.0 / 525.0, -1.0 / 40.0,
+];
+// Hairer's continuous extension for dense output
+const DP_D: [f64; 7] = [
+    -12715105075.0 / 11282082432.0, 0.0, 87487479700.0 / 32700410799.0,
+    -10690763975.0 / 1880347072.0, 701980252875.0 / 199316789632.0,
+    -1453857185.0 / 822651844.0, 69997945.0 / 29380423.0,
+];
+const STEP_SAFETY: f64 = 0.9;
+const MIN_STEP_FACTOR: f64 = 0.2;
+const MAX_STEP_FACTOR: f64 = 5.0;
+const MIN_STEP: f64 = 1e-10;
+
+// time, position, velocity, acceleration and the magnus, drag and total force components
+pub const TRAJECTORY_COLUMNS: usize = 19;
+
+// time rides along with the state so time dependent forces see the stage times
 #[derive(Clone,Copy,Debug)]
 pub struct PresentState{
+    pub(crate) time: f64,
     pub(crate) position : Vec3,
     pub(crate) velocity: Vec3
 }
 
 impl PresentState{
-    fn new(position:Vec3, velocity:Vec3) -> Self{
+    fn new(time: f64, position:Vec3, velocity:Vec3) -> Self{
         Self{
+            time,
             position,
             velocity
         }
     }
+
+    fn components(&self) -> [f64; 6] {
+        [
+            self.position.x, self.position.y, self.position.z,
+            self.velocity.x, self.velocity.y, self.velocity.z,
+        ]
+    }
+}
+
+impl Add for PresentState {
+    type Output = PresentState;
+    fn add(self, rhs: PresentState) -> PresentState {
+        PresentState::new(self.time + rhs.time, self.position + rhs.position, self.velocity + rhs.velocity)
+    }
+}
+
+impl Sub for PresentState {
+    type Output = PresentState;
+    fn sub(self, rhs: PresentState) -> PresentState {
+        PresentState::new(self.time - rhs.time, self.position - rhs.position, self.velocity - rhs.velocity)
+    }
+}
+
+impl Mul<f64> for PresentState {
+    type Output = PresentState;
+    fn mul(self, rhs: f64) -> PresentState {
+        PresentState::new(self.time * rhs, self.position * rhs, self.velocity * rhs)
+    }
 }
 
 #[derive(Clone,Copy,Debug)]
@@ -33,6 +99,155 @@ impl DerivativeState{
             acceleration
         }
     }
+
+    // change in state after following this slope for dt
+    fn scaled(&self, dt: f64) -> PresentState {
+        PresentState::new(dt, self.velocity * dt, self.acceleration * dt)
+    }
+}
+
+fn combine_slopes(slopes: &[DerivativeState], weights: &[f64], dt: f64) -> PresentState {
+    let zero = Vec3::new(0.0, 0.0, 0.0);
+    slopes
+        .iter()
+        .zip(weights)
+        .fold(PresentState::new(0.0, zero, zero), |sum, (slope, weight)| sum + slope.scaled(weight * dt))
+}
+
+#[pyclass]
+#[derive(Clone, Copy, Debug, Default)]
+pub struct IntegrationStats {
+    #[pyo3(get)]
+    pub steps: u64,
+    #[pyo3(get)]
+    pub rejected_steps: u64,
+    #[pyo3(get)]
+    pub derivative_evaluations: u64,
+}
+
+/// Time, position and velocity to continue an integration from. Fixed step runs keep
+/// the time grid of the launch, so resuming from a point of a trajectory reproduces
+/// the rest of that trajectory.
+#[pyclass]
+#[derive(Clone, Copy, Debug)]
+pub struct IntegratorState {
+    #[pyo3(get)]
+    pub time: f64,
+    #[pyo3(get)]
+    pub position: Vec3,
+    #[pyo3(get)]
+    pub velocity: Vec3,
+}
+
+#[pymethods]
+impl IntegratorState {
+    #[new]
+    pub fn new(time: f64, position: Vec3, velocity: Vec3) -> Self {
+        Self { time, position, velocity }
+    }
+}
+
+// receives trajectory points as they are integrated
+pub trait TrajectorySink {
+    fn push(&mut self, point: TrajectoryPoint);
+
+    // checked once per step; integration ends early when it returns true
+    fn stopped(&self) -> bool {
+        false
+    }
+}
+
+impl TrajectorySink for Vec<TrajectoryPoint> {
+    fn push(&mut self, point: TrajectoryPoint) {
+        Vec::push(self, point);
+    }
+}
+
+// forwards every `stride`-th point to `inner`; `finish` adds the final point
+pub struct StridedSink<'a, S: TrajectorySink> {
+    inner: &'a mut S,
+    stride: usize,
+    seen: usize,
+    pending: Option<TrajectoryPoint>,
+}
+
+impl<'a, S: TrajectorySink> StridedSink<'a, S> {
+    pub fn new(inner: &'a mut S, stride: usize) -> Self {
+        Self { inner, stride: stride.max(1), seen: 0, pending: None }
+    }
+
+    pub fn finish(self) {
+        if let Some(point) = self.pending {
+            self.inner.push(point);
+        }
+    }
+}
+
+impl<S: TrajectorySink> TrajectorySink for StridedSink<'_, S> {
+    fn push(&mut self, point: TrajectoryPoint) {
+        if self.seen % self.stride == 0 {
+            self.inner.push(point);
+            self.pending = None;
+        } else {
+            self.pending = Some(point);
+        }
+        self.seen += 1;
+    }
+
+    fn stopped(&self) -> bool {
+        self.inner.stopped()
+    }
+}
+
+// calls `report` with the simulated time every `every` points; a false return stops the run
+pub struct ProgressSink<'a, S: TrajectorySink, F: FnMut(f64) -> bool> {
+    inner: &'a mut S,
+    report: F,
+    every: usize,
+    seen: usize,
+    stopped: bool,
+}
+
+impl<'a, S: TrajectorySink, F: FnMut(f64) -> bool> ProgressSink<'a, S, F> {
+    pub fn new(inner: &'a mut S, every: usize, report: F) -> Self {
+        Self { inner, report, every: every.max(1), seen: 0, stopped: false }
+    }
+}
+
+impl<S: TrajectorySink, F: FnMut(f64) -> bool> TrajectorySink for ProgressSink<'_, S, F> {
+    fn push(&mut self, point: TrajectoryPoint) {
+        self.inner.push(point);
+        self.seen += 1;
+        if self.seen % self.every == 0 && !self.stopped {
+            self.stopped = !(self.report)(point.time);
+        }
+    }
+
+    fn stopped(&self) -> bool {
+        self.stopped || self.inner.stopped()
+    }
+}
+
+pub struct Simulation {
+    pub trajectory: Vec<TrajectoryPoint>,
+    pub stats: IntegrationStats,
+    pub events: Vec<EventRecord>,
+}
+
+// accepted Dormand-Prince step with the coefficients of its interpolant
+struct DormandPrinceStep {
+    state: PresentState,
+    last_slope: DerivativeState,
+    error: PresentState,
+    dense: [PresentState; 5],
+}
+
+impl DormandPrinceStep {
+    fn interpolate(&self, theta: f64) -> PresentState {
+        let [start, difference, bspline, curvature, correction] = self.dense;
+        let theta1 = 1.0 - theta;
+        start + (difference + (bspline + (curvature + correction * theta1) * theta) * theta1) * theta
+    }
 }
 
 #[pyclass]
@@ -57,6 +272,20 @@ pub struct TrajectoryPoint {
     pub forces: Forces,
 }
 
+impl TrajectoryPoint {
+    pub fn to_row(&self) -> [f64; TRAJECTORY_COLUMNS] {
+        [
+            self.time,
+            self.position.x, self.position.y, self.position.z,
+            self.velocity.x, self.velocity.y, self.velocity.z,
+            self.acceleration.x, self.acceleration.y, self.acceleration.z,
+            self.forces.magnus.x, self.forces.magnus.y, self.forces.magnus.z,
+            self.forces.drag.x, self.forces.drag.y, self.forces.drag.z,
+            self.forces.total.x, self.forces.total.y, self.forces.total.z,
+        ]
+    }
+}
+
 #[derive(Clone, Copy, Debug)]
 pub struct Forces {
     pub magnus: Vec3,
@@ -75,7 +304,11 @@ impl Forces {
 pub struct RK4Integrator{
     params: MagnusParameter,
     mass: f64,
-    spin_vector: Vec3
+    spin_vector: Vec3,
+    start: Option<IntegratorState>,
+    tables: Option<Arc<TableModel>>,
+    // unit spin axis, negated for a negative spin rate
+    spin_axis: Vec3
 }
 
 impl RK4Integrator{
@@ -83,11 +316,33 @@ impl RK4Integrator{
         Self{
             params,
             mass,
-            spin_vector
+            spin_vector,
+            start: None,
+            tables: None,
+            spin_axis: Vec3::new(0.0, 0.0, 0.0)
+        }
+    }
+
+    // aerodynamic coefficients from lookup tables instead of the constant ones
+    pub fn with_tables(mut self, tables: Option<&ForceTables>) -> Self {
+        let Some(tables) = tables else { return self };
+        let length = self.spin_vector.magnitude();
+        if length > 0.0 {
+            let direction = if self.params.spin_rate < 0.0 { -1.0 } else { 1.0 };
+            self.spin_axis = self.spin_vector * (direction / length);
         }
+        self.tables = Some(Arc::clone(&tables.model));
+        self
+    }
+
+    // integrate from `state` instead of the launch; `duration` stays the end time
+    pub fn starting_from(mut self, state: IntegratorState) -> Self {
+        self.start = Some(state);
+        self
     }
 
-    fn calculate_forces_and_acceleration(&self, velocity: Vec3) -> (Forces, Vec3) {
+    fn calculate_forces_and_acceleration(&self, state: &PresentState) -> (Forces, Vec3) {
+        let velocity = state.velocity;
         let speed = velocity.magnitude();
         
         if speed < 1e-10 {
@@ -96,8 +351,13 @@ impl RK4Integrator{
             return (forces, Vec3::new(0.0, -GRAVITY, 0.0));
         }
 
-        let magnus_force = self.params.lift_coefficient * (self.spin_vector.cross(&velocity));
-        let drag_force = -self.params.drag_coefficient * speed * velocity;
+        let (magnus_force, drag_force) = match &self.tables {
+            None => (
+                self.params.lift_coefficient * (self.spin_vector.cross(&velocity)),
+                -self.params.drag_coefficient * speed * velocity,
+            ),
+            Some(tables) => tables.forces(&self.params, self.spin_axis, state, speed),
+        };
         let grav_force = Vec3::new(0.0, -self.mass * GRAVITY, 0.0);
         
         let forces = Forces::new(magnus_force, drag_force, grav_force);
@@ -107,13 +367,14 @@ impl RK4Integrator{
     }
 
     fn slope_now(&self, state:&PresentState) -> DerivativeState{
-        let (_,acceleration) = self.calculate_forces_and_acceleration(state.velocity);
+        let (_,acceleration) = self.calculate_forces_and_acceleration(state);
         DerivativeState::new(state.velocity, acceleration)
     }
 
     fn slope_future(&self, present_state:&PresentState,derivative_state:&DerivativeState, dt: f64) -> DerivativeState{
         //Updating position and velocity after each slope obtained
        let updated_present_state = PresentState{
+        time: present_state.time + dt,
         position: present_state.position + derivative_state.velocity*dt,
         velocity: present_state.velocity + derivative_state.acceleration*dt,
        };
@@ -130,19 +391,55 @@ impl RK4Integrator{
          let position_change = (k1.velocity + 2.0*(k2.velocity+k3.velocity) + k4.velocity) * (dt/6.0);
          let velocity_change = (k1.acceleration + 2.0*(k2.acceleration+k3.acceleration) + k4.acceleration) * (dt/6.0);
          PresentState{
+            time: current_state.time + dt,
             position : current_state.position+ position_change,
             velocity : current_state.velocity + velocity_change
          }
       
     }
 
-        pub fn simulate_points(&self, duration: f64, dt: f64) -> Vec<TrajectoryPoint> {
-        let num_steps = (duration / dt).ceil() as usize;
-        let mut trajectory:Vec<TrajectoryPoint> = Vec::with_capacity(num_steps + 1);
-        
-        // Initial state
+    fn dormand_prince_step(&self, state: &PresentState, first_slope: &DerivativeState, dt: f64) -> DormandPrinceStep {
+        let mut slopes = [*first_slope; 7];
+        for stage in 0..6 {
+            let stage_state = *state + combine_slopes(&slopes[..=stage], &DP_A[stage][..=stage], dt);
+            slopes[stage + 1] = self.slope_now(&stage_state);
+        }
+        // the last stage was evaluated at the 5th order solution
+        let next_state = *state + combine_slopes(&slopes[..6], &DP_A[5], dt);
 
+        let difference = next_state - *state;
+        let bspline = first_slope.scaled(dt) - difference;
+        DormandPrinceStep {
+            state: next_state,
+            last_slope: slopes[6],
+            error: combine_slopes(&slopes, &DP_E, dt),
+            dense: [
+                *state,
+                difference,
+                bspline,
+                difference - slopes[6].scaled(dt) - bspline,
+                combine_slopes(&slopes, &DP_D, dt),
+            ],
+        }
+    }
 
+    fn error_norm(&self, start: &PresentState, step: &DormandPrinceStep) -> f64 {
+        let start = start.components();
+        let end = step.state.components();
+        let error = step.error.components();
+        let sum: f64 = (0..6)
+            .map(|i| {
+                let scale = self.params.atol + self.params.rtol * start[i].abs().max(end[i].abs());
+                (error[i] / scale).powi(2)
+            })
+            .sum();
+        (sum / 6.0).sqrt()
+    }
+
+    fn initial_state(&self) -> (f64, PresentState) {
+        if let Some(start) = self.start {
+            return (start.time, PresentState::new(start.time, start.position, start.velocity));
+        }
         let vx = self.params.initial_velocity 
             * self.params.elevation_angle.cos() 
             * self.params.azimuth_angle.cos();
@@ -151,48 +448,230 @@ impl RK4Integrator{
             * self.params.elevation_angle.cos() 
             * self.params.azimuth_angle.sin();
         
-        let mut state = PresentState::new(
+        (0.0, PresentState::new(
+            0.0,
             Vec3::new(0.0, 0.0, 0.0),
             Vec3::new(vx, vy, vz),
-        );
-        let (forces,acceleration) = self.calculate_forces_and_acceleration(state.velocity);
-        
-            trajectory.push(TrajectoryPoint {
-            time: 0.0,
+        ))
+    }
+
+    fn trajectory_point(&self, time: f64, state: &PresentState) -> TrajectoryPoint {
+        let (forces, acceleration) = self.calculate_forces_and_acceleration(&PresentState { time, ..*state });
+        TrajectoryPoint {
+            time,
             position: state.position,
             velocity: state.velocity,
             acceleration,
             forces,
-        });
+        }
+    }
+
+    pub fn simulate_points(&self, duration: f64, dt: f64) -> Vec<TrajectoryPoint> {
+        self.simulate(duration, dt, &[], 1, |_| true).trajectory
+    }
+
+    /// Keeps every `output_stride`-th point of the uniform output grid, plus the last one.
+    /// `progress` gets the simulated time roughly every percent of the run and stops
+    /// the integration by returning false.
+    pub fn simulate(
+        &self,
+        duration: f64,
+        dt: f64,
+        events: &[EventSpec],
+        output_stride: usize,
+        progress: impl FnMut(f64) -> bool,
+    ) -> Simulation {
+        let num_points = (duration / dt).ceil() as usize;
+        let output_stride = output_stride.max(1);
+        let mut trajectory = Vec::with_capacity(num_points / output_stride + 2);
+        let mut strided = StridedSink::new(&mut trajectory, output_stride);
+        let mut reporting = ProgressSink::new(&mut strided, num_points / 100, progress);
+        let (stats, events) = self.simulate_into(duration, dt, events, &mut reporting);
+        strided.finish();
+        Simulation {
+            trajectory,
+            stats,
+            events,
+        }
+    }
+
+    // Landing and apex metrics without storing the trajectory; `events` are
+    // located too and kept with the apex and ground records
+    pub fn summarize(&self, duration: f64, dt: f64, events: &[EventSpec]) -> TrajectorySummary {
+        let mut summary = SummaryBuilder::default();
+        let specs: Vec<EventSpec> = std::iter::once(EventSpec::apex()).chain(events.iter().copied()).collect();
+        let (_, events) = self.simulate_into(duration, dt, &specs, &mut summary);
+        summary.finish(events)
+    }
+
+    pub fn simulate_into<S: TrajectorySink>(
+        &self,
+        duration: f64,
+        dt: f64,
+        events: &[EventSpec],
+        trajectory: &mut S,
+    ) -> (IntegrationStats, Vec<EventRecord>) {
+        let mut tracker = EventTracker::new(events);
+        let stats = match self.params.method {
+            IntegrationMethod::Rk4 => self.simulate_fixed_step(duration, dt, &mut tracker, trajectory),
+            IntegrationMethod::DormandPrince => self.simulate_adaptive(duration, dt, &mut tracker, trajectory),
+        };
+        (stats, tracker.records)
+    }
+
+    fn simulate_fixed_step<S: TrajectorySink>(&self, duration: f64, dt: f64, tracker: &mut EventTracker, trajectory: &mut S) -> IntegrationStats {
+        let num_steps = (duration / dt).ceil() as usize;
+        let mut stats = IntegrationStats::default();
         
-   for i in 0..num_steps {
-        state = self.advance_single_step(&state, dt);
-        let (forces, acceleration) = self.calculate_forces_and_acceleration(state.velocity);
-
-        // Stop simulation if projectile hits the ground
-        if state.position.y <= 0.0 && i > 0 {
-            // Clamp y to 0 for the last point
-            state.position.y = 0.0;
-            trajectory.push(TrajectoryPoint {
-                time: (i + 1) as f64 * dt,
-                position: state.position,
-                velocity: state.velocity,
-                acceleration,
-                forces,
-            });
+        // Initial state; a resumed run carries on with step i ending at (i + 1) * dt
+        let (start_time, mut state) = self.initial_state();
+        let first_step = (start_time / dt).round() as usize;
+        let offset = start_time - first_step as f64 * dt;
+        let mut point = self.trajectory_point(start_time, &state);
+        trajectory.push(point);
+        stats.derivative_evaluations += 1;
+        
+   for i in first_step..num_steps {
+        if trajectory.stopped() {
             break;
         }
+        let mut next_state = self.advance_single_step(&state, dt);
+        next_state.time = (i + 1) as f64 * dt + offset;
+        let next_point = self.trajectory_point(next_state.time, &next_state);
+        stats.steps += 1;
+        stats.derivative_evaluations += 5;
 
-        trajectory.push(TrajectoryPoint {
-            time: (i + 1) as f64 * dt,
-            position: state.position,
-            velocity: state.velocity,
-            acceleration,
-            forces,
-        });
+        // Locate ground impact and user events inside the step
+        let start_slope = DerivativeState::new(state.velocity, point.acceleration);
+        let end_slope = DerivativeState::new(next_state.velocity, next_point.acceleration);
+        let recorded = tracker.records.len();
+        let landing = tracker.check_step(
+            point.time,
+            next_point.time - point.time,
+            &state,
+            &next_state,
+            |theta| hermite(&state, &start_slope, &next_state, &end_slope, dt, theta),
+            |theta| self.advance_single_step(&state, theta * dt),
+        );
+        stats.derivative_evaluations += 4 * (tracker.records.len() - recorded) as u64;
+
+        if let Some((landing_time, landing_state)) = landing {
+            trajectory.push(self.trajectory_point(landing_time, &landing_state));
+            break;
+        }
+
+        // Launched along or into the ground: stop right away
+        if state.position.y <= 0.0 && next_state.position.y <= 0.0 {
+            let mut grounded = next_state;
+            grounded.position.y = 0.0;
+            trajectory.push(self.trajectory_point(next_point.time, &grounded));
+            break;
+        }
+
+        trajectory.push(next_point);
+        state = next_state;
+        point = next_point;
     }
         
-        trajectory
+        stats
+    }
+
+    // Dormand-Prince with error control; the dense output is sampled every `dt`
+    // so callers get the same uniform time grid as the fixed step integrator.
+    fn simulate_adaptive<S: TrajectorySink>(&self, duration: f64, dt: f64, tracker: &mut EventTracker, trajectory: &mut S) -> IntegrationStats {
+        let num_samples = (duration / dt).ceil() as usize;
+        let end_time = num_samples as f64 * dt;
+        let mut stats = IntegrationStats::default();
+
+        let (mut time, mut state) = self.initial_state();
+        trajectory.push(self.trajectory_point(time, &state));
+        let mut slope = self.slope_now(&state);
+        stats.derivative_evaluations += 2;
+
+        let mut step = dt;
+        // first sample of the grid after the start
+        let mut sample = (time / dt).floor() as usize;
+        while sample as f64 * dt <= time {
+            sample += 1;
+        }
+        while sample <= num_samples && !trajectory.stopped() {
+            step = step.min(end_time - time);
+            let trial = self.dormand_prince_step(&state, &slope, step);
+            stats.derivative_evaluations += 6;
+
+            let error = self.error_norm(&state, &trial);
+            if error > 1.0 && step > MIN_STEP {
+                stats.rejected_steps += 1;
+                step *= (STEP_SAFETY * error.powf(-0.2)).max(MIN_STEP_FACTOR);
+                continue;
+            }
+            stats.steps += 1;
+            let step_end = if end_time - (time + step) < MIN_STEP { end_time } else { time + step };
+
+            let recorded = tracker.records.len();
+            let landing = tracker.check_step(
+                time,
+                step_end - time,
+                &state,
+                &trial.state,
+                |theta| trial.interpolate(theta),
+                |theta| self.dormand_prince_step(&state, &slope, theta * step).state,
+            );
+            stats.derivative_evaluations += 6 * (tracker.records.len() - recorded) as u64;
+            let stop_time = landing.map_or(f64::INFINITY, |(landing_time, _)| landing_time);
+
+            while sample <= num_samples && sample as f64 * dt <= step_end + MIN_STEP {
+                let sample_time = sample as f64 * dt;
+                if sample_time >= stop_time {
+                    break;
+                }
+                let theta = ((sample_time - time) / step).min(1.0);
+                trajectory.push(self.trajectory_point(sample_time, &trial.interpolate(theta)));
+                stats.derivative_evaluations += 1;
+                sample += 1;
+            }
+
+            if let Some((landing_time, landing_state)) = landing {
+                trajectory.push(self.trajectory_point(landing_time, &landing_state));
+                break;
+            }
+
+            // Launched along or into the ground: stop right away
+            if state.position.y <= 0.0 && trial.state.position.y <= 0.0 {
+                let mut grounded = trial.state;
+                grounded.position.y = 0.0;
+                trajectory.push(self.trajectory_point(step_end, &grounded));
+                break;
+            }
+
+            time = step_end;
+            state = trial.state;
+            state.time = step_end;
+            slope = trial.last_slope;
+            step *= if error == 0.0 {
+                MAX_STEP_FACTOR
+            } else {
+                (STEP_SAFETY * error.powf(-0.2)).clamp(MIN_STEP_FACTOR, MAX_STEP_FACTOR)
+            };
+        }
+
+        stats
     }
 }
 
+// cubic Hermite interpolant of a step from its end states and slopes
+fn hermite(
+    start: &PresentState,
+    start_slope: &DerivativeState,
+    end: &PresentState,
+    end_slope: &DerivativeState,
+    dt: f64,
+    theta: f64,
+) -> PresentState {
+    let theta2 = theta * theta;
+    let theta3 = theta2 * theta;
+    *start * (2.0 * theta3 - 3.0 * theta2 + 1.0)
+        + start_slope.scaled(dt) * (theta3 - 2.0 * theta2 + theta)
+        + *end * (3.0 * theta2 - 2.0 * theta3)
+        + end_slope.scaled(dt) * (theta3 - theta2)
+}
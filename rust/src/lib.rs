@@ -1,14 +1,27 @@
 #![allow(dead_code)]
 #![allow(unused_variables)]
 
+use numpy::ndarray::{Array2, ShapeBuilder};
+use numpy::{IntoPyArray, PyArray2, PyReadonlyArray2};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
 pub mod vector3;
 pub mod parameter;
 pub mod integrator;
-use parameter::MagnusParameter;
+pub mod summary;
+pub mod batch;
+pub mod events;
+pub mod stream;
+pub mod force_model;
+use parameter::{check_tolerances, IntegrationMethod, MagnusParameter, DEFAULT_ATOL, DEFAULT_RTOL, LEGACY_PARAMETER_COLUMNS, PARAMETER_COLUMNS};
 use vector3::Vec3;
-use integrator::{RK4Integrator};
+use integrator::{IntegrationStats, IntegratorState, RK4Integrator, TrajectoryPoint};
+use batch::{simulate_batch_points, simulate_batch_summaries};
+use events::{EventRecord, EventSpec};
+use summary::TrajectorySummary;
+use stream::TrajectoryStream;
+use force_model::ForceTables;
 
 use crate::integrator::ForceData;
 
@@ -17,7 +30,19 @@ fn magnus_simulation(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<MagnusParameter>()?;
     m.add_class::<Vec3>()?;
     m.add_class::<DetailedTrajectoryPoint>()?;
+    m.add_class::<IntegrationStats>()?;
+    m.add_class::<IntegratorState>()?;
+    m.add_class::<SimulationResult>()?;
+    m.add_class::<EventSpec>()?;
+    m.add_class::<EventRecord>()?;
+    m.add_class::<TrajectorySummary>()?;
+    m.add_class::<TrajectoryStream>()?;
+    m.add_class::<ForceTables>()?;
     m.add_function(wrap_pyfunction!(simulate_trajectory, m)?)?;
+    m.add_function(wrap_pyfunction!(simulate_trajectory_arrays, m)?)?;
+    m.add_function(wrap_pyfunction!(stream_trajectory, m)?)?;
+    m.add_function(wrap_pyfunction!(simulate_summary, m)?)?;
+    m.add_function(wrap_pyfunction!(simulate_batch, m)?)?;
     Ok(())
 }
 
@@ -36,8 +61,21 @@ pub struct DetailedTrajectoryPoint {
     pub forces: ForceData
 }
 
+#[pyclass]
+pub struct SimulationResult {
+    /// (N, 19) column-major float64 array, see `simulate_trajectory_arrays`
+    #[pyo3(get)]
+    pub data: Py<PyArray2<f64>>,
+    #[pyo3(get)]
+    pub stats: IntegrationStats,
+    /// ground impact and requested events in time order
+    #[pyo3(get)]
+    pub events: Vec<EventRecord>,
+}
+
 #[pyfunction]
 fn simulate_trajectory(
+    py: Python<'_>,
     params: MagnusParameter,
     mass: f64,
     spin_vector: Vec3,
@@ -46,7 +84,7 @@ fn simulate_trajectory(
     let duration = params.duration;
     
     let integrator = RK4Integrator::new(params, mass, spin_vector);
-    let trajectory = integrator.simulate_points(duration, dt);
+    let trajectory = py.detach(|| integrator.simulate_points(duration, dt));
     
     let results: Vec<DetailedTrajectoryPoint> = trajectory
         .iter()
@@ -65,4 +103,225 @@ fn simulate_trajectory(
         .collect();
     
     Ok(results)
-}
\ No newline at end of file
+}
+
+/// Same integration as `simulate_trajectory`, returned as one (N, 19) float64 array
+/// together with the step counts of the integrator. The array is column-major
+/// so every column is contiguous. The ground impact is located exactly and
+/// ends the array; `events` adds apex, plane and wall crossings to the result.
+/// `output_stride` keeps every n-th output point (and always the last one).
+/// `progress` is called with the completed fraction about every percent of the
+/// run; an exception raised from it aborts the simulation and is re-raised.
+/// With `initial_state` the flight continues from that state (the first row) up
+/// to `params.duration`, e.g. from the last row of a shorter run.
+/// `force_tables` replaces the constant drag and lift coefficients with the
+/// tabulated force model.
+#[pyfunction]
+#[pyo3(signature = (params, mass, spin_vector, events=None, output_stride=1, progress=None, initial_state=None, force_tables=None))]
+fn simulate_trajectory_arrays(
+    py: Python<'_>,
+    params: MagnusParameter,
+    mass: f64,
+    spin_vector: Vec3,
+    events: Option<Vec<EventSpec>>,
+    output_stride: usize,
+    progress: Option<Py<PyAny>>,
+    initial_state: Option<IntegratorState>,
+    force_tables: Option<ForceTables>,
+) -> PyResult<SimulationResult> {
+    let dt = params.time_step;
+    let duration = params.duration;
+
+    let integrator = build_integrator(params, mass, spin_vector, initial_state, force_tables.as_ref());
+    let events = events.unwrap_or_default();
+    let mut progress_error: Option<PyErr> = None;
+    let report = |time: f64| match &progress {
+        None => true,
+        Some(callback) => Python::attach(|py| match callback.call1(py, (time / duration,)) {
+            Ok(_) => true,
+            Err(err) => {
+                progress_error = Some(err);
+                false
+            }
+        }),
+    };
+    let simulation = py.detach(|| integrator.simulate(duration, dt, &events, output_stride, report));
+    if let Some(err) = progress_error {
+        return Err(err);
+    }
+
+    Ok(SimulationResult {
+        data: trajectory_array(py, &simulation.trajectory)?.unbind(),
+        stats: simulation.stats,
+        events: simulation.events,
+    })
+}
+
+/// Same integration as `simulate_trajectory_arrays`, yielded as it runs: the
+/// returned iterator gives (k, 19) column-major chunks of `chunk_size` rows
+/// (the last one may be shorter) while the integrator works ahead on its own
+/// thread. Concatenated, the chunks equal the `simulate_trajectory_arrays` data.
+#[pyfunction]
+#[pyo3(signature = (params, mass, spin_vector, chunk_size=4096, events=None, output_stride=1, initial_state=None, force_tables=None))]
+fn stream_trajectory(
+    params: MagnusParameter,
+    mass: f64,
+    spin_vector: Vec3,
+    chunk_size: usize,
+    events: Option<Vec<EventSpec>>,
+    output_stride: usize,
+    initial_state: Option<IntegratorState>,
+    force_tables: Option<ForceTables>,
+) -> TrajectoryStream {
+    let dt = params.time_step;
+    let duration = params.duration;
+
+    let integrator = build_integrator(params, mass, spin_vector, initial_state, force_tables.as_ref());
+    TrajectoryStream::start(integrator, duration, dt, events.unwrap_or_default(), output_stride, chunk_size)
+}
+
+/// Landing and apex metrics of one launch, integrated without storing the trajectory.
+/// `events` are located as in `simulate_trajectory_arrays` and returned in the
+/// summary's `events` together with the apex and the ground impact.
+#[pyfunction]
+#[pyo3(signature = (params, mass, spin_vector, events=None, force_tables=None))]
+fn simulate_summary(
+    py: Python<'_>,
+    params: MagnusParameter,
+    mass: f64,
+    spin_vector: Vec3,
+    events: Option<Vec<EventSpec>>,
+    force_tables: Option<ForceTables>,
+) -> TrajectorySummary {
+    let integrator = RK4Integrator::new(params, mass, spin_vector).with_tables(force_tables.as_ref());
+    let events = events.unwrap_or_default();
+    py.detach(|| integrator.summarize(params.duration, params.time_step, &events))
+}
+
+/// Simulates one launch per row of `params_array` (columns in `MagnusParameter`
+/// constructor order) with the matching row of `spin_vectors`. Rows may leave
+/// out the trailing radius column, which then defaults to 0.0; the table force
+/// model needs the radius, so `force_tables` requires all columns.
+/// Returns the concatenated trajectories and N + 1 row offsets, or one
+/// summary row per launch when `summary_only` is set.
+/// Launches are spread over `workers` threads (default: all cores) with the GIL released;
+/// one `force_tables` instance and the `method`, `rtol` and `atol` integrator
+/// settings are shared by all of them.
+#[pyfunction]
+#[pyo3(signature = (
+    params_array, mass, spin_vectors, summary_only=false, workers=None, force_tables=None,
+    method="rk4", rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL
+))]
+fn simulate_batch<'py>(
+    py: Python<'py>,
+    params_array: PyReadonlyArray2<'py, f64>,
+    mass: f64,
+    spin_vectors: PyReadonlyArray2<'py, f64>,
+    summary_only: bool,
+    workers: Option<usize>,
+    force_tables: Option<ForceTables>,
+    method: &str,
+    rtol: f64,
+    atol: f64,
+) -> PyResult<Bound<'py, PyAny>> {
+    check_tolerances(rtol, atol)?;
+    if force_tables.is_some() && params_array.as_array().ncols() == LEGACY_PARAMETER_COLUMNS {
+        return Err(PyValueError::new_err(format!(
+            "force_tables need the radius, params_array must have {PARAMETER_COLUMNS} columns"
+        )));
+    }
+    let method = IntegrationMethod::parse(method)?;
+    let launches = batch_launches(&params_array, &spin_vectors, method, rtol, atol)?;
+    let tables = force_tables.as_ref();
+
+    if summary_only {
+        let summaries = py.detach(|| simulate_batch_summaries(&launches, mass, tables, workers));
+        let array = column_major_array(py, summaries.iter().map(|summary| summary.to_row()))?;
+        return Ok(array.into_any());
+    }
+
+    let trajectories = py.detach(|| simulate_batch_points(&launches, mass, tables, workers));
+    let mut offsets: Vec<i64> = Vec::with_capacity(trajectories.len() + 1);
+    offsets.push(0);
+    for trajectory in &trajectories {
+        offsets.push(offsets[offsets.len() - 1] + trajectory.len() as i64);
+    }
+    let points = trajectories.concat();
+
+    let array = trajectory_array(py, &points)?;
+    Ok((array, offsets.into_pyarray(py)).into_pyobject(py)?.into_any())
+}
+
+fn build_integrator(
+    params: MagnusParameter,
+    mass: f64,
+    spin_vector: Vec3,
+    initial_state: Option<IntegratorState>,
+    tables: Option<&ForceTables>,
+) -> RK4Integrator {
+    let integrator = RK4Integrator::new(params, mass, spin_vector).with_tables(tables);
+    match initial_state {
+        Some(state) => integrator.starting_from(state),
+        None => integrator,
+    }
+}
+
+fn batch_launches(
+    params_array: &PyReadonlyArray2<'_, f64>,
+    spin_vectors: &PyReadonlyArray2<'_, f64>,
+    method: IntegrationMethod,
+    rtol: f64,
+    atol: f64,
+) -> PyResult<Vec<(MagnusParameter, Vec3)>> {
+    let params_array = params_array.as_array();
+    let spin_vectors = spin_vectors.as_array();
+
+    if params_array.ncols() != PARAMETER_COLUMNS && params_array.ncols() != LEGACY_PARAMETER_COLUMNS {
+        return Err(PyValueError::new_err(format!(
+            "params_array must have {PARAMETER_COLUMNS} (or {LEGACY_PARAMETER_COLUMNS} without the radius) columns, got {}",
+            params_array.ncols()
+        )));
+    }
+    if spin_vectors.dim() != (params_array.nrows(), 3) {
+        return Err(PyValueError::new_err(format!(
+            "spin_vectors must have shape ({}, 3)",
+            params_array.nrows()
+        )));
+    }
+
+    Ok(params_array
+        .rows()
+        .into_iter()
+        .zip(spin_vectors.rows())
+        .map(|(row, spin)| {
+            (
+                MagnusParameter::from_row(&row.to_vec(), method, rtol, atol),
+                Vec3::new(spin[0], spin[1], spin[2]),
+            )
+        })
+        .collect())
+}
+
+fn trajectory_array<'py>(
+    py: Python<'py>,
+    trajectory: &[TrajectoryPoint],
+) -> PyResult<Bound<'py, PyArray2<f64>>> {
+    column_major_array(py, trajectory.iter().map(|point| point.to_row()))
+}
+
+fn column_major_array<'py, const COLUMNS: usize>(
+    py: Python<'py>,
+    rows: impl ExactSizeIterator<Item = [f64; COLUMNS]>,
+) -> PyResult<Bound<'py, PyArray2<f64>>> {
+    let row_count = rows.len();
+    let mut columns = vec![0.0; row_count * COLUMNS];
+    for (row, values) in rows.enumerate() {
+        for (column, value) in values.into_iter().enumerate() {
+            columns[column * row_count + row] = value;
+        }
+    }
+
+    let array = Array2::from_shape_vec((row_count, COLUMNS).f(), columns)
+        .map_err(|err| PyValueError::new_err(err.to_string()))?;
+    Ok(array.into_pyarray(py))
+}
@@ -1,8 +1,37 @@
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 use pyo3::{pymethods};
 use crate::vector3::Vec3; 
 
 const GRAVITY:f64 = 9.81;
+
+// one row per launch, in the same order as the MagnusParameter constructor
+pub const PARAMETER_COLUMNS: usize = 11;
+// rows from before the radius column; they launch with a radius of 0.0, which
+// only the constant force model allows
+pub const LEGACY_PARAMETER_COLUMNS: usize = 10;
+
+pub const DEFAULT_RTOL: f64 = 1e-6;
+pub const DEFAULT_ATOL: f64 = 1e-9;
+
+#[derive(Debug, Copy, Clone, PartialEq)]
+pub enum IntegrationMethod {
+    Rk4,
+    DormandPrince,
+}
+
+impl IntegrationMethod {
+    pub fn parse(name: &str) -> PyResult<Self> {
+        match name.to_ascii_lowercase().as_str() {
+            "rk4" => Ok(Self::Rk4),
+            "rk45" | "dopri5" | "dormand_prince" => Ok(Self::DormandPrince),
+            _ => Err(PyValueError::new_err(format!(
+                "Unknown integration method '{name}', expected 'rk4' or 'rk45'"
+            ))),
+        }
+    }
+}
+
 #[pyclass]
 #[derive(Debug, Copy,Clone)]
 pub struct MagnusParameter{
@@ -15,16 +44,56 @@ pub struct MagnusParameter{
     pub(crate) lift_coefficient:f64,
     pub(crate) air_density: f64,
     pub(crate)time_step: f64,
-    pub(crate) duration: f64
+    pub(crate) duration: f64,
+    // only used by the table force model
+    pub(crate) radius: f64,
+    pub(crate) method: IntegrationMethod,
+    pub(crate) rtol: f64,
+    pub(crate) atol: f64
 }
 
 
 
 
 
+pub fn check_tolerances(rtol: f64, atol: f64) -> PyResult<()> {
+    if rtol <= 0.0 || atol <= 0.0 {
+        return Err(PyValueError::new_err("rtol and atol must be positive"));
+    }
+    Ok(())
+}
+
+impl MagnusParameter{
+    // `row` has PARAMETER_COLUMNS or LEGACY_PARAMETER_COLUMNS values; the
+    // integrator settings are shared by every row of a batch
+    pub fn from_row(row: &[f64], method: IntegrationMethod, rtol: f64, atol: f64) -> Self{
+        Self {
+            initial_velocity: row[0],
+            elevation_angle: row[1],
+            azimuth_angle: row[2],
+            drag_coefficient: row[3],
+            lift_coefficient: row[4],
+            spin_rate: row[5],
+            is_top_spin: row[6] != 0.0,
+            air_density: row[7],
+            time_step: row[8],
+            duration: row[9],
+            radius: row.get(10).copied().unwrap_or(0.0),
+            method,
+            rtol,
+            atol
+        }
+    }
+}
+
 #[pymethods]
 impl MagnusParameter{   
     #[new]
+    #[pyo3(signature = (
+        initial_velocity, elevation_angle, azimuth_angle, drag_coefficient, lift_coefficient,
+        spin_rate, is_top_spin, air_density, time_step, duration, radius=0.0,
+        method="rk4", rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL
+    ))]
     fn new(
     initial_velocity:f64,
     elevation_angle: f64,
@@ -35,7 +104,13 @@ impl MagnusParameter{
     is_top_spin:bool,
     air_density: f64,
     time_step: f64,
-    duration: f64) -> PyResult<Self>{
+    duration: f64,
+    radius: f64,
+    method: &str,
+    rtol: f64,
+    atol: f64) -> PyResult<Self>{
+
+        check_tolerances(rtol, atol)?;
 
         Ok(Self {
             initial_velocity,
@@ -47,7 +122,11 @@ impl MagnusParameter{
             is_top_spin,
             air_density,
             time_step,
-            duration
+            duration,
+            radius,
+            method: IntegrationMethod::parse(method)?,
+            rtol,
+            atol
         })
     }
 
@@ -0,0 +1,119 @@
+use std::sync::mpsc::{Receiver, SyncSender, sync_channel};
+use std::sync::Mutex;
+use std::thread::{self, JoinHandle};
+
+use numpy::PyArray2;
+use pyo3::prelude::*;
+
+use crate::events::{EventRecord, EventSpec};
+use crate::integrator::{IntegrationStats, RK4Integrator, StridedSink, TrajectoryPoint, TrajectorySink};
+use crate::trajectory_array;
+
+// chunks integrated ahead of the consumer; bounds the memory of a stream
+const CHUNKS_AHEAD: usize = 2;
+
+// collects points into chunks and hands full ones to the stream
+struct ChunkSink {
+    sender: SyncSender<Vec<TrajectoryPoint>>,
+    chunk: Vec<TrajectoryPoint>,
+    chunk_size: usize,
+    closed: bool,
+}
+
+impl ChunkSink {
+    fn send(&mut self) {
+        let chunk = std::mem::replace(&mut self.chunk, Vec::with_capacity(self.chunk_size));
+        // the stream was dropped: stop integrating
+        self.closed = self.sender.send(chunk).is_err();
+    }
+
+    fn finish(mut self) {
+        if !self.chunk.is_empty() && !self.closed {
+            self.send();
+        }
+    }
+}
+
+impl TrajectorySink for ChunkSink {
+    fn push(&mut self, point: TrajectoryPoint) {
+        self.chunk.push(point);
+        if self.chunk.len() == self.chunk_size && !self.closed {
+            self.send();
+        }
+    }
+
+    fn stopped(&self) -> bool {
+        self.closed
+    }
+}
+
+/// Iterator over (k, 19) float64 chunks of one trajectory, `chunk_size` rows
+/// each except the last. The integrator runs on its own thread at most two
+/// chunks ahead of the consumer; `stats` and `events` are set once the
+/// iterator is exhausted. Dropping the stream stops the integration.
+#[pyclass]
+pub struct TrajectoryStream {
+    receiver: Mutex<Receiver<Vec<TrajectoryPoint>>>,
+    worker: Option<JoinHandle<(IntegrationStats, Vec<EventRecord>)>>,
+    #[pyo3(get)]
+    stats: Option<IntegrationStats>,
+    #[pyo3(get)]
+    events: Vec<EventRecord>,
+}
+
+impl TrajectoryStream {
+    pub fn start(
+        integrator: RK4Integrator,
+        duration: f64,
+        dt: f64,
+        events: Vec<EventSpec>,
+        output_stride: usize,
+        chunk_size: usize,
+    ) -> Self {
+        let chunk_size = chunk_size.max(1);
+        let (sender, receiver) = sync_channel(CHUNKS_AHEAD);
+        let worker = thread::spawn(move || {
+            let mut chunks = ChunkSink {
+                sender,
+                chunk: Vec::with_capacity(chunk_size),
+                chunk_size,
+                closed: false,
+            };
+            let mut strided = StridedSink::new(&mut chunks, output_stride);
+            let result = integrator.simulate_into(duration, dt, &events, &mut strided);
+            strided.finish();
+            chunks.finish();
+            result
+        });
+        Self {
+            receiver: Mutex::new(receiver),
+            worker: Some(worker),
+            stats: None,
+            events: Vec::new(),
+        }
+    }
+}
+
+#[pymethods]
+impl TrajectoryStream {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__<'py>(&mut self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyArray2<f64>>>> {
+        let receiver = &self.receiver;
+        let chunk = py.detach(|| receiver.lock().expect("stream lock poisoned").recv());
+        match chunk {
+            Ok(points) => Ok(Some(trajectory_array(py, &points)?)),
+            // the integrator has finished and sent everything
+            Err(_) => {
+                if let Some(worker) = self.worker.take() {
+                    let (stats, events) = py.detach(|| worker.join().expect("stream worker panicked"));
+                    self.stats = Some(stats);
+                    self.events = events;
+                }
+                Ok(None)
+            }
+        }
+    }
+}
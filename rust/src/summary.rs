@@ -0,0 +1,89 @@
+use pyo3::prelude::*;
+
+use crate::events::EventRecord;
+use crate::integrator::{TrajectoryPoint, TrajectorySink};
+use crate::vector3::Vec3;
+
+// flight time, range, lateral deviation, apex time, apex height,
+// impact velocity components, impact speed and a landed flag
+pub const SUMMARY_COLUMNS: usize = 10;
+
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct TrajectorySummary {
+    #[pyo3(get)]
+    pub flight_time: f64,
+    #[pyo3(get)]
+    pub range: f64,
+    #[pyo3(get)]
+    pub lateral_deviation: f64,
+    #[pyo3(get)]
+    pub apex_time: f64,
+    #[pyo3(get)]
+    pub apex_height: f64,
+    #[pyo3(get)]
+    pub impact_velocity: Vec3,
+    #[pyo3(get)]
+    pub impact_speed: f64,
+    #[pyo3(get)]
+    pub landed: bool,
+    /// apex, ground impact and requested events in time order
+    #[pyo3(get)]
+    pub events: Vec<EventRecord>,
+}
+
+impl TrajectorySummary {
+    pub fn to_row(&self) -> [f64; SUMMARY_COLUMNS] {
+        [
+            self.flight_time,
+            self.range,
+            self.lateral_deviation,
+            self.apex_time,
+            self.apex_height,
+            self.impact_velocity.x,
+            self.impact_velocity.y,
+            self.impact_velocity.z,
+            self.impact_speed,
+            if self.landed { 1.0 } else { 0.0 },
+        ]
+    }
+}
+
+// keeps only the highest and the latest point of a trajectory
+#[derive(Default)]
+pub struct SummaryBuilder {
+    highest: Option<TrajectoryPoint>,
+    last: Option<TrajectoryPoint>,
+}
+
+impl TrajectorySink for SummaryBuilder {
+    fn push(&mut self, point: TrajectoryPoint) {
+        if self.highest.is_none_or(|highest| point.position.y > highest.position.y) {
+            self.highest = Some(point);
+        }
+        self.last = Some(point);
+    }
+}
+
+impl SummaryBuilder {
+    /// Apex and landing come from the exact event records when the flight has
+    /// them, otherwise from the highest and the final stored point.
+    pub fn finish(self, events: Vec<EventRecord>) -> TrajectorySummary {
+        let last = self.last.expect("trajectory always holds the launch point");
+        let highest = self.highest.expect("trajectory always holds the launch point");
+        let apex = events.iter().find(|event| event.name == "apex");
+        let landed = events.iter().any(|event| event.name == "ground");
+
+        TrajectorySummary {
+            flight_time: last.time,
+            range: last.position.x,
+            lateral_deviation: last.position.z,
+            apex_time: apex.map_or(highest.time, |apex| apex.time),
+            apex_height: apex.map_or(highest.position.y, |apex| apex.position.y),
+            impact_velocity: last.velocity,
+            impact_speed: last.velocity.magnitude(),
+            landed,
+            events,
+        }
+    }
+}
@@ -1,6 +1,6 @@
 use pyo3::prelude::*;
 
-use std::ops::{Add, Div, Mul};
+use std::ops::{Add, Div, Mul, Sub};
 
 
 #[pyclass]
@@ -46,6 +46,14 @@ impl Add for Vec3 {
 }
 
 
+impl Sub for Vec3 {
+    type Output = Vec3;
+    fn sub(self, rhs: Vec3) -> Vec3 {
+        Vec3::new(self.x - rhs.x, self.y - rhs.y, self.z - rhs.z)
+    }
+}
+
+
 impl Mul<f64> for Vec3 {
     type Output = Vec3;
 
@@ -0,0 +1,38 @@
+import pytest
+
+from python import calculation
+
+LAUNCH = {
+    "initial_velocity": 30.0,
+    "radius": 0.11,
+    "elevation_angle": 30.0,
+    "azimuth_angle": 5.0,
+    "drag_coefficient": 0.25,
+    "lift_coefficient": 0.2,
+    "air_density": 1.2,
+    "spin_rate": 1500.0,
+    "top_spin": 1.0,
+    "side_spin": 0.5,
+    "time_step": 0.01,
+    "duration": 10.0,
+}
+
+
+@pytest.fixture
+def launch():
+    return dict(LAUNCH)
+
+
+@pytest.fixture
+def engine():
+    # switches calculation to an engine for one test and back afterwards
+    previous = calculation.ENGINE
+    yield calculation.use_engine
+    calculation.use_engine(previous)
+
+
+@pytest.fixture
+def force_model():
+    previous = calculation.FORCE_MODEL
+    yield calculation.use_force_model
+    calculation.use_force_model(previous)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from python import calculation
+from python.cache import SimulationCache, result_bytes
+
+
+@pytest.fixture(autouse=True)
+def numpy_engine(engine):
+    engine("numpy")
+
+
+@pytest.fixture
+def short_launch(launch):
+    return {**launch, "elevation_angle": 70.0, "duration": 1.0}
+
+
+def fake_result(value, rows=100):
+    return {"trajectory": np.full((rows, 4), float(value)), "steps": rows}
+
+
+def test_least_recently_used_entries_are_evicted_by_size(launch):
+    size = result_bytes(fake_result(0))
+    cache = SimulationCache(max_bytes=3 * size)
+    launches = [{**launch, "initial_velocity": float(v)} for v in range(4)]
+    for value, magnus_data in enumerate(launches[:3]):
+        cache.put(magnus_data, fake_result(value))
+    assert cache.get(launches[0]) is not None
+    cache.put(launches[3], fake_result(3))
+    # launch 1 was the least recently used one
+    assert cache.get(launches[1]) is None
+    assert cache.get(launches[0])["steps"] == 100
+    assert cache.stats() == {
+        "entries": 3,
+        "bytes": 3 * size,
+        "hits": 2,
+        "disk_hits": 0,
+        "misses": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda monkeypatch: monkeypatch.setattr(calculation, "MASS", 0.5),
+        lambda monkeypatch: monkeypatch.setattr(calculation, "GRAVITY", 9.7),
+        lambda monkeypatch: monkeypatch.setattr(calculation, "ENGINE", "rust"),
+        lambda monkeypatch: monkeypatch.setattr(calculation, "FORCE_MODEL", "tables"),
+    ],
+)
+def test_key_includes_the_model(launch, monkeypatch, change):
+    cache = SimulationCache()
+    key = cache.key(launch)
+    assert cache.key({**launch, "duration": 10}) == key
+    change(monkeypatch)
+    assert cache.key(launch) != key
+
+
+def test_disk_entries_survive_a_restart(launch, tmp_path):
+    result = calculation.run_magnus_simulation(launch)
+    SimulationCache(directory=tmp_path).put(launch, result)
+    restarted = SimulationCache(directory=tmp_path)
+    loaded = restarted.get(launch)
+    np.testing.assert_array_equal(loaded["trajectory"], result["trajectory"])
+    assert loaded["events"] == result["events"]
+    assert loaded["final_state"] == result["final_state"]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_longer_duration_extends_the_cached_run(short_launch):
+    calls = []
+
+    def simulate(magnus_data, **kwargs):
+        calls.append(magnus_data["duration"])
+        return calculation.run_magnus_simulation(magnus_data, **kwargs)
+
+    cached_simulation = SimulationCache().wrap(simulate)
+    cached_simulation(short_launch)
+    extended = cached_simulation({**short_launch, "duration": 10.0})
+    full = calculation.run_magnus_simulation({**short_launch, "duration": 10.0})
+    assert calls == [1.0]
+    np.testing.assert_array_equal(extended["trajectory"], full["trajectory"])
+
+
+def test_evicted_runs_are_not_resumable(short_launch):
+    result = calculation.run_magnus_simulation(short_launch)
+    cache = SimulationCache(max_bytes=result_bytes(result))
+    cache.put(short_launch, result)
+    assert cache.shorter_run({**short_launch, "duration": 10.0}) is not None
+    cache.put({**short_launch, "initial_velocity": 20.0}, fake_result(1, rows=10))
+    assert cache.resumable == {}
+    assert cache.shorter_run({**short_launch, "duration": 10.0}) is None
@@ -0,0 +1,110 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from python.cli import main
+
+# main() switches the engine for the whole process, the fixture restores it
+pytestmark = pytest.mark.usefixtures("engine")
+
+
+@pytest.fixture
+def launch_file(tmp_path, launch):
+    path = tmp_path / "launch.json"
+    path.write_text(json.dumps(launch))
+    return path
+
+
+@pytest.fixture
+def launches_csv(tmp_path, launch):
+    path = tmp_path / "launches.csv"
+    rows = [launch, {**launch, "initial_velocity": 20.0}]
+    lines = [",".join(launch)] + [
+        ",".join(str(row[name]) for name in launch) for row in rows
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def records(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_run_writes_the_trajectory(launch_file, tmp_path, capsys):
+    output = tmp_path / "trajectory.npz"
+    assert main(["--engine", "numpy", "run", str(launch_file), "-o", str(output)]) == 0
+    (record,) = records(capsys)
+    assert record["points"] > 2
+    assert record["events"][-1]["name"] == "ground"
+    assert output.exists()
+
+
+def test_summary_prints_one_record_per_csv_row(launches_csv, capsys):
+    assert main(["--engine", "numpy", "summary", str(launches_csv)]) == 0
+    first, second = records(capsys)
+    assert [first["run"], second["run"]] == [0, 1]
+    assert first["landed"] and second["landed"]
+    assert first["range"] > second["range"]
+
+
+def test_sweep_writes_one_summary_row_per_launch(tmp_path, launch, capsys):
+    grid = tmp_path / "grid.json"
+    grid.write_text(json.dumps({**launch, "initial_velocity": [20, 25, 30]}))
+    output = tmp_path / "summary.csv"
+    arguments = ["--engine", "numpy", "sweep", str(grid), "--summary-only"]
+    assert main([*arguments, "-o", str(output)]) == 0
+    assert records(capsys)[0]["runs"] == 3
+    table = np.genfromtxt(output, delimiter=",", names=True, comments=None)
+    np.testing.assert_array_equal(table["initial_velocity"], [20, 25, 30])
+    assert np.all(np.diff(table["range"]) > 0)
+
+
+def test_montecarlo_prints_the_dispersion(tmp_path, launch, capsys):
+    spread = {"distribution": "normal", "mean": 30.0, "std": 0.5}
+    path = tmp_path / "montecarlo.json"
+    path.write_text(json.dumps({**launch, "initial_velocity": spread}))
+    arguments = ["--engine", "numpy", "montecarlo", str(path), "-n", "50"]
+    assert main([*arguments, "--seed", "1"]) == 0
+    (record,) = records(capsys)
+    assert record["samples"] == 50
+    assert "ellipse" in record
+
+
+def test_errors_are_reported_without_a_traceback(tmp_path, launch, capsys):
+    path = tmp_path / "launch.json"
+    path.write_text(json.dumps({**launch, "initial_velocity": 1e6}))
+    assert main(["--engine", "numpy", "summary", str(path)]) == 1
+    assert "Initial Velocity" in capsys.readouterr().err
+
+
+def test_commands_do_not_import_qt_or_matplotlib(launch_file, launches_csv, tmp_path):
+    # a fresh interpreter, since other tests import matplotlib in this one
+    spread = {"distribution": "normal", "mean": 30.0, "std": 0.5}
+    montecarlo = tmp_path / "montecarlo.json"
+    montecarlo.write_text(
+        json.dumps({**json.loads(launch_file.read_text()), "initial_velocity": spread})
+    )
+    commands = [
+        ["run", str(launch_file), "-o", str(tmp_path / "run.csv")],
+        ["summary", str(launches_csv)],
+        ["sweep", str(launches_csv), "--summary-only"],
+        ["montecarlo", str(montecarlo), "-n", "20"],
+    ]
+    script = (
+        "import sys\n"
+        "from python.cli import main\n"
+        f"for command in {commands!r}:\n"
+        "    assert main(['--engine', 'numpy', *command]) == 0\n"
+        "loaded = [name for name in ('PyQt5', 'matplotlib') if name in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+        cwd=Path(__file__).parent.parent,
+    )
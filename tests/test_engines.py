@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from benchmarks.engines import EVENTS, TRAJECTORY_LAUNCHES, difference, event_values
+from benchmarks.sweep_scaling import sweep_grid
+from python import calculation
+
+pytest.importorskip("magnus_simulation")
+
+# largest difference between the engines relative to each column's scale
+TOLERANCE = 1e-9
+
+
+def both_engines(engine, function, *args, **kwargs):
+    results = []
+    for name in ("rust", "numpy"):
+        engine(name)
+        results.append(function(*args, **kwargs))
+    return results
+
+
+@pytest.mark.parametrize("index", range(len(TRAJECTORY_LAUNCHES)))
+def test_trajectories_and_events_agree(engine, index):
+    magnus_data = {**TRAJECTORY_LAUNCHES[index], "events": EVENTS}
+    expected, actual = both_engines(
+        engine, calculation.run_magnus_simulation, magnus_data
+    )
+    assert difference(expected["trajectory"], actual["trajectory"]) <= TOLERANCE
+    assert [event["name"] for event in expected["events"]] == [
+        event["name"] for event in actual["events"]
+    ]
+    assert (
+        difference(event_values(expected["events"]), event_values(actual["events"]))
+        <= TOLERANCE
+    )
+    assert expected["steps"] == actual["steps"]
+
+
+def test_summaries_agree(engine):
+    grid = {**sweep_grid(125), "time_step": 0.01}
+    expected, actual = both_engines(
+        engine, calculation.run_magnus_sweep, grid, summary_only=True
+    )
+    np.testing.assert_array_equal(expected["landed"], actual["landed"])
+    assert (
+        difference(
+            np.column_stack(list(expected.values())),
+            np.column_stack(list(actual.values())),
+        )
+        <= TOLERANCE
+    )
+
+
+def test_sweep_trajectories_agree(engine):
+    grid = {**sweep_grid(8), "time_step": 0.01}
+    expected, actual = both_engines(engine, calculation.run_magnus_sweep, grid)
+    np.testing.assert_array_equal(expected["offsets"], actual["offsets"])
+    assert difference(expected["trajectory"], actual["trajectory"]) <= TOLERANCE
+
+
+def test_adaptive_sweep_matches_adaptive_runs(engine, launch):
+    engine("rust")
+    magnus_data = {**launch, "integrator": "rk45", "rtol": 1e-8, "atol": 1e-10}
+    sweep = calculation.run_magnus_sweep(magnus_data, summary_only=True)
+    summary = calculation.run_magnus_summary(magnus_data)
+    assert sweep["range"][0] == summary["range"]
+    assert sweep["flight_time"][0] == summary["flight_time"]
+
+
+@pytest.mark.parametrize("name", ["rust", "numpy"])
+def test_legacy_rows_are_rejected_with_force_tables(engine, force_model, name):
+    # without a radius the table model would fly the launch in a vacuum
+    engine(name)
+    force_model("tables")
+    row = [30.0, 0.5, 0.1, 0.004, 0.002, 150.0, 0.0, 1.2, 0.01, 10.0]
+    with pytest.raises(ValueError, match="radius"):
+        calculation.ms.simulate_batch(
+            np.array([row]),
+            calculation.MASS,
+            np.array([[0.0, 0.0, 1.0]]),
+            force_tables=calculation.force_tables(),
+        )
@@ -0,0 +1,26 @@
+import numpy as np
+
+from python.figures import extend_line
+
+
+def helix(start, stop):
+    t = np.arange(start, stop, dtype=float)
+    return np.cos(t / 50), np.sin(t / 50), t
+
+
+def test_extended_line_stays_decimated():
+    points = (np.empty(0),) * 3
+    for start in range(0, 20000, 500):
+        points = extend_line(points, helix(start, start + 500), max_points=300)
+        assert len(points[0]) <= 300
+    # the ends of the streamed run survive every decimation
+    assert points[2][0] == 0.0
+    assert points[2][-1] == 19999.0
+    assert np.all(np.diff(points[2]) > 0)
+
+
+def test_short_line_is_kept_whole():
+    points = extend_line((np.empty(0),) * 3, helix(0, 100), max_points=300)
+    points = extend_line(points, helix(100, 200), max_points=300)
+    for actual, expected in zip(points, helix(0, 200)):
+        np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from python import montecarlo
+
+
+@pytest.fixture
+def randomised(launch, engine):
+    engine("numpy")
+    return {
+        **launch,
+        "initial_velocity": {"distribution": "normal", "mean": 30.0, "std": 0.5},
+        "elevation_angle": {"distribution": "uniform", "low": 28.0, "high": 32.0},
+    }
+
+
+def test_running_statistics_match_numpy():
+    data = np.random.default_rng(1).normal(size=(1000, 3)) @ np.diag([1.0, 2.0, 3.0])
+    statistics = montecarlo.RunningStatistics(3)
+    for batch in np.split(data, [1, 10, 400, 401]):
+        statistics.update(batch)
+    assert statistics.count == 1000
+    np.testing.assert_allclose(statistics.mean, data.mean(axis=0))
+    np.testing.assert_allclose(statistics.covariance, np.cov(data.T))
+
+
+def test_confidence_ellipse_axes_and_angle():
+    scale = -2 * np.log(1 - 0.95)
+    ellipse = montecarlo.confidence_ellipse([1.0, 2.0], np.diag([4.0, 1.0]))
+    assert ellipse["center"] == [1.0, 2.0]
+    assert ellipse["width"] == pytest.approx(2 * np.sqrt(4 * scale))
+    assert ellipse["height"] == pytest.approx(2 * np.sqrt(scale))
+    assert ellipse["angle"] % 180 == pytest.approx(0.0)
+    # the major axis follows the larger variance
+    rotated = montecarlo.confidence_ellipse([0.0, 0.0], np.diag([1.0, 4.0]))
+    assert rotated["angle"] % 180 == pytest.approx(90.0)
+
+
+def test_same_seed_reproduces_the_samples(randomised):
+    options = {"seed": 7, "chunk_size": 64}
+    first = montecarlo.run_monte_carlo(randomised, 150, **options)
+    second = montecarlo.run_monte_carlo(randomised, 150, **options)
+    other = montecarlo.run_monte_carlo(randomised, 150, seed=8, chunk_size=64)
+    assert first["samples"] == 150
+    np.testing.assert_array_equal(first["points"], second["points"])
+    assert first["mean"] == second["mean"]
+    assert first["mean"] != other["mean"]
+
+
+def test_reservoir_keeps_at_most_keep_points():
+    dispersion = montecarlo.Dispersion(keep_points=50, seed=0)
+    ranges = np.arange(500, dtype=float)
+    for chunk in np.split(ranges, 5):
+        summary = {name: chunk for name in montecarlo.MEAN_COLUMNS}
+        summary.update(range=chunk, lateral_deviation=-chunk, landed=np.ones(100))
+        dispersion.update(summary)
+    points = dispersion.result()["points"]
+    assert points.shape == (50, 2)
+    assert set(points[:, 0]) <= set(ranges)
+    np.testing.assert_array_equal(points[:, 1], -points[:, 0])
+    # later chunks still get into the sample
+    assert points[:, 0].max() >= 100
+
+
+@pytest.mark.parametrize("samples", [0, -5])
+def test_samples_must_be_positive(randomised, samples):
+    with pytest.raises(ValueError):
+        montecarlo.run_monte_carlo(randomised, samples)
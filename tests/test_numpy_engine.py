@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+
+from python import calculation
+
+GRAVITY = calculation.GRAVITY
+
+
+@pytest.fixture(autouse=True)
+def numpy_engine(engine):
+    engine("numpy")
+
+
+@pytest.fixture
+def vacuum(launch):
+    return {
+        **launch,
+        "drag_coefficient": 0.0,
+        "lift_coefficient": 0.0,
+        "azimuth_angle": 0.0,
+    }
+
+
+def test_landing_time_matches_projectile_motion(vacuum):
+    # without drag and lift RK4 is exact, so only the root finder is left
+    magnus_data = {**vacuum, "initial_velocity": 20.0, "elevation_angle": 40.0}
+    result = calculation.run_magnus_simulation(magnus_data)
+    speed, elevation = 20.0, np.radians(40.0)
+    flight_time = 2 * speed * np.sin(elevation) / GRAVITY
+    assert result["t"][-1] == pytest.approx(flight_time, abs=1e-9)
+    assert result["x"][-1] == pytest.approx(
+        speed * np.cos(elevation) * flight_time, abs=1e-8
+    )
+    assert result["y"][-1] == 0.0
+    (ground,) = [event for event in result["events"] if event["name"] == "ground"]
+    assert ground["t"] == result["t"][-1]
+    assert result["final_state"]["landed"]
+
+
+def test_flight_that_does_not_land_stops_at_the_duration(vacuum):
+    magnus_data = {**vacuum, "elevation_angle": 80.0, "duration": 5.0}
+    result = calculation.run_magnus_simulation(magnus_data)
+    assert result["t"][-1] == pytest.approx(5.0)
+    assert not result["final_state"]["landed"]
+    assert result["events"] == []
+
+
+def test_events_are_in_time_order(launch):
+    magnus_data = {
+        **launch,
+        "events": [
+            {"type": "wall", "x": 30.0, "height": 1.0},
+            {"type": "plane", "x": 10.0},
+            {"type": "apex"},
+            {"type": "plane", "x": 1000.0},
+        ],
+    }
+    result = calculation.run_magnus_simulation(magnus_data)
+    events = result["events"]
+    names = [event["name"] for event in events]
+    assert names == ["plane", "apex", "wall", "ground"]
+    times = [event["t"] for event in events]
+    assert times == sorted(times)
+    # the crossings lie on their planes and the apex is the highest point
+    assert events[0]["x"] == pytest.approx(10.0, abs=1e-9)
+    assert events[2]["x"] == pytest.approx(30.0, abs=1e-9)
+    assert events[1]["vy"] == pytest.approx(0.0, abs=1e-9)
+    assert events[1]["y"] >= result["y"].max() - 1e-9
+    assert events[2]["cleared"] == (events[2]["y"] > 1.0)
+
+
+def test_extended_run_equals_full_run(launch):
+    magnus_data = {**launch, "elevation_angle": 70.0, "events": [{"type": "apex"}]}
+    short = calculation.run_magnus_simulation({**magnus_data, "duration": 1.0})
+    full = calculation.run_magnus_simulation(magnus_data)
+    extended = calculation.extend_simulation(short, magnus_data)
+    np.testing.assert_array_equal(extended["trajectory"], full["trajectory"])
+    assert extended["events"] == full["events"]
+    assert extended["steps"] == full["steps"]
+    assert extended["final_state"] == full["final_state"]
+
+
+def test_extend_rejects_another_flight(launch):
+    short = calculation.run_magnus_simulation({**launch, "duration": 1.0})
+    with pytest.raises(ValueError):
+        calculation.extend_simulation(short, {**launch, "initial_velocity": 31.0})
+
+
+def test_summary_and_sweep_agree_with_the_trajectory(launch):
+    result = calculation.run_magnus_simulation(launch)
+    summary = calculation.run_magnus_summary(launch)
+    assert summary["landed"]
+    assert summary["flight_time"] == result["t"][-1]
+    assert summary["range"] == result["x"][-1]
+    assert summary["lateral_deviation"] == result["z"][-1]
+    sweep = calculation.run_magnus_sweep(
+        {**launch, "initial_velocity": [20.0, 30.0]}, summary_only=True
+    )
+    assert sweep["range"][1] == summary["range"]
+
+
+def test_streamed_run_equals_direct_run(launch):
+    result = calculation.run_magnus_simulation(launch)
+    chunks = []
+    streamed = calculation.run_magnus_simulation(launch, chunk=chunks.append)
+    assert len(chunks) > 0
+    np.testing.assert_array_equal(streamed["trajectory"], result["trajectory"])
+
+
+def test_summary_events_equal_trajectory_events(launch):
+    events = [{"type": "plane", "x": 10.0}, {"type": "wall", "x": 30.0, "height": 1.0}]
+    result = calculation.run_magnus_simulation({**launch, "events": events})
+    summary = calculation.run_magnus_summary({**launch, "events": events})
+    apex = calculation.run_magnus_simulation(
+        {**launch, "events": [*events, {"type": "apex"}]}
+    )
+    # the summary always locates the apex as well
+    assert summary["events"] == apex["events"]
+    assert [event for event in summary["events"] if event["name"] != "apex"] == result[
+        "events"
+    ]
+
+
+def test_legacy_rows_launch_without_radius(launch):
+    row = calculation.magnus_parameters(launch)[0].row
+    spin = [[0.0, launch["side_spin"], launch["top_spin"]]]
+    legacy = calculation.ms.simulate_batch([row[:10]], calculation.MASS, spin)
+    full = calculation.ms.simulate_batch([row[:10] + [0.0]], calculation.MASS, spin)
+    np.testing.assert_array_equal(legacy[0], full[0])
+    with pytest.raises(ValueError):
+        calculation.ms.simulate_batch([row[:9]], calculation.MASS, spin)
+
+
+def test_legacy_rows_are_rejected_with_force_tables(launch, force_model):
+    # without a radius the table model would fly the launch in a vacuum
+    force_model("tables")
+    row = calculation.magnus_parameters(launch)[0].row
+    spin = [[0.0, launch["side_spin"], launch["top_spin"]]]
+    with pytest.raises(ValueError, match="radius"):
+        calculation.ms.simulate_batch(
+            [row[:10]], calculation.MASS, spin, force_tables=calculation.force_tables()
+        )
+
+
+def test_sweep_uses_the_integrator_setting(launch):
+    # the NumPy engine only has rk4, so asking for rk45 must reach it and fail
+    with pytest.raises(ValueError, match="rk45"):
+        calculation.run_magnus_sweep({**launch, "integrator": "rk45"})
+
+
+def test_force_tables_interpolate_and_clamp():
+    from python import force_model
+
+    tables = force_model.build_tables(calculation.ms, points=101)
+    drag, lift, density, spin = tables.lookup(1e5, 0.5, 0.0, 0.0)
+    assert drag == pytest.approx(force_model.drag_coefficient(1e5), rel=1e-3)
+    assert lift == pytest.approx(force_model.lift_coefficient(0.5), rel=1e-3)
+    assert density == pytest.approx(1.0)
+    assert spin == pytest.approx(1.0)
+    # outside the grid the value at the nearest end is used
+    assert tables.lookup(1e9, 10.0, 0.0, 0.0)[:2] == tables.lookup(2e6, 2.0, 0, 0)[:2]
+
+
+def test_table_model_flight_depends_on_spin_rate(launch, force_model):
+    force_model("tables")
+    slow = calculation.run_magnus_summary({**launch, "spin_rate": 500.0})
+    fast = calculation.run_magnus_summary({**launch, "spin_rate": 3000.0})
+    assert slow["landed"] and fast["landed"]
+    assert slow["range"] != fast["range"]
+    force_model("constant")
+    assert (
+        calculation.run_magnus_summary({**launch, "spin_rate": 500.0})["range"]
+        == calculation.run_magnus_summary({**launch, "spin_rate": 3000.0})["range"]
+    )
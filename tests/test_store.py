@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from python.store import STORE_COLUMNS, TrajectoryStore
+
+
+def trajectory(rows, value):
+    return np.full((rows, len(STORE_COLUMNS)), value, dtype=float)
+
+
+def test_append_load_and_reopen(tmp_path):
+    store = TrajectoryStore(tmp_path)
+    first = store.append(trajectory(3, 1.0), {"initial_velocity": 20.0})
+    block = np.concatenate([trajectory(2, 2.0), trajectory(4, 3.0)])
+    second, third = store.append_runs(block, [0, 2, 6], [{"run": 2}, {"run": 3}])
+    assert [first, second, third] == [0, 1, 2]
+
+    reopened = TrajectoryStore(tmp_path)
+    assert len(reopened) == 3
+    np.testing.assert_array_equal(reopened.load(first), trajectory(3, 1.0))
+    np.testing.assert_array_equal(reopened.load(third), trajectory(4, 3.0))
+    assert reopened.parameters(first) == {"initial_velocity": 20.0}
+    np.testing.assert_array_equal(reopened.column(second, "times"), [2.0, 2.0])
+
+
+def test_append_overwrites_rows_of_an_unfinished_append(tmp_path):
+    store = TrajectoryStore(tmp_path)
+    store.append(trajectory(3, 1.0), {})
+    # a process that died between writing its rows and saving the index
+    with open(store.data_path, "ab") as f:
+        trajectory(5, 9.0).tofile(f)
+
+    reopened = TrajectoryStore(tmp_path)
+    run_id = reopened.append(trajectory(2, 2.0), {})
+    np.testing.assert_array_equal(reopened.load(run_id), trajectory(2, 2.0))
+    assert reopened.data().shape == (5, len(STORE_COLUMNS))
+
+
+def test_other_columns_are_rejected(tmp_path):
+    store = TrajectoryStore(tmp_path)
+    store.append(trajectory(1, 1.0), {})
+    store.index["columns"] = STORE_COLUMNS[:-1]
+    store.save_index()
+    with pytest.raises(ValueError):
+        TrajectoryStore(tmp_path)
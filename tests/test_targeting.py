@@ -0,0 +1,48 @@
+import pytest
+
+from python import calculation
+from python.targeting import TargetSolver
+
+
+@pytest.fixture(autouse=True)
+def numpy_engine(engine):
+    engine("numpy")
+
+
+def landing(magnus_data):
+    summary = calculation.run_magnus_summary(magnus_data)
+    return {"x": summary["range"], "z": summary["lateral_deviation"]}
+
+
+def test_moving_the_target_converges_from_the_warm_start(launch):
+    solver = TargetSolver()
+    target = landing({**launch, "elevation_angle": 25.0, "azimuth_angle": 3.0})
+    first = solver.solve(launch, target)
+    assert first["converged"]
+    for shift in (0.5, -1.0):
+        moved = solver.solve(launch, {**target, "x": target["x"] + shift})
+        assert moved["converged"]
+        assert moved["evaluations"] <= 4
+
+
+def test_another_launch_starts_from_its_own_inputs(launch):
+    solver = TargetSolver()
+    target = landing({**launch, "elevation_angle": 35.0})
+    assert solver.solve(launch, target)["converged"]
+    # this launch already hits its own landing point, the first guess must be it
+    other = {**launch, "initial_velocity": 25.0}
+    result = solver.solve(other, landing(other))
+    assert result["evaluations"] == 1
+    assert result["parameters"] == {
+        "elevation_angle": other["elevation_angle"],
+        "azimuth_angle": other["azimuth_angle"],
+    }
+
+
+def test_unreachable_target_stops_before_the_budget(launch):
+    solver = TargetSolver()
+    coarse = {**launch, "time_step": 0.05}
+    result = solver.solve(coarse, {"x": 80.0, "z": 0.0})
+    assert not result["converged"]
+    assert result["evaluations"] < solver.max_evaluations / 2
+    assert solver.warm_starts == {}